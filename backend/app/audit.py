@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from os import environ
+from typing import Any, Dict, List
+
+from . import database
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = int(environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(environ.get("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(environ.get("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+# How long a write (one event or a whole batch) may wait for room in a full queue; what doesn't fit is dropped
+AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(environ.get("AUDIT_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+# Events older than this many days are rolled into compressed monthly archives (0 keeps everything hot)
+AUDIT_HOT_DAYS = int(environ.get("AUDIT_HOT_DAYS", "90"))
+# The TTL index on the hot collection trails the archive cutoff by this much, as a backstop only
+AUDIT_TTL_GRACE_DAYS = int(environ.get("AUDIT_TTL_GRACE_DAYS", "7"))
+# Seconds between audit archive runs; "0" disables archiving, and with it the TTL index
+AUDIT_ARCHIVE_INTERVAL_SECONDS = float(environ.get("AUDIT_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+
+class AuditSink:
+    """Bounded in-process queue of audit events, written to Mongo in batches.
+
+    Events are flushed with insert_many when a batch fills up or the flush
+    interval elapses, and the queue is drained on stop(). When the sink is not
+    running (scripts, tests without the app lifespan) events are written directly.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.queue: asyncio.Queue | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        # Counters
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.backpressure_waits = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()  # type: ignore
+        await self._task
+        self._task = None
+
+    async def put_many(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        if not self.running:
+            await database.db.audit_events.insert_many(events, ordered=False)  # type: ignore
+            return
+        # One deadline for the whole call, so a bulk write against a full queue
+        # waits at most enqueue_timeout rather than that long per event
+        deadline = None
+        for i, event in enumerate(events):
+            try:
+                self.queue.put_nowait(event)  # type: ignore
+                continue
+            except asyncio.QueueFull:
+                self.backpressure_waits += 1
+                self._wake.set()  # type: ignore
+            loop = asyncio.get_running_loop()
+            if deadline is None:
+                deadline = loop.time() + self.enqueue_timeout
+            try:
+                await asyncio.wait_for(self.queue.put(event), max(0.0, deadline - loop.time()))  # type: ignore
+            except asyncio.TimeoutError:
+                self.dropped += len(events) - i
+                break
+        if self.queue.qsize() >= self.batch_size:  # type: ignore
+            self._wake.set()  # type: ignore
+
+    async def put(self, event: Dict[str, Any]):
+        await self.put_many([event])
+
+    async def flush(self):
+        """Wait until every event queued so far has been written."""
+        if not self.running:
+            return
+        self._wake.set()  # type: ignore
+        await self.queue.join()  # type: ignore
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "capacity": self.max_queue,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)  # type: ignore
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()  # type: ignore
+            await self._drain()
+            if self._closing:
+                return
+
+    async def _drain(self):
+        while not self.queue.empty():  # type: ignore
+            batch = []
+            while len(batch) < self.batch_size and not self.queue.empty():  # type: ignore
+                batch.append(self.queue.get_nowait())  # type: ignore
+            try:
+                await database.db.audit_events.insert_many(batch, ordered=False)  # type: ignore
+                self.written += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("audit batch write failed")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()  # type: ignore
+
+
+audit_sink = AuditSink()
@@ -0,0 +1,132 @@
+"""Pub/sub backplane for fanning Planning Poker events out across worker processes.
+
+Each worker keeps its own WebSocket rooms; the backplane makes sure a message
+published on one worker reaches `deliver` on every worker.
+
+- "memory" (default): single-process, delivers directly.
+- "mongo": a capped collection tailed by every worker, so multiple uvicorn
+  workers (or hosts) sharing a MongoDB can all broadcast. Works on a standalone
+  mongod; no replica set is needed.
+"""
+import abc
+import asyncio
+import logging
+import uuid
+from os import environ
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from . import database
+
+logger = logging.getLogger(__name__)
+
+PLANNING_BACKPLANE = environ.get("PLANNING_BACKPLANE", "memory")
+BACKPLANE_COLLECTION = environ.get("BACKPLANE_COLLECTION", "planning_events")
+BACKPLANE_CAPPED_BYTES = int(environ.get("BACKPLANE_CAPPED_BYTES", str(16 * 1024 * 1024)))
+
+Deliver = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class Backplane(abc.ABC):
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def stop(self):
+        self._deliver = None
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        """Deliver `message` on `channel` to every worker, this one included."""
+
+
+class InMemoryBackplane(Backplane):
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        if self._deliver is not None:
+            await self._deliver(channel, message)
+
+
+class MongoBackplane(Backplane):
+    """Publishes into a capped collection and tails it with a tailable-await cursor."""
+
+    def __init__(self, collection: str = BACKPLANE_COLLECTION, capped_bytes: int = BACKPLANE_CAPPED_BYTES):
+        super().__init__()
+        self.collection = collection
+        self.capped_bytes = capped_bytes
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        self._ready = asyncio.Event()
+        try:
+            await database.db.create_collection(self.collection, capped=True, size=self.capped_bytes)  # type: ignore
+        except CollectionInvalid:
+            pass  # already created by another worker
+        self._task = asyncio.create_task(self._tail())
+        # Don't report started until the tail is live, or early messages from peers are missed
+        try:
+            await asyncio.wait_for(self._ready.wait(), 5)  # type: ignore
+        except asyncio.TimeoutError:
+            logger.warning("backplane tail not live yet; continuing startup")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await super().stop()
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        # Local sockets get it right away; other workers pick it up from the tail
+        if self._deliver is not None:
+            await self._deliver(channel, message)
+        await database.db[self.collection].insert_one(  # type: ignore
+            {"channel": channel, "origin": self.origin, "message": message}
+        )
+
+    async def _tail(self):
+        coll = database.db[self.collection]  # type: ignore
+        while True:
+            try:
+                # Drop a marker and skip everything up to it, so only messages published
+                # from now on are delivered. ObjectIds from different processes are not
+                # ordered within a second, so filtering on _id could lose messages.
+                marker = (await coll.insert_one({"channel": None, "origin": self.origin})).inserted_id
+                caught_up = False
+                cursor = coll.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        if not caught_up:
+                            caught_up = doc["_id"] == marker
+                            if caught_up:
+                                self._ready.set()  # type: ignore
+                            continue
+                        if doc.get("channel") is None or doc.get("origin") == self.origin or self._deliver is None:
+                            continue
+                        try:
+                            await self._deliver(doc["channel"], doc["message"])
+                        except Exception:
+                            logger.exception("backplane delivery failed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("backplane tail failed; retrying")
+            # Dead cursor or error: back off briefly and re-open from a fresh marker
+            await asyncio.sleep(0.5)
+
+
+def create_backplane(kind: str = PLANNING_BACKPLANE, collection: str = BACKPLANE_COLLECTION) -> Backplane:
+    if kind == "memory":
+        return InMemoryBackplane()
+    if kind == "mongo":
+        return MongoBackplane(collection=collection)
+    raise ValueError(f"Unknown PLANNING_BACKPLANE: {kind}")
@@ -1,13 +1,20 @@
 from . import database
+from .audit import audit_sink, AUDIT_HOT_DAYS
+from .user_directory import user_directory
+from .search_index import item_search_index
+from .versions import collection_versions
+from .events import event, event_hub
 from .models import (
     User,
     BacklogItem,
     Sprint,
     Comment,
     Epic,
+    EpicProgress,
     Story,
     Task,
     Subtask,
+    Vote,
     PyObjectId,
 )
 from .schemas import (
@@ -21,18 +28,32 @@ from .schemas import (
     SubtaskCreate,
 )
 from .utils.auth import get_password_hash
+from .utils.rank import rank_after, rank_between, ranks_between, is_valid_rank
 from bson import ObjectId
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
+from os import environ
+import asyncio
+import base64
+import json
+import re
+import zlib
+import bson
 
 async def create_user(user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     user_dict = user.model_dump()
     user_dict['password'] = hashed_password
     result = await database.db.users.insert_one(user_dict)  # type: ignore
+    user_directory.invalidate(result.inserted_id)
     user_data = {**user_dict, "_id": str(result.inserted_id)}
     return User.model_validate(user_data)
 
+async def update_user_password_hash(user_id: PyObjectId, hashed_password: str) -> None:
+    await database.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"password": hashed_password}})  # type: ignore
+
 async def get_user(username: str) -> Optional[User]:
     user_data = await database.db.users.find_one({"username": username})  # type: ignore
     if user_data:
@@ -45,7 +66,17 @@ async def create_backlog_item(item: BacklogItemCreate) -> BacklogItem:
     now = datetime.utcnow()
     item_dict.setdefault("created_at", now)
     item_dict.setdefault("updated_at", now)
+    if not item_dict.get("rank"):
+        item_dict["rank"] = await next_rank("backlog_items")
+    item_dict["search_terms"] = _search_terms(item_dict)
+    item_dict.update((await _change_stamps(1))[0])
     result = await database.db.backlog_items.insert_one(item_dict)  # type: ignore
+    item_search_index.upsert(result.inserted_id, item_dict)
+    await collection_versions.bump("backlog_items")
+    await event_hub.publish(_item_event(
+        "created", result.inserted_id, {f: item_dict.get(f) for f in ITEM_EVENT_FIELDS}, item_dict
+    ))
+    await apply_item_changes_to_epics([(None, item_dict)])
     item_data = {**item_dict, "_id": str(result.inserted_id)}
     return BacklogItem.model_validate(item_data)
 
@@ -56,20 +87,84 @@ async def get_backlog_items() -> List[BacklogItem]:
         items.append(BacklogItem.model_validate(doc))
     return items
 
-async def get_backlog_items_filtered(filters: Dict[str, Any]) -> List[BacklogItem]:
+# Fields that may be requested through the `fields=` projection on item listings
+ITEM_FIELDS = {
+    "type", "title", "description", "status", "labels", "priority", "story_points",
+    "assignee", "rank", "epic_id", "sprint_id", "acceptance_criteria", "change_seq", "created_at", "updated_at",
+}
+
+def _build_item_query(filters: Dict[str, Any], text_search: bool = False) -> Dict[str, Any]:
     query: Dict[str, Any] = {}
     # Map simple filters
-    for key in ["type", "status", "epic_id", "assignee"]:
+    for key in ["type", "status", "epic_id", "sprint_id", "assignee"]:
         val = filters.get(key)
         if val is not None:
             query[key] = val
-    # Text search (basic regex OR $text if index exists)
     q = filters.get("q")
-    if q:
+    if q and text_search:
+        # Whole words go to the text index; a trailing partial word is a prefix on search_terms
+        words = q.split()
+        partial = words.pop() if words and not q[-1].isspace() else None
+        if words:
+            query["$text"] = {"$search": " ".join(words)}
+        if partial:
+            query["search_terms"] = {"$regex": "^" + re.escape(partial.lower())}
+    elif q:
+        # Substring match; input is escaped so it can't act as a pattern
+        pattern = re.escape(q)
         query["$or"] = [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"description": {"$regex": q, "$options": "i"}},
+            {"title": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}},
         ]
+    return query
+
+# Lower-cased title words and labels, indexed for prefix (type-ahead) matching
+SEARCH_TERMS_MAX = 64
+
+# Conditional writes tried before update_backlog_item sets search_terms unconditionally
+SEARCH_TERMS_WRITE_ATTEMPTS = 3
+
+def _search_terms(doc: Dict[str, Any]) -> List[str]:
+    terms = re.findall(r"\w+", str(doc.get("title") or "").lower())
+    terms += [str(label).lower() for label in doc.get("labels") or []]
+    return list(dict.fromkeys(t for t in terms if t))[:SEARCH_TERMS_MAX]
+
+def _encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(token: str) -> List[Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def _encode_time_cursor(created_at: datetime, id: PyObjectId) -> str:
+    return _encode_cursor([created_at.isoformat(), str(id)])
+
+def _decode_time_cursor(token: str) -> tuple[datetime, ObjectId]:
+    try:
+        created_at, id = _decode_cursor(token)
+        return datetime.fromisoformat(created_at), ObjectId(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def encode_item_cursor(rank: Any, id: PyObjectId) -> str:
+    return _encode_cursor([rank, str(id)])
+
+def decode_item_cursor(token: str) -> tuple[Any, ObjectId]:
+    try:
+        rank, id = _decode_cursor(token)
+        return rank, ObjectId(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+async def get_backlog_items_filtered(filters: Dict[str, Any]) -> List[BacklogItem]:
+    query = _build_item_query(filters)
     items: List[BacklogItem] = []
     cursor = database.db.backlog_items.find(query).sort("rank", 1)  # type: ignore
     async for doc in cursor:
@@ -77,6 +172,184 @@ async def get_backlog_items_filtered(filters: Dict[str, Any]) -> List[BacklogIte
         items.append(BacklogItem.model_validate(doc))
     return items
 
+async def get_backlog_items_page(
+    filters: Dict[str, Any],
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset page over backlog items ordered by (rank, _id).
+
+    `after` is an opaque token from a previous page; `fields` limits the columns
+    fetched from Mongo. Returns the page and the token for the next one (None at the end).
+    """
+    query = _build_item_query(filters)
+    if after:
+        rank, oid = decode_item_cursor(after)
+        keyset = {"$or": [{"rank": {"$gt": rank}}, {"rank": rank, "_id": {"$gt": oid}}]}
+        query = {"$and": [query, keyset]} if query else keyset
+    projection = None
+    if fields:
+        # rank is always needed to build the continuation token
+        projection = {f: 1 for f in fields}
+        projection["rank"] = 1
+    cursor = database.db.backlog_items.find(query, projection).sort([("rank", 1), ("_id", 1)])  # type: ignore
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        cursor = cursor.limit(limit + 1)
+    docs: List[Dict[str, Any]] = []
+    async for doc in cursor:
+        docs.append(doc)
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_item_cursor(last.get("rank"), last["_id"])
+    page: List[Dict[str, Any]] = []
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+        if fields:
+            row = {"id": doc["_id"]}
+            row.update({f: doc[f] for f in fields if f in doc})
+            page.append(row)
+        else:
+            page.append(BacklogItem.model_validate(doc).model_dump())
+    return page, next_cursor
+
+async def search_backlog_items(
+    filters: Dict[str, Any],
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Relevance-ranked search: `$text` over the weighted index plus a prefix on the last word.
+
+    Results are the top `limit` matches by text score (rank order when the
+    query is a single partial word); there is no continuation token.
+    """
+    query = _build_item_query(filters, text_search=True)
+    projection: Optional[Dict[str, Any]] = {f: 1 for f in fields} if fields else None
+    sort: List[Any] = [("rank", 1), ("_id", 1)]
+    if "$text" in query:
+        projection = {**(projection or {}), "score": {"$meta": "textScore"}}
+        sort = [("score", {"$meta": "textScore"})] + sort
+    cursor = database.db.backlog_items.find(query, projection).sort(sort).limit(limit)  # type: ignore
+    results: List[Dict[str, Any]] = []
+    async for doc in cursor:
+        doc["_id"] = str(doc["_id"])
+        if fields:
+            row = {"id": doc["_id"]}
+            row.update({f: doc[f] for f in fields if f in doc})
+            results.append(row)
+        else:
+            results.append(BacklogItem.model_validate(doc).model_dump())
+    return results
+
+# --- Item change feed ---
+# Every write to backlog_items stamps the item with a fresh change_seq; deletes leave a tombstone
+# with one. Readers skip changes younger than CHANGES_SETTLE_SECONDS so a sequence number reserved
+# by a write that hasn't landed yet can't be stepped over.
+CHANGES_SETTLE_SECONDS = float(environ.get("CHANGES_SETTLE_SECONDS", "1"))
+CHANGES_TOMBSTONE_DAYS = int(environ.get("CHANGES_TOMBSTONE_DAYS", "30"))
+
+async def _change_stamps(n: int) -> List[Dict[str, Any]]:
+    """Reserve `n` consecutive change sequence numbers with one $inc."""
+    if n <= 0:
+        return []
+    counter = await database.db.counters.find_one_and_update(  # type: ignore
+        {"_id": "backlog_items"}, {"$inc": {"seq": n}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    now = datetime.utcnow()
+    first = counter["seq"] - n + 1
+    return [{"change_seq": first + i, "changed_at": now} for i in range(n)]
+
+async def _stamped_item_updates(updates: List[tuple]) -> List[UpdateOne]:
+    """[(filter, $set fields), ...] -> UpdateOnes, each with its own change stamp."""
+    stamps = await _change_stamps(len(updates))
+    return [UpdateOne(filter, {"$set": {**fields, **stamp}}) for (filter, fields), stamp in zip(updates, stamps)]
+
+async def get_backlog_item_changes(since: int, limit: int = 500) -> Dict[str, Any]:
+    """Items written and ids deleted after change `since`, oldest first.
+
+    Returns {"seq", "upserts", "deletes", "more"}; pass `seq` as the next `since`.
+    Raises ValueError when tombstones newer than `since` were already pruned
+    (the client has to reload everything).
+    """
+    counter = await database.db.counters.find_one({"_id": "backlog_items"}) or {}  # type: ignore
+    if since < counter.get("pruned_through", 0):
+        raise ValueError("Changes since this sequence are no longer available")
+    cutoff = datetime.utcnow() - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    query = {"change_seq": {"$gt": since}}
+    items = [
+        doc async for doc in database.db.backlog_items.find(query).sort("change_seq", 1).limit(limit + 1)  # type: ignore
+    ]
+    tombstones = [
+        doc async for doc in database.db.item_tombstones.find(query).sort("change_seq", 1).limit(limit + 1)  # type: ignore
+    ]
+    changes = sorted(items + tombstones, key=lambda doc: doc["change_seq"])
+    upserts: List[Dict[str, Any]] = []
+    deletes: List[str] = []
+    seq = since
+    more = False
+    for doc in changes:
+        if len(upserts) + len(deletes) == limit:
+            more = True
+            break
+        if doc.get("changed_at") and doc["changed_at"] > cutoff:
+            break
+        seq = doc["change_seq"]
+        doc["_id"] = str(doc["_id"])
+        if "item_id" in doc:
+            deletes.append(str(doc["item_id"]))
+        else:
+            upserts.append(BacklogItem.model_validate(doc).model_dump())
+    return {"seq": seq, "upserts": upserts, "deletes": deletes, "more": more}
+
+async def get_settled_change_seq() -> int:
+    """A `since` to start the change feed from, read before listing items.
+
+    Mirrors the feed's CHANGES_SETTLE_SECONDS guard: only changes old enough to
+    have landed count, so a write that reserved a lower sequence but lands after
+    the list read is still delivered. Never below the pruned tombstones, or the
+    first poll would get 410.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    query = {"change_seq": {"$gt": 0}, "changed_at": {"$not": {"$gt": cutoff}}}
+    seqs = [0]
+    for coll in (database.db.backlog_items, database.db.item_tombstones):  # type: ignore
+        doc = await coll.find_one(query, {"change_seq": 1}, sort=[("change_seq", -1)])
+        if doc:
+            seqs.append(doc["change_seq"])
+    counter = await database.db.counters.find_one({"_id": "backlog_items"}) or {}  # type: ignore
+    seqs.append(counter.get("pruned_through", 0))
+    return max(seqs)
+
+async def prune_item_tombstones(days: int = CHANGES_TOMBSTONE_DAYS) -> int:
+    """Drop tombstones older than `days`; clients that last synced before them must reload."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    newest = await database.db.item_tombstones.find_one(  # type: ignore
+        {"changed_at": {"$lt": cutoff}}, {"change_seq": 1}, sort=[("change_seq", -1)]
+    )
+    if not newest:
+        return 0
+    await database.db.counters.update_one(  # type: ignore
+        {"_id": "backlog_items"}, {"$max": {"pruned_through": newest["change_seq"]}}, upsert=True
+    )
+    result = await database.db.item_tombstones.delete_many({"change_seq": {"$lte": newest["change_seq"]}})  # type: ignore
+    return result.deleted_count
+
+# Item fields carried by live events (plus whatever an update changed)
+ITEM_EVENT_FIELDS = ("title", "type", "status", "rank", "story_points", "assignee", "epic_id", "sprint_id", "change_seq")
+
+def _item_event(action: str, id: Any, data: Dict[str, Any], *images: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Topics cover the sprint/epic of every image, so moves reach both the old and the new one
+    images_ = [i for i in images if i]
+    return event(
+        "item", action, id,
+        {k: v for k, v in data.items() if k not in ("search_terms", "changed_at")},
+        sprint_ids={str(i["sprint_id"]) for i in images_ if i.get("sprint_id")},
+        epic_ids={str(i["epic_id"]) for i in images_ if i.get("epic_id")},
+    )
+
 async def get_backlog_item(id: PyObjectId) -> Optional[BacklogItem]:
     doc = await database.db.backlog_items.find_one({"_id": ObjectId(id)})  # type: ignore
     if doc:
@@ -88,44 +361,190 @@ async def update_backlog_item(id: PyObjectId, update_data: dict) -> Optional[Bac
     if not isinstance(update_data, dict):
         update_data = {}
     update_data["updated_at"] = datetime.utcnow()
-    result = await database.db.backlog_items.update_one({"_id": ObjectId(id)}, {"$set": update_data})  # type: ignore
-    # Return the item if it exists, regardless of whether fields actually changed
-    if result.matched_count:
-        return await get_backlog_item(id)
-    return None
+    stamp = (await _change_stamps(1))[0]
+    fields = {**update_data, **stamp}
+    retitled = "title" in update_data or "labels" in update_data
+    # search_terms cover both title and labels; the one not being changed is read first
+    kept = [f for f in ("title", "labels") if f not in update_data] if retitled else []
+    for attempt in range(SEARCH_TERMS_WRITE_ATTEMPTS):
+        query: Dict[str, Any] = {"_id": ObjectId(id)}
+        if retitled:
+            current: Dict[str, Any] = {}
+            if kept:
+                current = await database.db.backlog_items.find_one(query, {f: 1 for f in kept})  # type: ignore
+                if current is None:
+                    return None
+                if attempt < SEARCH_TERMS_WRITE_ATTEMPTS - 1:
+                    # Only write if that field still holds what the terms were built from
+                    query.update({f: current.get(f) for f in kept})
+            fields["search_terms"] = _search_terms({**current, **update_data})
+        # Grab the pre-image in the same round trip; the saved item is pre-image + $set
+        before = await database.db.backlog_items.find_one_and_update(  # type: ignore
+            query, {"$set": fields}, return_document=ReturnDocument.BEFORE
+        )
+        if before is not None or len(query) == 1:
+            break
+    if not before:
+        return None
+    after = {**before, **fields}
+    item_search_index.update(id, update_data)
+    await collection_versions.bump("backlog_items")
+    await event_hub.publish(_item_event("updated", id, {**update_data, **stamp}, before, after))
+    if "status" in update_data or "story_points" in update_data:
+        await apply_item_change_to_snapshots(id, before, after)
+    if any(field in update_data for field in EPIC_ROLLUP_FIELDS):
+        await apply_item_changes_to_epics([(before, after)])
+    after["_id"] = str(after["_id"])
+    return BacklogItem.model_validate(after)
 
 async def delete_backlog_item(id: PyObjectId) -> bool:
-    result = await database.db.backlog_items.delete_one({"_id": ObjectId(id)})  # type: ignore
-    return result.deleted_count > 0
+    before = await database.db.backlog_items.find_one_and_delete(  # type: ignore
+        {"_id": ObjectId(id)}, projection={**{field: 1 for field in EPIC_ROLLUP_FIELDS}, "sprint_id": 1}
+    )
+    if not before:
+        return False
+    stamp = (await _change_stamps(1))[0]
+    await database.db.item_tombstones.insert_one({"item_id": str(id), **stamp})  # type: ignore
+    item_search_index.remove(id)
+    sid = before.get("sprint_id")
+    await collection_versions.bump("backlog_items", *(["sprints"] if sid else []))
+    await event_hub.publish(
+        _item_event("deleted", id, {"change_seq": stamp["change_seq"]}, before),
+        *([event("sprint", "updated", sid, {"removed": [str(id)]}, sprint_ids=[sid])] if sid else []),
+    )
+    await apply_item_changes_to_epics([(before, None)])
+    if sid:
+        await snapshot_sprints([str(sid)])
+    return True
+
+# Fields bulk updates read up front: burndown uses status/points, epic roll-ups epic/type,
+# search title/labels, live events the sprint
+ITEM_PREIMAGE = {"status": 1, "story_points": 1, "epic_id": 1, "type": 1, "title": 1, "labels": 1, "sprint_id": 1}
+
+async def _apply_item_updates(updates: List[tuple], existing: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # `existing` maps id -> pre-image (ITEM_PREIMAGE fields) of the items that exist
+    now = datetime.utcnow()
+    ops = []
+    results: List[Dict[str, Any]] = []
+    touched_burndown: List[str] = []
+    epic_changes: List[tuple] = []
+    for id, changes in updates:
+        id = str(id)
+        if id not in existing:
+            results.append({"id": id, "ok": False, "error": "Item not found"})
+            continue
+        fields = {**changes, "updated_at": now}
+        if "title" in changes or "labels" in changes:
+            fields["search_terms"] = _search_terms({**existing[id], **changes})
+        ops.append(({"_id": ObjectId(id)}, fields))
+        results.append({"id": id, "ok": True})
+        if "status" in changes or "story_points" in changes:
+            touched_burndown.append(id)
+        if any(field in changes for field in EPIC_ROLLUP_FIELDS):
+            epic_changes.append((existing[id], {**existing[id], **changes}))
+    if ops:
+        await database.db.backlog_items.bulk_write(await _stamped_item_updates(ops), ordered=False)  # type: ignore
+        for id, changes in updates:
+            if str(id) in existing:
+                item_search_index.update(id, changes)
+        await collection_versions.bump("backlog_items")
+        await event_hub.publish(*(
+            _item_event("updated", id, changes, existing[str(id)], {**existing[str(id)], **changes})
+            for id, changes in updates if str(id) in existing
+        ))
+    if touched_burndown:
+        await refresh_snapshots_for_items(touched_burndown)
+    if epic_changes:
+        await apply_item_changes_to_epics(epic_changes)
+    return results
+
+async def bulk_update_backlog_items(updates: List[tuple]) -> List[Dict[str, Any]]:
+    """Apply [(id, changes), ...] with one unordered bulk_write; returns a result per entry.
+
+    Ids must be unique: every entry is computed against the item's pre-image.
+    """
+    oids = [ObjectId(str(id)) for id, _ in updates if ObjectId.is_valid(str(id))]
+    existing = {
+        str(doc["_id"]): doc
+        async for doc in database.db.backlog_items.find({"_id": {"$in": oids}}, ITEM_PREIMAGE)  # type: ignore
+    }
+    return await _apply_item_updates(updates, existing)
+
+async def bulk_update_backlog_items_matching(filters: Dict[str, Any], changes: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Apply one change set to every item matching the listing filters.
+
+    Raises ValueError, without writing anything, when more than `limit` items match.
+    """
+    query = _build_item_query(filters)
+    existing = {
+        str(doc["_id"]): doc
+        async for doc in database.db.backlog_items.find(query, ITEM_PREIMAGE).limit(limit + 1)  # type: ignore
+    }
+    if len(existing) > limit:
+        raise ValueError(f"Filter matches more than {limit} items")
+    return await _apply_item_updates([(id, changes) for id in existing], existing)
 
 async def create_sprint(sprint: SprintCreate) -> Sprint:
     sprint_dict = sprint.model_dump()
+    items = sprint_dict.pop("backlog_items", [])
     result = await database.db.sprints.insert_one(sprint_dict)  # type: ignore
-    sprint_data = {**sprint_dict, "_id": str(result.inserted_id)}
+    await collection_versions.bump("sprints")
+    await event_hub.publish(event("sprint", "created", result.inserted_id, sprint_dict, sprint_ids=[result.inserted_id]))
+    if items:
+        # Goes through the membership path so items leave their previous sprint
+        created = await move_items_to_sprint(str(result.inserted_id), add=items)
+        if created is not None:
+            return created
+    sprint_data = {**sprint_dict, "backlog_items": [], "_id": str(result.inserted_id)}
     return Sprint.model_validate(sprint_data)
 
 async def get_sprints() -> List[Sprint]:
-    sprints = []
-    async for doc in database.db.sprints.find():  # type: ignore
-        doc["_id"] = str(doc["_id"])
-        sprints.append(Sprint.model_validate(doc))
-    return sprints
+    docs = [doc async for doc in database.db.sprints.find()]  # type: ignore
+    members = await _sprint_members([str(doc["_id"]) for doc in docs])
+    return [await _sprint_from_doc(doc, members[str(doc["_id"])]) for doc in docs]
 
 async def get_sprint(id: PyObjectId) -> Optional[Sprint]:
     doc = await database.db.sprints.find_one({"_id": ObjectId(id)})  # type: ignore
     if doc:
-        doc["_id"] = str(doc["_id"])
-        return Sprint.model_validate(doc)
+        return await _sprint_from_doc(doc)
     return None
 
 async def update_sprint(id: PyObjectId, update_data: dict) -> Optional[Sprint]:
-    result = await database.db.sprints.update_one({"_id": ObjectId(id)}, {"$set": update_data})  # type: ignore
-    if result.matched_count:
-        return await get_sprint(id)
-    return None
+    update_data = dict(update_data)
+    items = update_data.pop("backlog_items", None)
+    if update_data:
+        result = await database.db.sprints.update_one({"_id": ObjectId(id)}, {"$set": update_data})  # type: ignore
+        if not result.matched_count:
+            return None
+        await collection_versions.bump("sprints")
+        await event_hub.publish(event("sprint", "updated", id, update_data, sprint_ids=[id]))
+    if items is not None:
+        # Replacing the list is expressed as adds and removes so item.sprint_id stays in step
+        current = await get_sprint(id)
+        if current is None:
+            return None
+        wanted = [str(i) for i in items]
+        return await move_items_to_sprint(
+            id,
+            add=[i for i in wanted if i not in current.backlog_items],
+            remove=[i for i in current.backlog_items if i not in wanted],
+        )
+    return await get_sprint(id)
 
 async def delete_sprint(id: PyObjectId) -> bool:
     result = await database.db.sprints.delete_one({"_id": ObjectId(id)})  # type: ignore
+    if result.deleted_count:
+        orphans = [doc async for doc in database.db.backlog_items.find({"sprint_id": str(id)}, {"epic_id": 1})]  # type: ignore
+        stamps = await _change_stamps(len(orphans))
+        if orphans:
+            await database.db.backlog_items.bulk_write([  # type: ignore
+                UpdateOne({"_id": doc["_id"]}, {"$set": stamp, "$unset": {"sprint_id": ""}}) for doc, stamp in zip(orphans, stamps)
+            ], ordered=False)
+        await collection_versions.bump("sprints", "backlog_items")
+        await event_hub.publish(event("sprint", "deleted", id, sprint_ids=[id]), *(
+            _item_event("updated", doc["_id"], {"sprint_id": None, "change_seq": stamp["change_seq"]}, {**doc, "sprint_id": id})
+            for doc, stamp in zip(orphans, stamps)
+        ))
     return result.deleted_count > 0
 
 async def create_comment(comment: CommentCreate, user_id: PyObjectId, username: str | None = None) -> Comment:
@@ -135,45 +554,76 @@ async def create_comment(comment: CommentCreate, user_id: PyObjectId, username:
         comment_dict['username'] = username
     comment_dict['created_at'] = datetime.utcnow()
     result = await database.db.comments.insert_one(comment_dict)  # type: ignore
+    await _publish_comment_event("created", result.inserted_id, comment_dict["item_id"], {"text": comment_dict["text"], "username": username})
     comment_data = {**comment_dict, "_id": str(result.inserted_id)}
     return Comment.model_validate(comment_data)
 
-async def get_comments_for_item(item_id: PyObjectId) -> List[Comment]:
+async def get_comments_for_item(
+    item_id: PyObjectId,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+) -> tuple[List[Comment], Optional[str]]:
+    """Oldest-first comment thread page, keyed on (created_at, _id); returns the next-page cursor."""
+    query: Dict[str, Any] = {"item_id": item_id}
+    if after:
+        ts, oid = _decode_time_cursor(after)
+        query["$or"] = [{"created_at": {"$gt": ts}}, {"created_at": ts, "_id": {"$gt": oid}}]
+    cursor = database.db.comments.find(query).sort([("created_at", 1), ("_id", 1)])  # type: ignore
+    if limit:
+        cursor = cursor.limit(limit + 1)
+    docs = [doc async for doc in cursor]
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = _encode_time_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+    # Backfill username for legacy comments (one batched lookup)
+    await user_directory.fill_usernames(docs)
     comments = []
-    async for doc in database.db.comments.find({"item_id": item_id}):  # type: ignore
-        # Backfill username for legacy comments
-        if not doc.get("username") and doc.get("user_id"):
-            try:
-                udoc = await database.db.users.find_one({"_id": ObjectId(str(doc["user_id"]))})  # type: ignore
-                if udoc and udoc.get("username"):
-                    doc["username"] = udoc["username"]
-            except Exception:
-                pass
+    for doc in docs:
         doc["_id"] = str(doc["_id"])
         comments.append(Comment.model_validate(doc))
-    return comments
+    return comments, next_cursor
+
+async def get_comment_counts(item_ids: List[PyObjectId]) -> Dict[str, int]:
+    counts = {str(i): 0 for i in item_ids}
+    pipeline = [
+        {"$match": {"item_id": {"$in": list(counts)}}},
+        {"$group": {"_id": "$item_id", "count": {"$sum": 1}}},
+    ]
+    async for row in database.db.comments.aggregate(pipeline):  # type: ignore
+        counts[str(row["_id"])] = row["count"]
+    return counts
 
 async def get_comment(id: PyObjectId) -> Optional[Comment]:
     doc = await database.db.comments.find_one({"_id": ObjectId(id)})  # type: ignore
     if doc:
         # Backfill username for legacy comment
-        if not doc.get("username") and doc.get("user_id"):
-            try:
-                udoc = await database.db.users.find_one({"_id": ObjectId(str(doc["user_id"]))})  # type: ignore
-                if udoc and udoc.get("username"):
-                    doc["username"] = udoc["username"]
-            except Exception:
-                pass
+        await user_directory.fill_usernames([doc])
         doc["_id"] = str(doc["_id"])
         return Comment.model_validate(doc)
     return None
 
+async def _publish_comment_event(action: str, id: Any, item_id: Any, data: Optional[Dict[str, Any]] = None):
+    # Routed by the item's sprint and epic, so board subscribers see comment activity
+    item = None
+    if ObjectId.is_valid(str(item_id)):
+        item = await database.db.backlog_items.find_one({"_id": ObjectId(str(item_id))}, {"sprint_id": 1, "epic_id": 1})  # type: ignore
+    item = item or {}
+    await event_hub.publish(event(
+        "comment", action, id, {**(data or {}), "item_id": str(item_id)},
+        sprint_ids=[item.get("sprint_id")], epic_ids=[item.get("epic_id")],
+    ))
+
 async def delete_comment(id: PyObjectId) -> bool:
-    result = await database.db.comments.delete_one({"_id": ObjectId(id)})  # type: ignore
-    return result.deleted_count > 0
+    doc = await database.db.comments.find_one_and_delete({"_id": ObjectId(id)}, {"item_id": 1})  # type: ignore
+    if doc:
+        await _publish_comment_event("deleted", id, doc.get("item_id"))
+    return doc is not None
 
 async def update_comment(id: PyObjectId, text: str) -> Optional[Comment]:
-    await database.db.comments.update_one({"_id": ObjectId(id)}, {"$set": {"text": text}})  # type: ignore
+    doc = await database.db.comments.find_one_and_update({"_id": ObjectId(id)}, {"$set": {"text": text}}, {"item_id": 1})  # type: ignore
+    if doc:
+        await _publish_comment_event("updated", id, doc.get("item_id"), {"text": text})
     return await get_comment(id)
 
 # Planning Poker CRUD operations
@@ -184,6 +634,7 @@ async def create_planning_session(story_id: PyObjectId, created_by: PyObjectId,
         "created_by": ObjectId(created_by),
         "status": "voting",
         "scale": scale,
+        "vote_count": 0,
         "created_at": datetime.utcnow()
     }
     result = await database.db.planning_sessions.insert_one(session_dict)  # type: ignore
@@ -194,6 +645,13 @@ async def get_planning_session(id: PyObjectId):
     from .models import PlanningSession
     doc = await database.db.planning_sessions.find_one({"_id": ObjectId(id)})  # type: ignore
     if doc:
+        if "vote_count" not in doc:
+            # Sessions created before the counter existed: count once and store it
+            doc["vote_count"] = await database.db.votes.count_documents({"session_id": doc["_id"]})  # type: ignore
+            await database.db.planning_sessions.update_one(  # type: ignore
+                {"_id": doc["_id"], "vote_count": {"$exists": False}},
+                {"$set": {"vote_count": doc["vote_count"]}},
+            )
         doc["_id"] = str(doc["_id"])
         return PlanningSession.model_validate(doc)
     return None
@@ -213,111 +671,619 @@ async def update_session_status(id: PyObjectId, status: str) -> bool:
     )  # type: ignore
     return result.modified_count > 0
 
-async def create_vote(session_id: PyObjectId, user_id: PyObjectId, value: str, username: Optional[str] = None):
-    from .models import Vote
-    # First, try to update existing vote for this user in this session
-    existing_vote = await database.db.votes.find_one({
-        "session_id": ObjectId(session_id),
-        "user_id": ObjectId(user_id)
-    })  # type: ignore
-    
-    if existing_vote:
-        # Update existing vote
-        await database.db.votes.update_one(
-            {"_id": existing_vote["_id"]},
-            {"$set": {"value": value, "created_at": datetime.utcnow()}}
-        )  # type: ignore
-        vote_data = {
-            "_id": str(existing_vote["_id"]),
-            "session_id": session_id,
-            "user_id": user_id,
-            "value": value,
-            "created_at": datetime.utcnow()
-        }
-        if username:
-            vote_data["username"] = username
-        return Vote.model_validate(vote_data)
-    else:
-        # Create new vote
-        vote_dict = {
-            "session_id": ObjectId(session_id),
-            "user_id": ObjectId(user_id),
-            "value": value,
-            "created_at": datetime.utcnow()
-        }
-        if username:
-            vote_dict["username"] = username
-        result = await database.db.votes.insert_one(vote_dict)  # type: ignore
-        vote_data = {**vote_dict, "_id": str(result.inserted_id)}
-        return Vote.model_validate(vote_data)
+async def create_vote(
+    session_id: PyObjectId, user_id: PyObjectId, value: str, username: Optional[str] = None, vote_id: Optional[str] = None
+) -> Tuple[Vote, int]:
+    """Insert or replace the user's vote in one upsert; returns the vote and the session's vote count.
+
+    The unique (session_id, user_id) index makes concurrent submissions from the
+    same user converge on one document, and `vote_count` on the session is only
+    bumped when the upsert inserted.
+    """
+    key = {"session_id": ObjectId(session_id), "user_id": ObjectId(user_id)}
+    fields: Dict[str, Any] = {"value": value, "created_at": datetime.utcnow()}
+    if username:
+        fields["username"] = username
+    new_id = ObjectId(vote_id) if vote_id else ObjectId()
+    for attempt in range(2):
+        try:
+            before = await database.db.votes.find_one_and_update(  # type: ignore
+                key,
+                {"$set": fields, "$setOnInsert": {"_id": new_id}},
+                upsert=True,
+                projection={"_id": 1},
+                return_document=ReturnDocument.BEFORE,
+            )
+            break
+        except DuplicateKeyError:
+            # Lost an insert race with the same user's other request; the retry updates
+            if attempt:
+                raise
+    vote = Vote.model_validate({**key, **fields, "_id": str(before["_id"] if before else new_id)})
+    if before is not None:
+        session = await database.db.planning_sessions.find_one(  # type: ignore
+            {"_id": ObjectId(session_id)}, {"vote_count": 1}
+        )
+        return vote, (session or {}).get("vote_count", 0)
+    session = await database.db.planning_sessions.find_one_and_update(  # type: ignore
+        {"_id": ObjectId(session_id)},
+        {"$inc": {"vote_count": 1}},
+        projection={"vote_count": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return vote, (session or {}).get("vote_count", 0)
 
 async def get_votes_for_session(session_id: PyObjectId):
     from .models import Vote
+    docs = [doc async for doc in database.db.votes.find({"session_id": ObjectId(session_id)})]  # type: ignore
+    # Backfill username for legacy votes (one batched lookup)
+    await user_directory.fill_usernames(docs)
     votes = []
-    async for doc in database.db.votes.find({"session_id": ObjectId(session_id)}):  # type: ignore
-        # Backfill username for legacy votes
-        if not doc.get("username") and doc.get("user_id"):
-            try:
-                udoc = await database.db.users.find_one({"_id": ObjectId(str(doc["user_id"]))})  # type: ignore
-                if udoc and udoc.get("username"):
-                    doc["username"] = udoc["username"]
-            except Exception:
-                pass
+    for doc in docs:
         doc["_id"] = str(doc["_id"])
         votes.append(Vote.model_validate(doc))
     return votes
 
 # --- Sprint item management helpers ---
-async def add_item_to_sprint(sprint_id: PyObjectId, item_id: PyObjectId) -> Optional[Sprint]:
-    sprint_doc = await database.db.sprints.find_one({"_id": ObjectId(sprint_id)})  # type: ignore
-    if not sprint_doc:
+# An item's own sprint_id is the only record of membership; a sprint's item list is derived from it
+async def _sprint_members(sprint_ids: List[str]) -> Dict[str, List[str]]:
+    members: Dict[str, List[str]] = {sid: [] for sid in sprint_ids}
+    if sprint_ids:
+        cursor = database.db.backlog_items.find({"sprint_id": {"$in": sprint_ids}}, {"sprint_id": 1}).sort([("rank", 1), ("_id", 1)])  # type: ignore
+        async for doc in cursor:
+            members[doc["sprint_id"]].append(str(doc["_id"]))
+    return members
+
+async def _sprint_from_doc(doc: Dict[str, Any], members: Optional[List[str]] = None) -> Sprint:
+    doc["_id"] = str(doc["_id"])
+    if members is None:
+        members = (await _sprint_members([doc["_id"]]))[doc["_id"]]
+    # Sprints written before items carried sprint_id may still hold a stale array
+    doc["backlog_items"] = members
+    return Sprint.model_validate(doc)
+
+async def move_items_to_sprint(
+    sprint_id: PyObjectId, add: Optional[List[PyObjectId]] = None, remove: Optional[List[PyObjectId]] = None
+) -> Optional[Sprint]:
+    """Add and/or remove many items by setting each item's `sprint_id`.
+
+    An item belongs to at most one sprint, so adding it here takes it out of
+    its previous one. Each write only applies if `sprint_id` still holds the
+    value just read; on a miss the item is re-read and tried again, so the
+    sprint it really left is known even when moves of the same item race.
+    Ids of items that don't exist are ignored. Returns None for an unknown sprint.
+    """
+    sid = str(sprint_id)
+    if not await database.db.sprints.find_one({"_id": ObjectId(sid)}, {"_id": 1}):  # type: ignore
         return None
-    backlog_items = sprint_doc.get("backlog_items", [])
-    if item_id not in backlog_items:
-        backlog_items.append(item_id)
-        await database.db.sprints.update_one(
-            {"_id": ObjectId(sprint_id)}, {"$set": {"backlog_items": backlog_items}}
-        )  # type: ignore
-    return await get_sprint(sprint_id)
+    add_oids = [ObjectId(str(i)) for i in add or [] if ObjectId.is_valid(str(i))]
+    added_set = {str(oid) for oid in add_oids}
+    remove_oids = [ObjectId(str(i)) for i in remove or [] if ObjectId.is_valid(str(i)) and str(i) not in added_set]
+    touched = {sid}
+    # Item id -> (image before the write, change_seq written)
+    moved: Dict[str, Tuple[Dict[str, Any], int]] = {}
+    pending = add_oids
+    while pending:
+        images = [
+            doc
+            async for doc in database.db.backlog_items.find(  # type: ignore
+                {"_id": {"$in": pending}, "sprint_id": {"$ne": sid}}, {"sprint_id": 1, "epic_id": 1}
+            )
+        ]
+        stamps = await _change_stamps(len(images))
+        results = await asyncio.gather(*(
+            database.db.backlog_items.update_one(  # type: ignore
+                {"_id": doc["_id"], "sprint_id": doc.get("sprint_id")}, {"$set": {"sprint_id": sid, **stamp}}
+            )
+            for doc, stamp in zip(images, stamps)
+        ))
+        pending = []
+        for doc, stamp, result in zip(images, stamps, results):
+            if result.matched_count:
+                moved[str(doc["_id"])] = (doc, stamp["change_seq"])
+                if doc.get("sprint_id"):
+                    touched.add(str(doc["sprint_id"]))
+            else:
+                # Moved by someone else since we read it
+                pending.append(doc["_id"])
+    added = list(moved)
+    if remove_oids:
+        images = [
+            doc
+            async for doc in database.db.backlog_items.find(  # type: ignore
+                {"_id": {"$in": remove_oids}, "sprint_id": sid}, {"sprint_id": 1, "epic_id": 1}
+            )
+        ]
+        stamps = await _change_stamps(len(images))
+        results = await asyncio.gather(*(
+            database.db.backlog_items.update_one(  # type: ignore
+                {"_id": doc["_id"], "sprint_id": sid}, {"$set": stamp, "$unset": {"sprint_id": ""}}
+            )
+            for doc, stamp in zip(images, stamps)
+        ))
+        for doc, stamp, result in zip(images, stamps, results):
+            if result.matched_count:
+                moved[str(doc["_id"])] = (doc, stamp["change_seq"])
+    removed = [i for i in moved if i not in added]
+    if moved:
+        await collection_versions.bump("sprints", "backlog_items")
+        await event_hub.publish(
+            event("sprint", "updated", sid, {"added": added, "removed": removed}, sprint_ids=[sid]),
+            *(event("sprint", "updated", other, sprint_ids=[other]) for other in touched if other != sid),
+            *(
+                _item_event("updated", i, {"sprint_id": sid if i in added else None, "change_seq": seq}, image, {"sprint_id": sid})
+                for i, (image, seq) in moved.items()
+            ),
+        )
+        await snapshot_sprints(list(touched))
+    return await get_sprint(sid)
+
+async def add_item_to_sprint(sprint_id: PyObjectId, item_id: PyObjectId) -> Optional[Sprint]:
+    return await move_items_to_sprint(sprint_id, add=[item_id])
 
 async def remove_item_from_sprint(sprint_id: PyObjectId, item_id: PyObjectId) -> Optional[Sprint]:
-    sprint_doc = await database.db.sprints.find_one({"_id": ObjectId(sprint_id)})  # type: ignore
-    if not sprint_doc:
-        return None
-    backlog_items = sprint_doc.get("backlog_items", [])
-    if item_id in backlog_items:
-        backlog_items = [bid for bid in backlog_items if bid != item_id]
-        await database.db.sprints.update_one(
-            {"_id": ObjectId(sprint_id)}, {"$set": {"backlog_items": backlog_items}}
-        )  # type: ignore
-    return await get_sprint(sprint_id)
+    return await move_items_to_sprint(sprint_id, remove=[item_id])
+
+def _burndown_pipeline(sprint_oids: Optional[List[ObjectId]]) -> List[Dict[str, Any]]:
+    # One pass: sprint -> items whose sprint_id names it -> points/status, summed per sprint.
+    # Sprints without items still come out as zeros.
+    match: Dict[str, Any] = {} if sprint_oids is None else {"_id": {"$in": sprint_oids}}
+    points = {"$ifNull": ["$item.story_points", 0]}
+    return [
+        {"$match": match},
+        {"$project": {"_id": 1}},
+        {"$lookup": {
+            "from": "backlog_items",
+            "let": {"sid": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$sprint_id", "$$sid"]}}},
+                {"$project": {"story_points": 1, "status": 1}},
+            ],
+            "as": "item",
+        }},
+        {"$unwind": {"path": "$item", "preserveNullAndEmptyArrays": True}},
+        {"$group": {
+            "_id": "$_id",
+            "total": {"$sum": points},
+            "remaining": {"$sum": {"$cond": [{"$eq": ["$item.status", "done"]}, 0, points]}},
+        }},
+    ]
+
+async def get_burndown_snapshots(sprint_ids: Optional[List[PyObjectId]] = None) -> Dict[str, Dict[str, Any]]:
+    """Burndown for many sprints in one aggregation, keyed by sprint id.
+
+    With no ids every sprint is included; unknown ids are simply absent from the result.
+    """
+    oids = None
+    if sprint_ids is not None:
+        oids = [ObjectId(sid) for sid in sprint_ids if ObjectId.is_valid(str(sid))]
+        if not oids:
+            return {}
+    result: Dict[str, Dict[str, Any]] = {}
+    async for row in database.db.sprints.aggregate(_burndown_pipeline(oids)):  # type: ignore
+        total = int(row.get("total", 0))
+        remaining = int(row.get("remaining", 0))
+        completed = max(total - remaining, 0)
+        result[str(row["_id"])] = {"total": total, "remaining": remaining, "completed": completed}
+    return result
 
 async def get_burndown_snapshot(sprint_id: PyObjectId) -> Optional[Dict[str, Any]]:
-    sprint = await get_sprint(sprint_id)
-    if not sprint:
+    snapshots = await get_burndown_snapshots([sprint_id])
+    return snapshots.get(str(sprint_id))
+
+# --- Burndown time series ---
+def _snapshot_day(when: Optional[datetime] = None) -> str:
+    return (when or datetime.utcnow()).strftime("%Y-%m-%d")
+
+def _burndown_points(doc: Dict[str, Any]) -> tuple[int, int]:
+    # (total, remaining) contribution of a single item document
+    sp = int(doc.get("story_points") or 0)
+    return sp, (0 if doc.get("status", "todo") == "done" else sp)
+
+async def snapshot_sprints(sprint_ids: Optional[List[PyObjectId]] = None) -> int:
+    """Write today's burndown row for the given sprints (all when None). Idempotent per day."""
+    snapshots = await get_burndown_snapshots(sprint_ids)
+    if not snapshots:
+        return 0
+    day = _snapshot_day()
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"sprint_id": sid, "day": day},
+            {"$set": {**data, "updated_at": now}},
+            upsert=True,
+        )
+        for sid, data in snapshots.items()
+    ]
+    await database.db.sprint_snapshots.bulk_write(ops, ordered=False)  # type: ignore
+    return len(ops)
+
+async def apply_item_change_to_snapshots(item_id: PyObjectId, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """Fold an item's status/points change into today's row of the sprint holding it."""
+    old_total, old_remaining = _burndown_points(before)
+    new_total, new_remaining = _burndown_points(after)
+    d_total = new_total - old_total
+    d_remaining = new_remaining - old_remaining
+    if not d_total and not d_remaining:
+        return
+    doc = await database.db.backlog_items.find_one({"_id": ObjectId(str(item_id))}, {"sprint_id": 1})  # type: ignore
+    sprint_ids = [doc["sprint_id"]] if doc and doc.get("sprint_id") else []
+    if not sprint_ids:
+        return
+    result = await database.db.sprint_snapshots.update_many(  # type: ignore
+        {"sprint_id": {"$in": sprint_ids}, "day": _snapshot_day()},
+        {
+            "$inc": {"total": d_total, "remaining": d_remaining, "completed": d_total - d_remaining},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+    )
+    if result.matched_count < len(sprint_ids):
+        # No row yet today for some sprint: a delta has nothing to apply to, recompute instead
+        await snapshot_sprints(sprint_ids)
+
+async def refresh_snapshots_for_items(item_ids: List[PyObjectId]) -> None:
+    """Recompute today's rows for every sprint holding any of the items."""
+    oids = [ObjectId(str(i)) for i in item_ids if ObjectId.is_valid(str(i))]
+    sprint_ids = [sid for sid in await database.db.backlog_items.distinct("sprint_id", {"_id": {"$in": oids}}) if sid]  # type: ignore
+    if sprint_ids:
+        await snapshot_sprints(sprint_ids)
+
+async def get_burndown_series(sprint_id: PyObjectId, days: Optional[int] = None) -> List[Dict[str, Any]]:
+    query: Dict[str, Any] = {"sprint_id": str(sprint_id)}
+    if days:
+        query["day"] = {"$gte": _snapshot_day(datetime.utcnow() - timedelta(days=days - 1))}
+    series: List[Dict[str, Any]] = []
+    cursor = database.db.sprint_snapshots.find(query, {"_id": 0, "sprint_id": 0, "updated_at": 0}).sort("day", 1)  # type: ignore
+    async for doc in cursor:
+        series.append(doc)
+    return series
+
+# --- Epic roll-ups ---
+# Item fields that feed an epic's progress counters
+EPIC_ROLLUP_FIELDS = ("epic_id", "status", "story_points", "type")
+
+def _rollup_key(value: Any) -> Optional[str]:
+    # Counter names become field paths; skip values that can't be one
+    key = str(value or "")
+    return key if key and "." not in key and not key.startswith("$") else None
+
+def _epic_contribution(doc: Optional[Dict[str, Any]], sign: int) -> Optional[tuple[str, Dict[str, int]]]:
+    """(epic_id, {counter path: delta}) for one item document, or None if it has no epic."""
+    if not doc or not doc.get("epic_id") or not ObjectId.is_valid(str(doc["epic_id"])):
         return None
-    total = 0
-    remaining = 0
-    for item_oid in sprint.backlog_items:
-        doc = await database.db.backlog_items.find_one({"_id": ObjectId(item_oid)})  # type: ignore
-        if not doc:
-            continue
-        sp = int(doc.get("story_points", 0))
-        total += sp
-        if doc.get("status", "todo") != "done":
-            remaining += sp
-    completed = max(total - remaining, 0)
-    return {"total": total, "remaining": remaining, "completed": completed}
+    sp = int(doc.get("story_points") or 0)
+    status = doc.get("status", "todo")
+    inc = {
+        "progress.total_points": sign * sp,
+        "progress.done_points": sign * (sp if status == "done" else 0),
+        "progress.item_count": sign,
+    }
+    for group, value in (("by_status", status), ("by_type", doc.get("type", "story"))):
+        key = _rollup_key(value)
+        if key:
+            inc[f"progress.{group}.{key}"] = sign
+    return str(doc["epic_id"]), inc
+
+async def apply_item_changes_to_epics(changes: List[tuple]) -> None:
+    """Fold [(before, after), ...] item images into the epics' progress counters with $inc.
+
+    Either image may be None (create/delete). Moving an item between epics
+    decrements the old epic and increments the new one.
+    """
+    deltas: Dict[str, Dict[str, int]] = {}
+    for before, after in changes:
+        for contribution in (_epic_contribution(before, -1), _epic_contribution(after, 1)):
+            if contribution is None:
+                continue
+            epic_id, inc = contribution
+            acc = deltas.setdefault(epic_id, {})
+            for path, delta in inc.items():
+                acc[path] = acc.get(path, 0) + delta
+    ops = []
+    for epic_id, inc in deltas.items():
+        inc = {path: delta for path, delta in inc.items() if delta}
+        if inc:
+            ops.append(UpdateOne({"_id": ObjectId(epic_id)}, {"$inc": inc}))
+    if ops:
+        await database.db.epics.bulk_write(ops, ordered=False)  # type: ignore
+        await collection_versions.bump("epics")
+        await event_hub.publish(*(event("epic", "updated", epic_id, epic_ids=[epic_id]) for epic_id in deltas))
+
+async def reconcile_epic_progress() -> int:
+    """Recompute every epic's progress from backlog_items and overwrite drifted counters."""
+    computed: Dict[str, Dict[str, Any]] = {}
+    pipeline = [
+        {"$match": {"epic_id": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": {"epic_id": "$epic_id", "status": "$status", "type": "$type"},
+            "count": {"$sum": 1},
+            "points": {"$sum": {"$ifNull": ["$story_points", 0]}},
+        }},
+    ]
+    async for row in database.db.backlog_items.aggregate(pipeline):  # type: ignore
+        key = row["_id"]
+        progress = computed.setdefault(str(key["epic_id"]), {
+            "total_points": 0, "done_points": 0, "item_count": 0, "by_status": {}, "by_type": {},
+        })
+        status = key.get("status") or "todo"
+        points = int(row["points"] or 0)
+        progress["total_points"] += points
+        progress["done_points"] += points if status == "done" else 0
+        progress["item_count"] += row["count"]
+        for group, value in (("by_status", status), ("by_type", key.get("type") or "story")):
+            name = _rollup_key(value)
+            if name:
+                progress[group][name] = progress[group].get(name, 0) + row["count"]
+    empty = {"total_points": 0, "done_points": 0, "item_count": 0, "by_status": {}, "by_type": {}}
+    ops = []
+    async for epic in database.db.epics.find({}, {"progress": 1}):  # type: ignore
+        expected = computed.get(str(epic["_id"]), empty)
+        current = epic.get("progress") or {}
+        # Zero entries left behind by $inc are equivalent to missing ones
+        normalized = {
+            **current,
+            "by_status": {k: v for k, v in (current.get("by_status") or {}).items() if v},
+            "by_type": {k: v for k, v in (current.get("by_type") or {}).items() if v},
+        }
+        if normalized != expected:
+            ops.append(UpdateOne({"_id": epic["_id"]}, {"$set": {"progress": expected}}))
+    if ops:
+        await database.db.epics.bulk_write(ops, ordered=False)  # type: ignore
+        await collection_versions.bump("epics")
+    return len(ops)
+
+# --- Sprint board ---
+BOARD_COLUMNS = ("todo", "in_progress", "done")
+BOARD_SWIMLANES = ("epic", "assignee")
+
+async def get_sprint_board(sprint_id: PyObjectId, swimlane: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Everything the task board renders for a sprint, from one items query plus one subtask count.
+
+    Items are grouped into status columns (in rank order), optionally inside
+    swimlanes keyed by epic or assignee. Returns None for an unknown sprint.
+    """
+    if not await database.db.sprints.find_one({"_id": ObjectId(sprint_id)}, {"_id": 1}):  # type: ignore
+        return None
+    items: List[Dict[str, Any]] = []
+    cursor = database.db.backlog_items.find({"sprint_id": str(sprint_id)}).sort([("rank", 1), ("_id", 1)])  # type: ignore
+    async for doc in cursor:
+        doc["_id"] = str(doc["_id"])
+        items.append(BacklogItem.model_validate(doc).model_dump())
+
+    counts: Dict[str, Dict[str, int]] = {}
+    if items:
+        pipeline = [
+            {"$match": {"parent_task_id": {"$in": [i["id"] for i in items]}}},
+            {"$group": {
+                "_id": "$parent_task_id",
+                "total": {"$sum": 1},
+                "done": {"$sum": {"$cond": [{"$eq": ["$status", "done"]}, 1, 0]}},
+            }},
+        ]
+        async for row in database.db.subtasks.aggregate(pipeline):  # type: ignore
+            counts[str(row["_id"])] = row
+    for item in items:
+        row = counts.get(item["id"], {})
+        item["subtask_count"] = row.get("total", 0)
+        item["subtasks_done"] = row.get("done", 0)
+
+    columns = list(BOARD_COLUMNS)
+    columns += sorted({i["status"] for i in items} - set(columns))
+
+    lane_field = {"epic": "epic_id", "assignee": "assignee"}.get(swimlane or "")
+    titles: Dict[str, str] = {}
+    if swimlane == "epic":
+        epic_oids = [ObjectId(e) for e in {i.get("epic_id") for i in items} if e and ObjectId.is_valid(e)]
+        if epic_oids:
+            async for doc in database.db.epics.find({"_id": {"$in": epic_oids}}, {"title": 1}):  # type: ignore
+                titles[str(doc["_id"])] = doc.get("title", "")
+    elif swimlane == "assignee":
+        titles = await user_directory.resolve(i.get("assignee") for i in items)
+
+    lanes: Dict[Optional[str], Dict[str, Any]] = {}
+    for item in items:
+        key = item.get(lane_field) if lane_field else None
+        lane = lanes.get(key)
+        if lane is None:
+            lane = lanes[key] = {"key": key, "title": titles.get(key) if key else None, "columns": {c: [] for c in columns}}
+        lane["columns"][item["status"]].append(item)
+    if not lanes:
+        lanes[None] = {"key": None, "title": None, "columns": {c: [] for c in columns}}
+    # Named lanes first (by title), the catch-all "no epic/assignee" lane last
+    ordered = sorted(lanes.values(), key=lambda l: (l["key"] is None, (l["title"] or "").lower()))
+    return {"sprint_id": str(sprint_id), "swimlane": swimlane, "columns": columns, "lanes": ordered}
+
+# --- Hierarchy tree ---
+# Epics resolved per batch of the tree; bounds memory when streaming large trees
+HIERARCHY_BATCH_SIZE = int(environ.get("HIERARCHY_BATCH_SIZE", "100"))
+
+async def iter_hierarchy(
+    epic_ids: Optional[List[str]] = None,
+    sprint_id: Optional[PyObjectId] = None,
+    status: Optional[str] = None,
+    depth: int = 3,
+    batch_size: int = HIERARCHY_BATCH_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield epic -> items -> subtasks nodes in rank order.
+
+    depth 1 is epics only, 2 adds items, 3 adds subtasks. Each batch of epics
+    costs one `$in` query for its items and one for their subtasks. `status`
+    and `sprint_id` filter items; with either set, epics without a matching
+    item are left out. Raises LookupError for an unknown sprint.
+    """
+    epic_query: Dict[str, Any] = {}
+    if epic_ids is not None:
+        epic_query["_id"] = {"$in": [ObjectId(e) for e in epic_ids if ObjectId.is_valid(e)]}
+    item_query: Dict[str, Any] = {}
+    if status:
+        item_query["status"] = status
+    if sprint_id is not None:
+        if not await database.db.sprints.find_one({"_id": ObjectId(sprint_id)}, {"_id": 1}):  # type: ignore
+            raise LookupError("Sprint not found")
+        item_query["sprint_id"] = str(sprint_id)
+    filtered = bool(item_query) and depth >= 2
+
+    batch: List[Dict[str, Any]] = []
+    cursor = database.db.epics.find(epic_query).sort([("rank", 1), ("_id", 1)])  # type: ignore
+    async for doc in cursor:
+        doc["_id"] = str(doc["_id"])
+        batch.append(Epic.model_validate(doc).model_dump())
+        if len(batch) >= batch_size:
+            for node in await _expand_epics(batch, item_query, depth, filtered):
+                yield node
+            batch = []
+    if batch:
+        for node in await _expand_epics(batch, item_query, depth, filtered):
+            yield node
+
+async def _expand_epics(epics: List[Dict[str, Any]], item_query: Dict[str, Any], depth: int, filtered: bool) -> List[Dict[str, Any]]:
+    if depth < 2:
+        return epics
+    by_epic: Dict[str, List[Dict[str, Any]]] = {e["id"]: [] for e in epics}
+    items: Dict[str, Dict[str, Any]] = {}
+    query = {**item_query, "epic_id": {"$in": list(by_epic)}}
+    async for doc in database.db.backlog_items.find(query).sort([("rank", 1), ("_id", 1)]):  # type: ignore
+        doc["_id"] = str(doc["_id"])
+        item = BacklogItem.model_validate(doc).model_dump()
+        items[item["id"]] = item
+        by_epic[str(doc["epic_id"])].append(item)
+    if depth >= 3:
+        for item in items.values():
+            item["subtasks"] = []
+        if items:
+            cursor = database.db.subtasks.find({"parent_task_id": {"$in": list(items)}}).sort([("rank", 1), ("_id", 1)])  # type: ignore
+            async for doc in cursor:
+                doc["_id"] = str(doc["_id"])
+                items[str(doc["parent_task_id"])]["subtasks"].append(Subtask.model_validate(doc).model_dump())
+    nodes = []
+    for epic in epics:
+        epic["items"] = by_epic[epic["id"]]
+        if epic["items"] or not filtered:
+            nodes.append(epic)
+    return nodes
 
 # --- Rank utility ---
-def compute_rank_between(prev_rank: float | None, next_rank: float | None) -> float:
-    if prev_rank is None and next_rank is None:
-        return 0.0
-    if prev_rank is None:
-        return float(next_rank) - 1.0
-    if next_rank is None:
-        return float(prev_rank) + 1.0
-    return (float(prev_rank) + float(next_rank)) / 2.0
+RANKED_COLLECTIONS = ("backlog_items", "epics", "stories", "tasks", "subtasks")
+# Keys longer than this are respaced by the background rebalancer
+RANK_MAX_LENGTH = int(environ.get("RANK_MAX_LENGTH", "8"))
+# Neighbours on each side of a long key that get respaced with it
+RANK_REBALANCE_WINDOW = int(environ.get("RANK_REBALANCE_WINDOW", "50"))
+
+def compute_rank_between(prev_rank: str | None, next_rank: str | None) -> str:
+    return rank_between(prev_rank, next_rank)
+
+async def next_rank(collection: str) -> str:
+    """Rank that appends a new document at the end of `collection`."""
+    last = await database.db[collection].find_one(  # type: ignore
+        {"rank": {"$type": "string"}}, {"rank": 1}, sort=[("rank", -1)]
+    )
+    prev = last.get("rank") if last else None
+    return rank_after(prev if is_valid_rank(prev) else None)
+
+async def compute_move_rank(
+    collection: str,
+    id: PyObjectId,
+    after_id: Optional[PyObjectId] = None,
+    before_id: Optional[PyObjectId] = None,
+) -> str:
+    """Rank that places `id` right after `after_id` and/or right before `before_id`.
+
+    When only one neighbour is given (or the pair is out of order because of a
+    concurrent move) the other side is looked up, so the result is always a real gap.
+    """
+    given = [x for x in (after_id, before_id) if x]
+    if not given or any(not ObjectId.is_valid(str(x)) or str(x) == str(id) for x in given):
+        raise ValueError("Invalid after_id/before_id")
+    coll = database.db[collection]
+    ranks = {
+        str(doc["_id"]): doc.get("rank")
+        async for doc in coll.find({"_id": {"$in": [ObjectId(str(x)) for x in given]}}, {"rank": 1})  # type: ignore
+    }
+    if any(str(x) not in ranks for x in given):
+        raise ValueError("Invalid after_id/before_id")
+    prev_rank = ranks[str(after_id)] if after_id else None
+    next_rank_ = ranks[str(before_id)] if before_id else None
+    me = ObjectId(str(id))
+    if after_id and (next_rank_ is None or next_rank_ <= prev_rank):
+        nxt = await coll.find_one({"rank": {"$gt": prev_rank}, "_id": {"$ne": me}}, {"rank": 1}, sort=[("rank", 1)])  # type: ignore
+        next_rank_ = nxt["rank"] if nxt else None
+    elif not after_id:
+        prv = await coll.find_one({"rank": {"$lt": next_rank_}, "_id": {"$ne": me}}, {"rank": 1}, sort=[("rank", -1)])  # type: ignore
+        prev_rank = prv["rank"] if prv else None
+    if next_rank_ is None:
+        # Moving to the end is an append
+        return rank_after(prev_rank)
+    return rank_between(prev_rank, next_rank_)
+
+async def resolve_rank(collection: str, id: PyObjectId, body: Dict[str, Any]) -> str:
+    """Rank requested by a reorder payload: {"after_id", "before_id"} or an explicit {"rank"}."""
+    if not isinstance(body, dict):
+        raise ValueError("Invalid payload")
+    if body.get("after_id") or body.get("before_id"):
+        return await compute_move_rank(collection, id, body.get("after_id"), body.get("before_id"))
+    rank = body.get("rank")
+    if not is_valid_rank(rank):
+        raise ValueError("Invalid rank")
+    return rank
+
+async def _rank_updates(collection: str, ranks: List[tuple]) -> List[UpdateOne]:
+    # Backlog items carry change stamps so rank moves reach the change feed
+    updates = [({"_id": oid}, {"rank": rank}) for oid, rank in ranks]
+    if collection == "backlog_items":
+        return await _stamped_item_updates(updates)
+    return [UpdateOne(filter, {"$set": fields}) for filter, fields in updates]
+
+async def rebalance_ranks(collection: str, around_rank: str, window: int = RANK_REBALANCE_WINDOW) -> int:
+    """Respace up to `window` documents either side of `around_rank` with one bulk_write."""
+    coll = database.db[collection]
+    before = [
+        doc async for doc in coll.find({"rank": {"$lt": around_rank}}, {"rank": 1})  # type: ignore
+        .sort([("rank", -1), ("_id", -1)]).limit(window + 1)
+    ]
+    after = [
+        doc async for doc in coll.find({"rank": {"$gte": around_rank}}, {"rank": 1})  # type: ignore
+        .sort([("rank", 1), ("_id", 1)]).limit(window + 1)
+    ]
+    # The first document outside the window on each side bounds the new keys
+    lower = before.pop()["rank"] if len(before) > window else None
+    upper = after.pop()["rank"] if len(after) > window else None
+    region = list(reversed(before)) + after
+    new_ranks = ranks_between(lower, upper, len(region))
+    ops = await _rank_updates(collection, [
+        (doc["_id"], rank) for doc, rank in zip(region, new_ranks) if doc.get("rank") != rank
+    ])
+    if ops:
+        await coll.bulk_write(ops, ordered=False)  # type: ignore
+        await collection_versions.bump(collection)
+    return len(ops)
+
+async def rebalance_dense_ranks(max_length: int = RANK_MAX_LENGTH, limit: int = 10) -> int:
+    """Find over-long ranks in every ranked collection and respace the regions around them."""
+    updated = 0
+    for collection in RANKED_COLLECTIONS:
+        long_keys = [
+            doc["rank"] async for doc in database.db[collection].find(  # type: ignore
+                {"rank": {"$regex": f"^.{{{max_length + 1},}}"}}, {"rank": 1}
+            ).limit(limit)
+        ]
+        for rank in long_keys:
+            # An earlier pass may already have respaced this key's region
+            if await database.db[collection].count_documents({"rank": rank}, limit=1):  # type: ignore
+                updated += await rebalance_ranks(collection, rank)
+    return updated
+
+async def normalize_ranks(collection: str) -> int:
+    """Replace legacy numeric/missing ranks with string ranks, keeping the current order."""
+    coll = database.db[collection]
+    legacy = await coll.find_one({"$or": [{"rank": {"$not": {"$type": "string"}}}, {"rank": ""}]}, {"_id": 1})  # type: ignore
+    if not legacy:
+        return 0
+    docs = [doc async for doc in coll.find({}, {"rank": 1}).sort([("rank", 1), ("_id", 1)])]  # type: ignore
+    ops = await _rank_updates(collection, list(zip((doc["_id"] for doc in docs), ranks_between(None, None, len(docs)))))
+    if ops:
+        await coll.bulk_write(ops, ordered=False)  # type: ignore
+        await collection_versions.bump(collection)
+    return len(ops)
 
 # --- Audit logging ---
 async def log_audit(user_id: PyObjectId, entity: str, entity_id: PyObjectId, action: str, changes: Dict[str, Any] | None = None) -> None:
@@ -329,36 +1295,205 @@ async def log_audit(user_id: PyObjectId, entity: str, entity_id: PyObjectId, act
         "changes": changes or {},
         "created_at": datetime.utcnow(),
     }
-    await database.db.audit_events.insert_one(payload)  # type: ignore
+    # Queued; the sink batches inserts off the request path
+    await audit_sink.put(payload)
+
+async def log_audits(user_id: PyObjectId, entity: str, action: str, events: List[tuple]) -> None:
+    """Record many (entity_id, changes) audit events in one batch."""
+    now = datetime.utcnow()
+    payloads = [
+        {
+            "user_id": user_id,
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "changes": changes or {},
+            "created_at": now,
+        }
+        for entity_id, changes in events
+    ]
+    await audit_sink.put_many(payloads)
 
-async def get_audits(entity: str, entity_id: PyObjectId) -> List[Dict[str, Any]]:
+def _naive_utc(ts: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes; keep bounds comparable with them
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def _audit_bound(value: str) -> tuple[datetime, Optional[ObjectId]]:
+    # A bound is either a cursor from a previous page or a plain ISO-8601 timestamp
+    try:
+        return _naive_utc(datetime.fromisoformat(value)), None
+    except ValueError:
+        pass
+    created_at, id = _decode_time_cursor(value)
+    return _naive_utc(created_at), id
+
+def _audit_in_bounds(doc: Dict[str, Any], bounds: List[tuple]) -> bool:
+    key = (doc["created_at"], doc["_id"])
+    for op, ts, oid in bounds:
+        if oid is None:
+            ok = doc["created_at"] < ts if op == "$lt" else doc["created_at"] > ts
+        else:
+            ok = key < (ts, oid) if op == "$lt" else key > (ts, oid)
+        if not ok:
+            return False
+    return True
+
+async def _get_archived_audits(
+    entity: str, entity_id: PyObjectId, bounds: List[tuple], keep: Callable[[Dict[str, Any]], bool], needed: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Archived events passing `keep`, walking months newest first.
+
+    Stops once `needed` events are found and their month is done, since every
+    older month only holds older events; None reads everything within `bounds`.
+    """
+    query: Dict[str, Any] = {"entity": entity, "entity_id": entity_id}
+    months: Dict[str, str] = {}
+    for op, ts, _ in bounds:
+        months["$lte" if op == "$lt" else "$gte"] = ts.strftime("%Y-%m")
+    if months:
+        query["month"] = months
+    events: List[Dict[str, Any]] = []
+    month = None
+    async for chunk in database.db.audit_archive.find(query).sort("month", -1):  # type: ignore
+        if needed is not None and len(events) >= needed and chunk["month"] != month:
+            break
+        month = chunk["month"]
+        events.extend(doc for doc in bson.decode(zlib.decompress(chunk["events"]))["events"] if keep(doc))
+    return events
+
+async def archive_audits(cutoff: Optional[datetime] = None, batch_size: int = 5000) -> int:
+    """Move hot events older than the retention window into per-entity, per-month compressed chunks."""
+    if cutoff is None:
+        if AUDIT_HOT_DAYS <= 0:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=AUDIT_HOT_DAYS)
+    archived = 0
+    while True:
+        batch = [
+            doc async for doc in database.db.audit_events.find({"created_at": {"$lt": cutoff}})  # type: ignore
+            .sort("created_at", 1).limit(batch_size)
+        ]
+        if not batch:
+            break
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for doc in batch:
+            key = (doc["entity"], doc["entity_id"], doc["created_at"].strftime("%Y-%m"))
+            groups.setdefault(key, []).append(doc)
+        chunks = [
+            {
+                "entity": entity,
+                "entity_id": entity_id,
+                "month": month,
+                "count": len(events),
+                "first_at": events[0]["created_at"],
+                "last_at": events[-1]["created_at"],
+                "events": bson.Binary(zlib.compress(bson.encode({"events": events}))),
+            }
+            for (entity, entity_id, month), events in groups.items()
+        ]
+        await database.db.audit_archive.insert_many(chunks, ordered=False)  # type: ignore
+        # A crash between these two writes only duplicates events; readers dedupe by _id
+        await database.db.audit_events.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})  # type: ignore
+        archived += len(batch)
+        if len(batch) < batch_size:
+            break
+    return archived
+
+async def get_audits(
+    entity: str,
+    entity_id: PyObjectId,
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    action: Optional[str] = None,
+    user_id: Optional[PyObjectId] = None,
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first audit events for an entity, served by the (entity, entity_id, created_at) index.
+
+    `before`/`after` take a cursor or an ISO timestamp; the returned cursor fetches the next older page.
+    Pages that reach past the hot retention window continue into the archive transparently.
+    """
+    # Read-your-writes: make sure this process's queued events are in Mongo
+    await audit_sink.flush()
+    query: Dict[str, Any] = {"entity": entity, "entity_id": entity_id}
+    if action:
+        query["action"] = action
+    if user_id:
+        query["user_id"] = user_id
+    bounds: List[tuple] = []
+    for value, op in ((before, "$lt"), (after, "$gt")):
+        if value:
+            bounds.append((op, *_audit_bound(value)))
+    clauses: List[Dict[str, Any]] = []
+    for op, ts, oid in bounds:
+        if oid is None:
+            clauses.append({"created_at": {op: ts}})
+        else:
+            clauses.append({"$or": [{"created_at": {op: ts}}, {"created_at": ts, "_id": {op: oid}}]})
+    if clauses:
+        query["$and"] = clauses
+    cursor = database.db.audit_events.find(query).sort([("created_at", -1), ("_id", -1)])  # type: ignore
+    if limit:
+        cursor = cursor.limit(limit + 1)
     events: List[Dict[str, Any]] = []
-    cursor = database.db.audit_events.find({"entity": entity, "entity_id": entity_id}).sort("created_at", -1)  # type: ignore
     async for doc in cursor:
-        doc["_id"] = str(doc["_id"])
         events.append(doc)
-    return events
+
+    page_full = limit is not None and len(events) > limit
+    if AUDIT_HOT_DAYS > 0 and not page_full:
+        cutoff = datetime.utcnow() - timedelta(days=AUDIT_HOT_DAYS)
+        after_bound = next((ts for op, ts, _ in bounds if op == "$gt"), None)
+        if after_bound is None or after_bound < cutoff:
+            seen = {doc["_id"] for doc in events}
+
+            def keep(doc: Dict[str, Any]) -> bool:
+                if doc["_id"] in seen or not _audit_in_bounds(doc, bounds):
+                    return False
+                if (action and doc.get("action") != action) or (user_id and doc.get("user_id") != user_id):
+                    return False
+                seen.add(doc["_id"])
+                return True
+
+            needed = limit + 1 - len(events) if limit else None
+            events.extend(await _get_archived_audits(entity, entity_id, bounds, keep, needed))
+            events.sort(key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+
+    next_cursor = None
+    if limit and len(events) > limit:
+        events = events[:limit]
+        next_cursor = _encode_time_cursor(events[-1]["created_at"], events[-1]["_id"])
+    for doc in events:
+        doc["_id"] = str(doc["_id"])
+    return events, next_cursor
 
 # --- Rank setters ---
-async def set_epic_rank(id: PyObjectId, new_rank: float) -> Optional[Epic]:
-    await database.db.epics.update_one({"_id": ObjectId(id)}, {"$set": {"rank": float(new_rank)}})  # type: ignore
+async def set_epic_rank(id: PyObjectId, new_rank: str) -> Optional[Epic]:
+    await database.db.epics.update_one({"_id": ObjectId(id)}, {"$set": {"rank": new_rank}})  # type: ignore
+    await collection_versions.bump("epics")
+    await event_hub.publish(event("epic", "updated", id, {"rank": new_rank}, epic_ids=[id]))
     return await get_epic(id)
 
-async def set_story_rank(id: PyObjectId, new_rank: float) -> Optional[Story]:
-    await database.db.stories.update_one({"_id": ObjectId(id)}, {"$set": {"rank": float(new_rank)}})  # type: ignore
+async def set_story_rank(id: PyObjectId, new_rank: str) -> Optional[Story]:
+    await database.db.stories.update_one({"_id": ObjectId(id)}, {"$set": {"rank": new_rank}})  # type: ignore
     return await get_story(id)
 
-async def set_task_rank(id: PyObjectId, new_rank: float) -> Optional[Task]:
-    await database.db.tasks.update_one({"_id": ObjectId(id)}, {"$set": {"rank": float(new_rank)}})  # type: ignore
+async def set_task_rank(id: PyObjectId, new_rank: str) -> Optional[Task]:
+    await database.db.tasks.update_one({"_id": ObjectId(id)}, {"$set": {"rank": new_rank}})  # type: ignore
     return await get_task(id)
 
-async def set_subtask_rank(id: PyObjectId, new_rank: float) -> Optional[Subtask]:
-    await database.db.subtasks.update_one({"_id": ObjectId(id)}, {"$set": {"rank": float(new_rank)}})  # type: ignore
+async def set_subtask_rank(id: PyObjectId, new_rank: str) -> Optional[Subtask]:
+    await database.db.subtasks.update_one({"_id": ObjectId(id)}, {"$set": {"rank": new_rank}})  # type: ignore
     return await get_subtask(id)
 # --- Epic CRUD ---
 async def create_epic(epic: EpicCreate) -> Epic:
     data = epic.model_dump()
+    data["rank"] = await next_rank("epics")
+    data["progress"] = EpicProgress().model_dump()
     result = await database.db.epics.insert_one(data)  # type: ignore
+    await collection_versions.bump("epics")
+    await event_hub.publish(event("epic", "created", result.inserted_id, {"title": data["title"], "rank": data["rank"]}, epic_ids=[result.inserted_id]))
     saved = {**data, "_id": str(result.inserted_id)}
     return Epic.model_validate(saved)
 
@@ -379,16 +1514,22 @@ async def get_epic(id: PyObjectId) -> Optional[Epic]:
 async def update_epic(id: PyObjectId, update_data: dict) -> Optional[Epic]:
     result = await database.db.epics.update_one({"_id": ObjectId(id)}, {"$set": update_data})  # type: ignore
     if result.matched_count:
+        await collection_versions.bump("epics")
+        await event_hub.publish(event("epic", "updated", id, update_data, epic_ids=[id]))
         return await get_epic(id)
     return None
 
 async def delete_epic(id: PyObjectId) -> bool:
     result = await database.db.epics.delete_one({"_id": ObjectId(id)})  # type: ignore
+    if result.deleted_count:
+        await collection_versions.bump("epics")
+        await event_hub.publish(event("epic", "deleted", id, epic_ids=[id]))
     return result.deleted_count > 0
 
 # --- Story CRUD ---
 async def create_story(story: StoryCreate) -> Story:
     data = story.model_dump()
+    data["rank"] = await next_rank("stories")
     result = await database.db.stories.insert_one(data)  # type: ignore
     saved = {**data, "_id": str(result.inserted_id)}
     return Story.model_validate(saved)
@@ -420,6 +1561,7 @@ async def delete_story(id: PyObjectId) -> bool:
 # --- Task CRUD ---
 async def create_task(task: TaskCreate) -> Task:
     data = task.model_dump()
+    data["rank"] = await next_rank("tasks")
     result = await database.db.tasks.insert_one(data)  # type: ignore
     saved = {**data, "_id": str(result.inserted_id)}
     return Task.model_validate(saved)
@@ -458,6 +1600,7 @@ async def delete_task(id: PyObjectId) -> bool:
 # --- Subtask CRUD ---
 async def create_subtask(subtask: SubtaskCreate) -> Subtask:
     data = subtask.model_dump()
+    data["rank"] = await next_rank("subtasks")
     result = await database.db.subtasks.insert_one(data)  # type: ignore
     saved = {**data, "_id": str(result.inserted_id)}
     return Subtask.model_validate(saved)
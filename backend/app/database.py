@@ -1,6 +1,11 @@
+import logging
+
 import motor.motor_asyncio
+from pymongo.errors import OperationFailure
 from os import environ
 
+logger = logging.getLogger(__name__)
+
 MONGO_URI = environ.get("MONGO_URI", "mongodb://localhost:27017/scrumdb")
 
 client = None
@@ -20,6 +25,26 @@ async def init_db():
         await db.backlog_items.create_index([("type", 1), ("status", 1)])  # type: ignore
         await db.backlog_items.create_index([("assignee", 1), ("status", 1)])  # type: ignore
         await db.backlog_items.create_index([("created_at", -1)])  # type: ignore
+        await db.backlog_items.create_index([("rank", 1), ("_id", 1)])  # type: ignore
+        # Reverse sprint membership: which sprint holds an item
+        await db.backlog_items.create_index([("sprint_id", 1)])  # type: ignore
+        # Change feed: items by change_seq, plus tombstones of deleted items
+        await db.backlog_items.create_index([("change_seq", 1)])  # type: ignore
+        await db.item_tombstones.create_index([("change_seq", 1)])  # type: ignore
+        # Search: weighted text index for ranked `q`, search_terms for type-ahead prefixes
+        await db.backlog_items.create_index([("search_terms", 1)])  # type: ignore
+        try:
+            await db.backlog_items.create_index(  # type: ignore
+                [("title", "text"), ("labels", "text"), ("acceptance_criteria", "text"), ("description", "text")],
+                name="item_text",
+                weights={"title": 10, "labels": 5, "acceptance_criteria": 2, "description": 1},
+            )
+        except OperationFailure:
+            logger.warning("backlog_items already has a different text index; drop it to enable weighted search")
+        # Daily burndown rows, one per sprint per day
+        await db.sprint_snapshots.create_index([("sprint_id", 1), ("day", 1)], unique=True)  # type: ignore
+        # Comment threads
+        await db.comments.create_index([("item_id", 1), ("created_at", 1), ("_id", 1)])  # type: ignore
         # Stories
         await db.stories.create_index([("epic_id", 1)])  # type: ignore
         await db.stories.create_index([("sprint_id", 1)])  # type: ignore
@@ -31,13 +56,47 @@ async def init_db():
         await db.tasks.create_index([("status", 1)])  # type: ignore
         await db.tasks.create_index([("rank", 1)])  # type: ignore
         # Subtasks
-        await db.subtasks.create_index([("parent_task_id", 1)])  # type: ignore
+        await db.subtasks.create_index([("parent_task_id", 1), ("rank", 1)])  # type: ignore
         await db.subtasks.create_index([("status", 1)])  # type: ignore
         await db.subtasks.create_index([("rank", 1)])  # type: ignore
+        # Planning Poker: one vote per user per session (create_vote upserts on this key)
+        try:
+            await db.votes.create_index([("session_id", 1), ("user_id", 1)], unique=True)  # type: ignore
+        except OperationFailure:
+            logger.warning("duplicate votes found; run `python -m app.migrations dedupe_votes` to add the unique index")
         # Audit events
-        await db.audit_events.create_index([("entity", 1)])  # type: ignore
-        await db.audit_events.create_index([("entity_id", 1)])  # type: ignore
-        await db.audit_events.create_index([("created_at", -1)])  # type: ignore
+        # Per-entity history, newest first; replaces the old single-field indexes
+        await db.audit_events.create_index([("entity", 1), ("entity_id", 1), ("created_at", -1), ("_id", -1)])  # type: ignore
+        for name in ("created_at_-1", "entity_1"):
+            await _drop_index(db.audit_events, name)
+        await _ensure_audit_ttl(db)
+        # Cold tier: compressed per-entity, per-month chunks
+        await db.audit_archive.create_index([("entity", 1), ("entity_id", 1), ("month", 1)])  # type: ignore
+
+async def _drop_index(collection, name: str):
+    try:
+        await collection.drop_index(name)
+    except OperationFailure:
+        pass  # never created, or already dropped
+
+async def _ensure_audit_ttl(db):
+    # local import: audit imports this module
+    from .audit import AUDIT_ARCHIVE_INTERVAL_SECONDS, AUDIT_HOT_DAYS, AUDIT_TTL_GRACE_DAYS
+    if AUDIT_HOT_DAYS <= 0 or AUDIT_ARCHIVE_INTERVAL_SECONDS <= 0:
+        # Retention or archiving disabled: plain time index only, so nothing expires unarchived
+        try:
+            await db.audit_events.create_index([("created_at", 1)])  # type: ignore
+        except OperationFailure:
+            # A TTL index from an earlier configuration; replace it
+            await _drop_index(db.audit_events, "created_at_1")
+            await db.audit_events.create_index([("created_at", 1)])  # type: ignore
+        return
+    expire = (AUDIT_HOT_DAYS + AUDIT_TTL_GRACE_DAYS) * 86400
+    try:
+        await db.audit_events.create_index([("created_at", 1)], expireAfterSeconds=expire)  # type: ignore
+    except OperationFailure:
+        # Index exists with other options (retention changed, or previously non-TTL): update in place
+        await db.command("collMod", "audit_events", index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": expire})  # type: ignore
 
 async def close_db():
     global client
@@ -0,0 +1,204 @@
+"""Live change events for board and backlog pages.
+
+crud publishes a small event after each item, sprint, epic and comment write
+("item.updated", "sprint.deleted", ...). Each event carries the topics it
+belongs to: "items"/"sprints"/"epics"/"comments" plus "sprint:<id>" and
+"epic:<id>" for the sprint and epic it touches (before and after a move).
+Subscribers pick topics, and every event reaches a subscriber at most once.
+
+Each subscriber has a pending map keyed by entity and id and is flushed at
+most every EVENTS_FLUSH_INTERVAL seconds. A burst of writes to one entity
+(drag-and-drop, bulk edits) therefore reaches a client as one event with
+the fields merged. A subscriber that falls more than EVENTS_MAX_PENDING
+entities behind gets an "overflow" event and is dropped; it should reload
+and reconnect. With PLANNING_BACKPLANE=mongo, events are relayed to the
+other workers the same way Planning Poker messages are.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from os import environ
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .backplane import PLANNING_BACKPLANE, Backplane, create_backplane
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FLUSH_INTERVAL = float(environ.get("EVENTS_FLUSH_INTERVAL", "0.25"))
+EVENTS_MAX_PENDING = int(environ.get("EVENTS_MAX_PENDING", "1000"))
+EVENTS_HEARTBEAT_SECONDS = float(environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_BACKPLANE_COLLECTION = environ.get("EVENTS_BACKPLANE_COLLECTION", "live_events")
+# Lifetime of the stream-scoped tokens EventSource clients pass as ?token=
+EVENTS_TOKEN_SECONDS = int(environ.get("EVENTS_TOKEN_SECONDS", "60"))
+
+ENTITY_TOPICS = {"item": "items", "sprint": "sprints", "epic": "epics", "comment": "comments"}
+
+
+def event(entity: str, action: str, id: Any, data: Optional[Dict[str, Any]] = None, sprint_ids: Iterable[Any] = (), epic_ids: Iterable[Any] = ()) -> Dict[str, Any]:
+    """Build an event; `sprint_ids`/`epic_ids` name the sprints and epics whose topics it goes to."""
+    topics = {ENTITY_TOPICS[entity]}
+    topics.update(f"sprint:{s}" for s in sprint_ids if s)
+    topics.update(f"epic:{e}" for e in epic_ids if e)
+    return {"type": f"{entity}.{action}", "id": str(id), "data": data or {}, "topics": sorted(topics)}
+
+
+def _merge(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    # created + updated stays created; anything + deleted is deleted
+    entity, old_action = old["type"].split(".", 1)
+    action = new["type"].split(".", 1)[1]
+    if action == "updated" and old_action == "created":
+        action = "created"
+    data = {} if action == "deleted" else {**old["data"], **new["data"]}
+    return {**new, "type": f"{entity}.{action}", "data": data}
+
+
+def _encode(evt: Dict[str, Any]) -> str:
+    body = {k: v for k, v in evt.items() if k != "topics"}
+    return f"event: {evt['type']}\ndata: {json.dumps(body, default=str)}\n\n"
+
+
+class Subscriber:
+    def __init__(self, topics: Set[str], max_pending: int = EVENTS_MAX_PENDING):
+        self.topics = topics
+        self.max_pending = max_pending
+        # (type prefix, id) -> (event, encoded text or None after a merge)
+        self.pending: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], Optional[str]]]" = OrderedDict()
+        self.wake = asyncio.Event()
+        self.overflowed = False
+        self.closed = False
+        self.coalesced = 0
+
+    def offer(self, evt: Dict[str, Any], text: str):
+        key = (evt["type"].split(".", 1)[0], evt["id"])
+        previous = self.pending.get(key)
+        if previous is not None:
+            self.pending[key] = (_merge(previous[0], evt), None)
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_pending:
+            self.overflowed = True
+        else:
+            self.pending[key] = (evt, text)
+        self.wake.set()
+
+    def drain(self) -> List[str]:
+        out = [text or _encode(evt) for evt, text in self.pending.values()]
+        self.pending.clear()
+        self.wake.clear()
+        return out
+
+    def close(self):
+        self.closed = True
+        self.wake.set()
+
+
+class EventHub:
+    def __init__(self, backplane: Optional[Backplane] = None):
+        self.backplane = backplane
+        self.origin = uuid.uuid4().hex
+        self._running = False
+        self.by_topic: Dict[str, Set[Subscriber]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    async def start(self):
+        if self.backplane is not None and not self._running:
+            await self.backplane.start(self._deliver)
+            self._running = True
+
+    async def stop(self):
+        if self._running:
+            await self.backplane.stop()  # type: ignore
+            self._running = False
+        for subscribers in list(self.by_topic.values()):
+            for sub in list(subscribers):
+                self.unsubscribe(sub)
+
+    def subscribe(self, topics: Set[str]) -> Subscriber:
+        sub = Subscriber(topics)
+        for topic in topics:
+            self.by_topic.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        for topic in sub.topics:
+            subscribers = self.by_topic.get(topic)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self.by_topic[topic]
+        sub.close()
+
+    async def publish(self, *events: Dict[str, Any]):
+        """Fan events out locally and, across workers, through the backplane (one message per call)."""
+        if not events:
+            return
+        self.published += len(events)
+        self._fan_out(events)
+        if self._running:
+            try:
+                await self.backplane.publish("events", {"origin": self.origin, "events": list(events)})  # type: ignore
+            except Exception:
+                logger.exception("event relay failed")
+
+    async def _deliver(self, channel: str, message: Dict[str, Any]):
+        # MongoBackplane also hands our own messages back; those were fanned out in publish()
+        if message.get("origin") != self.origin:
+            self._fan_out(message.get("events", []))
+
+    def _fan_out(self, events: Iterable[Dict[str, Any]]):
+        if not self.by_topic:
+            return
+        for evt in events:
+            targets: Set[Subscriber] = set()
+            for topic in evt["topics"]:
+                targets.update(self.by_topic.get(topic, ()))
+            if not targets:
+                continue
+            text = _encode(evt)  # once per event, not per subscriber
+            for sub in targets:
+                sub.offer(evt, text)
+                if sub.overflowed:
+                    self.dropped += 1
+                    self.unsubscribe(sub)
+
+    async def stream(self, sub: Subscriber, is_disconnected=None):
+        """SSE frames for one subscriber until it closes, overflows or the client goes away."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    await asyncio.wait_for(sub.wake.wait(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                if sub.overflowed:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                if sub.closed:
+                    return
+                # Give a burst time to coalesce before writing it out
+                await asyncio.sleep(EVENTS_FLUSH_INTERVAL)
+                frames = sub.drain()
+                if frames:
+                    yield "".join(frames)
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = {sub for subs in self.by_topic.values() for sub in subs}
+        return {
+            "subscribers": len(subscribers),
+            "topics": len(self.by_topic),
+            "published": self.published,
+            "dropped": self.dropped,
+            "coalesced": sum(sub.coalesced for sub in subscribers),
+        }
+
+
+event_hub = EventHub(
+    None if PLANNING_BACKPLANE == "memory" else create_backplane(PLANNING_BACKPLANE, EVENTS_BACKPLANE_COLLECTION)
+)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from os import environ
+from typing import List
+
+from . import crud
+from .audit import AUDIT_ARCHIVE_INTERVAL_SECONDS, AUDIT_HOT_DAYS
+from .search_index import ITEM_SEARCH_INDEX_REBUILD_SECONDS, item_search_index
+
+logger = logging.getLogger(__name__)
+
+# Set to "0" to keep the in-process scheduler from starting (e.g. when a separate worker runs it)
+SNAPSHOT_SCHEDULER_ENABLED = environ.get("SNAPSHOT_SCHEDULER_ENABLED", "1") != "0"
+# Seconds between scans for over-long ranks; "0" disables the rebalancer
+RANK_REBALANCE_INTERVAL_SECONDS = float(environ.get("RANK_REBALANCE_INTERVAL_SECONDS", "60"))
+# Seconds between epic progress reconciliations; "0" disables the reconciler
+EPIC_ROLLUP_RECONCILE_INTERVAL_SECONDS = float(environ.get("EPIC_ROLLUP_RECONCILE_INTERVAL_SECONDS", "900"))
+# Seconds between prunes of item tombstones older than CHANGES_TOMBSTONE_DAYS
+CHANGES_PRUNE_INTERVAL_SECONDS = float(environ.get("CHANGES_PRUNE_INTERVAL_SECONDS", "3600"))
+
+_tasks: List[asyncio.Task] = []
+
+
+def _seconds_until_next_day(now: datetime | None = None) -> float:
+    now = now or datetime.utcnow()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max((tomorrow - now).total_seconds(), 1.0)
+
+
+async def burndown_snapshot_job():
+    """Record one burndown row per sprint per UTC day (on startup, then after each midnight)."""
+    while True:
+        try:
+            await crud.snapshot_sprints()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("burndown snapshot failed")
+        await asyncio.sleep(_seconds_until_next_day())
+
+
+async def rank_rebalance_job():
+    """Periodically respace regions whose fractional ranks have grown too long."""
+    while True:
+        await asyncio.sleep(RANK_REBALANCE_INTERVAL_SECONDS)
+        try:
+            await crud.rebalance_dense_ranks()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("rank rebalance failed")
+
+
+async def audit_archive_job():
+    """Roll audit events past the hot window into the compressed archive."""
+    while True:
+        try:
+            await crud.archive_audits()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("audit archive failed")
+        await asyncio.sleep(AUDIT_ARCHIVE_INTERVAL_SECONDS)
+
+
+async def epic_rollup_reconcile_job():
+    """Repair epic progress counters that drifted from their items (on startup, then periodically)."""
+    while True:
+        try:
+            repaired = await crud.reconcile_epic_progress()
+            if repaired:
+                logger.info("reconciled progress of %d epics", repaired)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("epic roll-up reconcile failed")
+        await asyncio.sleep(EPIC_ROLLUP_RECONCILE_INTERVAL_SECONDS)
+
+
+async def tombstone_prune_job():
+    """Drop item tombstones past the change feed's retention window."""
+    while True:
+        try:
+            await crud.prune_item_tombstones()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("tombstone prune failed")
+        await asyncio.sleep(CHANGES_PRUNE_INTERVAL_SECONDS)
+
+
+async def item_search_index_rebuild_job():
+    """Rebuild the type-ahead index so writes from other workers show up."""
+    while True:
+        await asyncio.sleep(ITEM_SEARCH_INDEX_REBUILD_SECONDS)
+        try:
+            await item_search_index.rebuild()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("item search index rebuild failed")
+
+
+async def start_jobs():
+    # Legacy float ranks must be converted before anything compares them with string ranks
+    for collection in crud.RANKED_COLLECTIONS:
+        await crud.normalize_ranks(collection)
+    if SNAPSHOT_SCHEDULER_ENABLED:
+        _tasks.append(asyncio.create_task(burndown_snapshot_job()))
+    if RANK_REBALANCE_INTERVAL_SECONDS > 0:
+        _tasks.append(asyncio.create_task(rank_rebalance_job()))
+    if AUDIT_HOT_DAYS > 0 and AUDIT_ARCHIVE_INTERVAL_SECONDS > 0:
+        _tasks.append(asyncio.create_task(audit_archive_job()))
+    if EPIC_ROLLUP_RECONCILE_INTERVAL_SECONDS > 0:
+        _tasks.append(asyncio.create_task(epic_rollup_reconcile_job()))
+    if crud.CHANGES_TOMBSTONE_DAYS > 0 and CHANGES_PRUNE_INTERVAL_SECONDS > 0:
+        _tasks.append(asyncio.create_task(tombstone_prune_job()))
+    if item_search_index.enabled and ITEM_SEARCH_INDEX_REBUILD_SECONDS > 0:
+        _tasks.append(asyncio.create_task(item_search_index_rebuild_job()))
+
+
+async def stop_jobs():
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _tasks.clear()
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .routers import user, sprint, comment, planning, epics, subtasks, audits, items
+from .routers import user, sprint, comment, planning, epics, subtasks, audits, items, hierarchy, events
 from .database import init_db, close_db
+from .jobs import start_jobs, stop_jobs
+from .audit import audit_sink
+from .planning_state import planning_state
+from .search_index import item_search_index
+from .versions import collection_versions
+from .events import event_hub
 from dotenv import load_dotenv
 
 # Load environment variables from .env if present
@@ -13,8 +19,26 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await audit_sink.start()
+    await collection_versions.start()
+    await event_hub.start()
+    await start_jobs()
+    # One scan of backlog_items; runs after start_jobs has normalized legacy ranks
+    await item_search_index.start()
+    await planning_state.start()
+    await planning.manager.start()
     yield
     # Shutdown
+    await planning.manager.stop()
+    # Write queued votes and status changes
+    await planning_state.stop()
+    await stop_jobs()
+    await item_search_index.stop()
+    await collection_versions.stop()
+    # Ends open /events streams
+    await event_hub.stop()
+    # Drain queued audit events before the client goes away
+    await audit_sink.stop()
     await close_db()
 
 app = FastAPI(lifespan=lifespan)
@@ -31,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Change-Seq", "ETag"],
 )
 
 app.include_router(user.router)
@@ -40,4 +65,6 @@ app.include_router(planning.router)
 app.include_router(epics.router)
 app.include_router(items.router)
 app.include_router(subtasks.router)
-app.include_router(audits.router)
\ No newline at end of file
+app.include_router(audits.router)
+app.include_router(hierarchy.router)
+app.include_router(events.router)
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""One-off data migrations.
+
+Run from the backend directory, e.g.:
+
+    python -m app.migrations backfill_usernames
+"""
+import asyncio
+import sys
+from typing import Dict
+
+from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
+
+from . import database
+from .crud import _search_terms, _stamped_item_updates
+from .user_directory import user_directory
+
+_MISSING_USERNAME = {"username": {"$in": [None, ""]}, "user_id": {"$nin": [None, ""]}}
+
+
+async def backfill_usernames() -> Dict[str, int]:
+    """Write `username` into legacy comments and votes so reads never need a users join."""
+    updated: Dict[str, int] = {}
+    for collection in ("comments", "votes"):
+        coll = database.db[collection]  # type: ignore
+        user_ids = await coll.distinct("user_id", _MISSING_USERNAME)
+        names = await user_directory.resolve(user_ids)
+        ops = [
+            UpdateMany({**_MISSING_USERNAME, "user_id": uid}, {"$set": {"username": names[str(uid)]}})
+            for uid in user_ids
+            if str(uid) in names
+        ]
+        modified = 0
+        if ops:
+            result = await coll.bulk_write(ops, ordered=False)
+            modified = result.modified_count
+        updated[collection] = modified
+    return updated
+
+
+async def dedupe_votes() -> Dict[str, int]:
+    """Keep only the latest vote per (session, user), recount sessions, then add the unique index."""
+    pipeline = [
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$group": {"_id": {"session_id": "$session_id", "user_id": "$user_id"}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ]
+    stale = []
+    sessions = set()
+    async for group in database.db.votes.aggregate(pipeline, allowDiskUse=True):  # type: ignore
+        stale.extend(group["ids"][1:])
+        sessions.add(group["_id"]["session_id"])
+    removed = 0
+    if stale:
+        removed = (await database.db.votes.delete_many({"_id": {"$in": stale}})).deleted_count  # type: ignore
+    for session_id in sessions:
+        count = await database.db.votes.count_documents({"session_id": session_id})  # type: ignore
+        await database.db.planning_sessions.update_one({"_id": session_id}, {"$set": {"vote_count": count}})  # type: ignore
+    await database.db.votes.create_index([("session_id", 1), ("user_id", 1)], unique=True)  # type: ignore
+    return {"votes": removed, "planning_sessions": len(sessions)}
+
+
+async def backfill_item_sprint_ids() -> Dict[str, int]:
+    """Set `sprint_id` on items from the sprints' legacy `backlog_items` arrays (last sprint wins).
+
+    The arrays are dropped afterwards: membership is read from `sprint_id`, and
+    a second run must not move items back to where the arrays last had them.
+    """
+    ops = []
+    async for sprint in database.db.sprints.find({"backlog_items": {"$exists": True}}, {"backlog_items": 1}).sort("_id", 1):  # type: ignore
+        oids = [ObjectId(str(i)) for i in sprint.get("backlog_items", []) if ObjectId.is_valid(str(i))]
+        if oids:
+            ops.append(UpdateMany({"_id": {"$in": oids}}, {"$set": {"sprint_id": str(sprint["_id"])}}))
+    modified = 0
+    if ops:
+        modified = (await database.db.backlog_items.bulk_write(ops, ordered=True)).modified_count  # type: ignore
+    dropped = (await database.db.sprints.update_many({"backlog_items": {"$exists": True}}, {"$unset": {"backlog_items": ""}})).modified_count  # type: ignore
+    return {"backlog_items": modified, "sprints": dropped}
+
+
+async def backfill_search_terms() -> Dict[str, int]:
+    """Fill `search_terms` (type-ahead prefixes) on items written before the field existed."""
+    ops = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": _search_terms(doc)}})
+        async for doc in database.db.backlog_items.find({"search_terms": {"$exists": False}}, {"title": 1, "labels": 1})  # type: ignore
+    ]
+    modified = 0
+    if ops:
+        modified = (await database.db.backlog_items.bulk_write(ops, ordered=False)).modified_count  # type: ignore
+    return {"backlog_items": modified}
+
+
+async def backfill_change_seq() -> Dict[str, int]:
+    """Give items written before the change feed existed a change_seq, in backlog order."""
+    ids = [
+        doc["_id"]
+        async for doc in database.db.backlog_items.find({"change_seq": {"$exists": False}}, {"_id": 1}).sort([("rank", 1), ("_id", 1)])  # type: ignore
+    ]
+    modified = 0
+    if ids:
+        ops = await _stamped_item_updates([({"_id": oid, "change_seq": {"$exists": False}}, {}) for oid in ids])
+        modified = (await database.db.backlog_items.bulk_write(ops, ordered=False)).modified_count  # type: ignore
+    return {"backlog_items": modified}
+
+
+MIGRATIONS = {
+    "backfill_usernames": backfill_usernames,
+    "dedupe_votes": dedupe_votes,
+    "backfill_item_sprint_ids": backfill_item_sprint_ids,
+    "backfill_search_terms": backfill_search_terms,
+    "backfill_change_seq": backfill_change_seq,
+}
+
+
+async def _main(name: str):
+    await database.init_db()
+    try:
+        print(name, await MIGRATIONS[name]())
+    finally:
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in MIGRATIONS:
+        print(f"usage: python -m app.migrations [{'|'.join(MIGRATIONS)}]")
+        sys.exit(2)
+    asyncio.run(_main(sys.argv[1]))
@@ -1,11 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
 from pydantic.functional_validators import BeforeValidator
 from typing_extensions import Annotated
 from datetime import datetime
 
 PyObjectId = Annotated[str, BeforeValidator(lambda v: str(v))]
+# Fractional-index rank (see utils/rank.py); legacy numeric ranks are stringified until normalized
+Rank = Annotated[str, BeforeValidator(lambda v: "" if v is None else str(v))]
 
 class User(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -25,9 +27,13 @@ class BacklogItem(BaseModel):
     priority: int | str | None = "medium"
     story_points: Optional[int] = None
     assignee: Optional[PyObjectId] = None
-    rank: float = 0.0
+    rank: Rank = ""
     epic_id: Optional[PyObjectId] = None
+    # Sprint currently holding the item; maintained by crud.move_items_to_sprint
+    sprint_id: Optional[PyObjectId] = None
     acceptance_criteria: List[str] = []
+    # Position in the backlog change feed (GET /items/changes); bumped on every write
+    change_seq: Optional[int] = None
     # Timestamps (optional to maintain backward-compat with existing data)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -47,6 +53,14 @@ class Comment(BaseModel):
     created_at: datetime
 
 # --- Hierarchy models ---
+class EpicProgress(BaseModel):
+    # Maintained by crud from the epic's items; see apply_item_changes_to_epics
+    total_points: int = 0
+    done_points: int = 0
+    item_count: int = 0
+    by_status: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+
 class Epic(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
     title: str
@@ -55,7 +69,8 @@ class Epic(BaseModel):
     assignee: Optional[PyObjectId] = None
     story_points: int = 0  # roll-up or target
     status: str = "todo"  # todo, in_progress, done
-    rank: float = 0.0
+    rank: Rank = ""
+    progress: EpicProgress = EpicProgress()
 
 class Story(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -69,7 +84,7 @@ class Story(BaseModel):
     status: str = "todo"
     sprint_id: Optional[PyObjectId] = None
     cross_sprint: bool = False
-    rank: float = 0.0
+    rank: Rank = ""
 
 class Task(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -81,7 +96,7 @@ class Task(BaseModel):
     story_points: int = 0
     status: str = "todo"
     sprint_id: Optional[PyObjectId] = None
-    rank: float = 0.0
+    rank: Rank = ""
 
 class Subtask(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -92,7 +107,7 @@ class Subtask(BaseModel):
     assignee: Optional[PyObjectId] = None
     story_points: int = 0
     status: str = "todo"
-    rank: float = 0.0
+    rank: Rank = ""
 
 # --- Audit model ---
 class AuditEvent(BaseModel):
@@ -110,6 +125,7 @@ class PlanningSession(BaseModel):
     created_by: PyObjectId
     status: str = "voting"  # voting, revealed, completed
     scale: str = "fibonacci"  # fibonacci, modified_fibonacci, t_shirt
+    vote_count: int = 0  # maintained by create_vote
     created_at: datetime
 
 class Vote(BaseModel):
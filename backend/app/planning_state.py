@@ -0,0 +1,262 @@
+"""In-process state for live Planning Poker sessions.
+
+The engine owns status, scale and votes of recently used sessions, validates
+votes and status transitions in memory, and persists changes write-behind
+through a single ordered queue (so a reveal is never stored before the votes
+it revealed). A miss, an expired entry or a restart rehydrates the session
+from Mongo. Each worker keeps its own copy. With PLANNING_BACKPLANE=mongo,
+votes and status changes are relayed to the other workers and applied to
+their cached copies, so a reveal on one worker stops votes on every worker
+within milliseconds; PLANNING_STATE_TTL_SECONDS bounds how long a copy can
+drift if a relayed change is lost.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from os import environ
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from . import crud
+from .backplane import PLANNING_BACKPLANE, Backplane, create_backplane
+
+logger = logging.getLogger(__name__)
+
+PLANNING_STATE_MAX_SESSIONS = int(environ.get("PLANNING_STATE_MAX_SESSIONS", "1000"))
+PLANNING_STATE_TTL_SECONDS = float(environ.get("PLANNING_STATE_TTL_SECONDS", "300"))
+# Writes allowed to wait for the write-behind task before new changes block on it
+PLANNING_STATE_MAX_PENDING_WRITES = int(environ.get("PLANNING_STATE_MAX_PENDING_WRITES", "10000"))
+PLANNING_STATE_BACKPLANE_COLLECTION = environ.get("PLANNING_STATE_BACKPLANE_COLLECTION", "planning_state")
+
+SCALES = {
+    "fibonacci": ["0", "0.5", "1", "2", "3", "5", "8", "13", "21", "?", "coffee"],
+    "modified_fibonacci": ["0", "0.5", "1", "2", "3", "5", "8", "13", "20", "40", "100", "?", "coffee"],
+    "t_shirt": ["XS", "S", "M", "L", "XL", "XXL", "?", "coffee"],
+}
+
+# status -> statuses it may move to
+TRANSITIONS = {
+    "voting": {"revealed", "completed"},
+    "revealed": {"completed"},
+    "completed": set(),
+}
+
+
+def valid_values_for_scale(scale: str) -> List[str]:
+    return SCALES.get(scale, SCALES["fibonacci"])
+
+
+class SessionState:
+    def __init__(self, session, votes):
+        self.id = str(session.id)
+        self.story_id = str(session.story_id)
+        self.created_by = str(session.created_by)
+        self.status = session.status
+        self.scale = session.scale
+        self.created_at = session.created_at
+        # user_id -> vote dict, in first-vote order
+        self.votes: Dict[str, Dict[str, Any]] = {
+            str(v.user_id): {
+                "id": str(v.id),
+                "session_id": self.id,
+                "user_id": str(v.user_id),
+                "username": v.username,
+                "value": v.value,
+                "created_at": v.created_at,
+            }
+            for v in votes
+        }
+        self.loaded_at = time.monotonic()
+
+    @property
+    def vote_count(self) -> int:
+        return len(self.votes)
+
+
+class PlanningStateEngine:
+    def __init__(
+        self,
+        max_sessions: int = PLANNING_STATE_MAX_SESSIONS,
+        ttl: float = PLANNING_STATE_TTL_SECONDS,
+        max_pending_writes: int = PLANNING_STATE_MAX_PENDING_WRITES,
+        backplane: Optional[Backplane] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_pending_writes = max_pending_writes
+        self.backplane = backplane
+        self.origin = uuid.uuid4().hex
+        self._relaying = False
+        self.sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.persisted = 0
+        self.failed = 0
+        self.relayed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_pending_writes)
+        self._task = asyncio.create_task(self._run())
+        if self.backplane is not None and not self._relaying:
+            await self.backplane.start(self._deliver)
+            self._relaying = True
+
+    async def stop(self):
+        if self._task is None:
+            return
+        if self._relaying:
+            await self.backplane.stop()  # type: ignore
+            self._relaying = False
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.sessions.clear()
+
+    async def flush(self):
+        """Wait until every change made so far has been written."""
+        if self.running:
+            await self.queue.join()  # type: ignore
+
+    def evict(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        state = self.sessions.get(session_id)
+        if state is not None and time.monotonic() - state.loaded_at < self.ttl:
+            self.hits += 1
+            self.sessions.move_to_end(session_id)
+            return state
+        self.misses += 1
+        # One load per session even when several requests miss at once
+        task = self._loading.get(session_id)
+        if task is None:
+            task = asyncio.create_task(self._load(session_id))
+            self._loading[session_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(session_id, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, session_id: str) -> Optional[SessionState]:
+        if self.running and not self.queue.empty():  # type: ignore
+            # Don't read back a session whose writes are still queued
+            await self.flush()
+        session = await crud.get_planning_session(session_id)
+        if session is None:
+            self.evict(session_id)
+            return None
+        state = SessionState(session, await crud.get_votes_for_session(session_id))
+        self.sessions[session_id] = state
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return state
+
+    async def vote(self, session_id: str, user_id: str, value: str, username: Optional[str] = None) -> Tuple[SessionState, Dict[str, Any]]:
+        """Record (or replace) a user's vote; raises LookupError or ValueError."""
+        state = await self.get(session_id)
+        if state is None:
+            raise LookupError("Planning session not found")
+        if state.status != "voting":
+            raise ValueError("Session is not in voting state")
+        if value not in valid_values_for_scale(state.scale):
+            raise ValueError(f"Invalid vote value for {state.scale} scale")
+        vote = state.votes.get(user_id)
+        if vote is None:
+            vote = state.votes[user_id] = {"id": str(ObjectId()), "session_id": session_id, "user_id": user_id}
+        vote.update({"value": value, "created_at": datetime.utcnow()})
+        if username:
+            vote["username"] = username
+        await self._persist(crud.create_vote, session_id, user_id, value, username, vote_id=vote["id"])
+        await self._relay({"session_id": session_id, "vote": vote})
+        return state, vote
+
+    async def transition(self, session_id: str, status: str) -> SessionState:
+        """Move a session to `status`; raises LookupError or ValueError."""
+        state = await self.get(session_id)
+        if state is None:
+            raise LookupError("Planning session not found")
+        if status not in TRANSITIONS.get(state.status, set()):
+            raise ValueError(f"Cannot move session from {state.status} to {status}")
+        state.status = status
+        await self._persist(crud.update_session_status, session_id, status)
+        await self._relay({"session_id": session_id, "status": status})
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "sessions": len(self.sessions),
+            "pending_writes": self.queue.qsize() if self.queue is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "persisted": self.persisted,
+            "failed": self.failed,
+            "relayed": self.relayed,
+        }
+
+    async def _relay(self, message: Dict[str, Any]):
+        if self._relaying:
+            try:
+                await self.backplane.publish("planning_state", {"origin": self.origin, **message})  # type: ignore
+            except Exception:
+                logger.exception("planning state relay failed")
+
+    async def _deliver(self, channel: str, message: Dict[str, Any]):
+        # Apply a peer's change to our cached copy; uncached sessions load fresh anyway
+        if message.get("origin") == self.origin:
+            return
+        state = self.sessions.get(message.get("session_id", ""))
+        if state is None:
+            return
+        self.relayed += 1
+        status = message.get("status")
+        if status is not None:
+            if status in TRANSITIONS.get(state.status, set()):
+                state.status = status
+            return
+        vote = message.get("vote")
+        if vote is not None and state.status == "voting":
+            state.votes.setdefault(vote["user_id"], {}).update(vote)
+
+    async def _persist(self, fn: Callable, *args, **kwargs):
+        if not self.running:
+            # Scripts and tests without the app lifespan write through
+            await fn(*args, **kwargs)
+            return
+        # Blocks once max_pending_writes are queued, so Mongo trouble can't grow memory unbounded
+        await self.queue.put((fn, args, kwargs))  # type: ignore
+
+    async def _run(self):
+        while True:
+            fn, args, kwargs = await self.queue.get()  # type: ignore
+            try:
+                await fn(*args, **kwargs)
+                self.persisted += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("planning state write failed")
+                # Memory may now be ahead of Mongo; reload the session next time
+                self.evict(str(args[0]))
+            finally:
+                self.queue.task_done()  # type: ignore
+
+
+planning_state = PlanningStateEngine(
+    backplane=None if PLANNING_BACKPLANE == "memory" else create_backplane(PLANNING_BACKPLANE, PLANNING_STATE_BACKPLANE_COLLECTION)
+)
@@ -1,13 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Dict, Any, Optional
 
 from ..crud import get_audits
-from ..utils.auth import get_current_user
+from ..audit import audit_sink
+from ..utils.auth import get_current_user, require_roles
 
 router = APIRouter(prefix="/audits", tags=["audits"])
 
 @router.get("/")
-async def read_audits(entity: str, entity_id: str, current_user: dict = Depends(get_current_user)) -> List[Dict[str, Any]]:
+async def read_audits(
+    entity: str,
+    entity_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    action: Optional[str] = None,
+    user_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+) -> List[Dict[str, Any]]:
     if not entity or not entity_id:
         raise HTTPException(status_code=400, detail="entity and entity_id are required")
-    return await get_audits(entity, entity_id)
+    try:
+        events, next_cursor = await get_audits(entity, entity_id, limit=limit, before=before, after=after, action=action, user_id=user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Pass as `before` to get the next (older) page
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return events
+
+@router.get("/stats")
+async def read_audit_stats(current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))) -> Dict[str, Any]:
+    return audit_sink.stats()
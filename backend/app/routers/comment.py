@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from ..crud import create_comment, get_comments_for_item, get_comment, delete_comment, update_comment
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from ..crud import create_comment, get_comments_for_item, get_comment, delete_comment, update_comment, get_comment_counts
 from ..schemas import CommentCreate, CommentResponse, CommentUpdate
 from ..models import PyObjectId
-from typing import List
+from typing import Dict, List, Optional
 from ..utils.auth import get_current_user
 
 router = APIRouter(prefix="/comments", tags=["comments"])
@@ -15,9 +15,29 @@ async def add_comment(comment: CommentCreate, current_user: dict = Depends(get_c
     username = current_user.get("username")
     return await create_comment(comment, user_id, username)
 
+@router.get("/counts", response_model=Dict[str, int])
+async def get_counts(item_ids: str, current_user: dict = Depends(get_current_user)):
+    # item_ids: comma-separated
+    ids = [i.strip() for i in item_ids.split(",") if i.strip()]
+    if len(ids) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 item_ids per request")
+    return await get_comment_counts(ids)
+
 @router.get("/{item_id}", response_model=List[CommentResponse])
-async def get_comments(item_id: PyObjectId, current_user: dict = Depends(get_current_user)):
-    return await get_comments_for_item(item_id)
+async def get_comments(
+    item_id: PyObjectId,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    try:
+        comments, next_cursor = await get_comments_for_item(item_id, limit=limit, after=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return comments
 
 @router.delete("/{comment_id}")
 async def remove_comment(comment_id: PyObjectId, current_user: dict = Depends(get_current_user)):
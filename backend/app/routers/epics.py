@@ -9,9 +9,12 @@ from ..crud import (
     delete_epic,
     set_epic_rank,
     log_audit,
+    resolve_rank,
 )
 from ..schemas import EpicCreate, EpicResponse
 from ..utils.auth import get_current_user, require_roles
+from ..utils.rank import is_valid_rank
+from ..versions import conditional
 
 router = APIRouter(prefix="/epics", tags=["epics"])
 
@@ -19,11 +22,11 @@ router = APIRouter(prefix="/epics", tags=["epics"])
 async def create(item: EpicCreate, current_user: dict = Depends(require_roles('product_owner'))):
     return await create_epic(item)
 
-@router.get("/", response_model=List[EpicResponse])
+@router.get("/", response_model=List[EpicResponse], dependencies=[conditional("epics")])
 async def read_all(current_user: dict = Depends(get_current_user)):
     return await get_epics()
 
-@router.get("/{item_id}", response_model=EpicResponse)
+@router.get("/{item_id}", response_model=EpicResponse, dependencies=[conditional("epics")])
 async def read_one(item_id: str, current_user: dict = Depends(get_current_user)):
     item = await get_epic(item_id)
     if not item:
@@ -53,14 +56,15 @@ async def delete(item_id: str, current_user: dict = Depends(require_roles('produ
 
 @router.patch("/{item_id}/rank", response_model=EpicResponse)
 async def set_rank(item_id: str, body: dict, current_user: dict = Depends(require_roles('product_owner'))):
+    # body: { "after_id": "<id|null>", "before_id": "<id|null>" } or { "rank": "<rank>" }
     try:
-        new_rank = float(body.get("rank"))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid rank")
+        new_rank = await resolve_rank("epics", item_id, body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     item = await set_epic_rank(item_id, new_rank)
     if not item:
         raise HTTPException(status_code=404, detail="Epic not found")
-    await log_audit(current_user["id"], "epic", item_id, "reorder", {"rank": new_rank})
+    await log_audit(current_user["id"], "epic", item_id, "reorder", {**body, "rank": new_rank})
     return item
 
 @router.patch("/{item_id}/bulk", response_model=EpicResponse)
@@ -71,6 +75,8 @@ async def bulk_update(item_id: str, body: dict, current_user: dict = Depends(req
     invalid = set(body.keys()) - allowed
     if invalid:
         raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(invalid))}")
+    if "rank" in body and not is_valid_rank(body["rank"]):
+        raise HTTPException(status_code=400, detail="Invalid rank")
     item = await update_epic(item_id, body)
     if not item:
         raise HTTPException(status_code=404, detail="Epic not found")
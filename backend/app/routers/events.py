@@ -0,0 +1,67 @@
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional
+
+from ..events import event_hub, ENTITY_TOPICS, EVENTS_TOKEN_SECONDS
+from ..utils.auth import create_access_token, get_current_user, require_roles, resolve_principal
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+async def _principal(request: Request, token: Optional[str] = None) -> Dict[str, Any]:
+    # EventSource can't set headers, so it passes a short-lived stream token as ?token=
+    # (from POST /events/token); URLs end up in access logs, so the regular JWT is
+    # only accepted in the Authorization header.
+    header = request.headers.get("authorization", "")
+    if token:
+        user = await resolve_principal(token, scope="events")
+    elif header.lower().startswith("bearer "):
+        user = await resolve_principal(header[7:])
+    else:
+        user = None
+    if user is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return user
+
+
+def _ids(csv: Optional[str]) -> list:
+    return [i.strip() for i in csv.split(",") if i.strip()] if csv else []
+
+
+@router.post("/token")
+async def issue_stream_token(current_user: dict = Depends(get_current_user)) -> Dict[str, Any]:
+    """A token that only opens /events, valid for EVENTS_TOKEN_SECONDS (checked at connect)."""
+    token = create_access_token(
+        {"sub": current_user["username"], "id": current_user["id"], "scope": "events"},
+        expires_delta=timedelta(seconds=EVENTS_TOKEN_SECONDS),
+    )
+    return {"token": token, "expires_in": EVENTS_TOKEN_SECONDS}
+
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    sprint_id: Optional[str] = None,
+    epic_id: Optional[str] = None,
+    current_user: dict = Depends(_principal),
+):
+    """Server-Sent Events for item, sprint, epic and comment writes.
+
+    `sprint_id`/`epic_id` (comma-separated) narrow the stream to those sprints
+    and epics; with neither, every event is sent.
+    """
+    topics = {f"sprint:{i}" for i in _ids(sprint_id)} | {f"epic:{i}" for i in _ids(epic_id)}
+    if not topics:
+        topics = set(ENTITY_TOPICS.values())
+    sub = event_hub.subscribe(topics)
+    return StreamingResponse(
+        event_hub.stream(sub, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def read_event_stats(current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))) -> Dict[str, Any]:
+    return event_hub.stats()
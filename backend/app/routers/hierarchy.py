@@ -0,0 +1,44 @@
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from ..crud import iter_hierarchy
+from ..utils.auth import get_current_user
+
+router = APIRouter(prefix="/hierarchy", tags=["hierarchy"])
+
+@router.get("/")
+async def read_hierarchy(
+    epic_ids: Optional[str] = Query(None, description="Comma-separated epic ids"),
+    sprint_id: Optional[str] = None,
+    status: Optional[str] = None,
+    depth: int = Query(3, ge=1, le=3),
+    stream: bool = Query(False, description="Send one epic per line (NDJSON) as the tree is built"),
+    current_user: dict = Depends(get_current_user),
+):
+    ids: Optional[List[str]] = [e for e in epic_ids.split(",") if e] if epic_ids else None
+    nodes = iter_hierarchy(ids, sprint_id, status, depth)
+    if stream:
+        # Resolve the sprint before the 200 goes out, so a bad id can still 404
+        try:
+            first = await anext(nodes)
+        except StopAsyncIteration:
+            first = None
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        async def lines():
+            if first is None:
+                return
+            yield json.dumps(jsonable_encoder(first)) + "\n"
+            async for node in nodes:
+                yield json.dumps(jsonable_encoder(node)) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    try:
+        return [node async for node in nodes]
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,46 +1,171 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional
 
 from ..crud import (
     create_backlog_item,
-    get_backlog_items_filtered,
+    get_backlog_items_page,
+    search_backlog_items,
+    get_backlog_item_changes,
+    get_settled_change_seq,
+    ITEM_FIELDS,
     get_backlog_item,
     update_backlog_item,
     delete_backlog_item,
     log_audit,
+    resolve_rank,
+    bulk_update_backlog_items,
+    bulk_update_backlog_items_matching,
+    log_audits,
 )
-from ..schemas import ItemCreate, ItemUpdate, ItemResponse
+from ..search_index import SUGGEST_FIELDS, item_search_index
+from ..schemas import ItemType, ItemCreate, ItemUpdate, ItemResponse, ItemListEntry, ItemBulkUpdate, ItemBulkUpdateResponse, ItemChanges
 from ..utils.auth import get_current_user, require_roles
+from ..utils.rank import is_valid_rank
+from ..versions import conditional
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+BULK_FIELDS = {"type", "title", "description", "status", "labels", "priority", "story_points", "assignee", "rank", "epic_id", "acceptance_criteria"}
+BULK_FILTERS = {"type", "status", "epic_id", "sprint_id", "assignee", "q"}
+BULK_MAX_ITEMS = 1000
+_item_type = TypeAdapter(ItemType)
+
+def _check_bulk_changes(changes: dict) -> dict:
+    """Validate a bulk change set like a single-item update; returns the coerced values."""
+    if not isinstance(changes, dict) or not changes:
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    invalid = set(changes.keys()) - BULK_FIELDS
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(invalid))}")
+    try:
+        checked = ItemUpdate.model_validate({k: v for k, v in changes.items() if k != "type"}).model_dump(exclude_unset=True)
+        if "type" in changes:
+            checked["type"] = _item_type.validate_python(changes["type"])
+    except ValidationError as e:
+        fields = sorted({str(err["loc"][0]) if err["loc"] else "type" for err in e.errors()})
+        raise HTTPException(status_code=400, detail=f"Invalid values: {', '.join(fields)}")
+    if "rank" in checked and not is_valid_rank(checked["rank"]):
+        raise HTTPException(status_code=400, detail="Invalid rank")
+    return checked
+
 @router.post("/", response_model=ItemResponse)
 async def create_item(item: ItemCreate, current_user: dict = Depends(require_roles('product_owner'))):
+    if item.rank is not None and not is_valid_rank(item.rank):
+        raise HTTPException(status_code=400, detail="Invalid rank")
     created = await create_backlog_item(item)
     await log_audit(current_user["id"], "item", created.id, "create", item.model_dump())
     # Convert to response model (shared shape with models.BacklogItem)
     return ItemResponse.model_validate(created.model_dump())
 
-@router.get("/", response_model=List[ItemResponse])
+@router.get("/", response_model=List[ItemListEntry], response_model_exclude_unset=True, dependencies=[conditional("backlog_items")])
 async def list_items(
+    response: Response,
     type: Optional[str] = None,
     epic_id: Optional[str] = None,
+    sprint_id: Optional[str] = None,
     status: Optional[str] = None,
     assignee: Optional[str] = None,
     q: Optional[str] = None,
+    q_mode: str = Query("contains", pattern="^(contains|text)$"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
 ):
     filters = {k: v for k, v in {
         "type": type,
         "epic_id": epic_id,
+        "sprint_id": sprint_id,
         "status": status,
         "assignee": assignee,
         "q": q,
     }.items() if v is not None}
-    items = await get_backlog_items_filtered(filters)
-    return [ItemResponse.model_validate(i.model_dump()) for i in items]
+    projection = None
+    if fields:
+        projection = [f.strip() for f in fields.split(",") if f.strip()]
+        invalid = set(projection) - ITEM_FIELDS
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(invalid))}")
+    if q and q_mode == "text":
+        # Relevance-ranked top matches; no cursor
+        return await search_backlog_items(filters, limit=limit or 50, fields=projection)
+    if cursor is None:
+        # Where a client that keeps this list current should start GET /items/changes
+        response.headers["X-Change-Seq"] = str(await get_settled_change_seq())
+    try:
+        items, next_cursor = await get_backlog_items_page(filters, limit=limit, after=cursor, fields=projection)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Continuation token travels in a header so the body stays a plain list
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.patch("/bulk", response_model=ItemBulkUpdateResponse)
+async def bulk_update_items(body: ItemBulkUpdate, current_user: dict = Depends(require_roles('product_owner'))):
+    if body.updates is not None:
+        if body.filter is not None or body.changes is not None:
+            raise HTTPException(status_code=400, detail="Use either updates or filter+changes")
+        if len(body.updates) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} updates per request")
+        # One entry per item: duplicates would each be applied against the same pre-image
+        seen, duplicates = set(), set()
+        for u in body.updates:
+            (duplicates if u.id in seen else seen).add(u.id)
+        if duplicates:
+            raise HTTPException(status_code=400, detail=f"Duplicate ids: {', '.join(sorted(duplicates))}")
+        updates = [(u.id, _check_bulk_changes(u.changes)) for u in body.updates]
+        results = await bulk_update_backlog_items(updates)
+        changes_by_id = dict(updates)
+    else:
+        if not body.filter or body.changes is None:
+            raise HTTPException(status_code=400, detail="Invalid payload")
+        invalid = set(body.filter.keys()) - BULK_FILTERS
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid filters: {', '.join(sorted(invalid))}")
+        changes = _check_bulk_changes(body.changes)
+        try:
+            results = await bulk_update_backlog_items_matching(body.filter, changes, limit=BULK_MAX_ITEMS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        changes_by_id = {r["id"]: changes for r in results}
+    applied = [r for r in results if r["ok"]]
+    await log_audits(current_user["id"], "item", "bulk_update", [(r["id"], changes_by_id[r["id"]]) for r in applied])
+    return {"matched": len(applied), "results": results}
+
+@router.get("/changes", response_model=ItemChanges)
+async def item_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+):
+    # since=0 is a full load; afterwards pass back the returned seq
+    try:
+        return await get_backlog_item_changes(since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+@router.get("/search/suggest", response_model=List[ItemListEntry], response_model_exclude_unset=True)
+async def suggest_items(
+    q: str,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    epic_id: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+):
+    # Answered from memory; without the index, fall back to the ranked Mongo search
+    if item_search_index.ready:
+        return item_search_index.suggest(q, limit=limit, type=type, status=status, epic_id=epic_id)
+    filters = {k: v for k, v in {"type": type, "status": status, "epic_id": epic_id, "q": q}.items() if v is not None}
+    return await search_backlog_items(filters, limit=limit, fields=list(SUGGEST_FIELDS))
 
-@router.get("/{item_id}", response_model=ItemResponse)
+@router.get("/search/stats")
+async def read_search_stats(current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))) -> Dict[str, Any]:
+    return item_search_index.stats()
+
+@router.get("/{item_id}", response_model=ItemResponse, dependencies=[conditional("backlog_items")])
 async def read_item(item_id: str, current_user: dict = Depends(get_current_user)):
     item = await get_backlog_item(item_id)
     if not item:
@@ -56,6 +181,8 @@ async def update_item(item_id: str, update: ItemUpdate, current_user: dict = Dep
     allowed = {"developer", "scrum_master", "product_owner"} if status_only else {"product_owner"}
     if role not in allowed:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if "rank" in data and not is_valid_rank(data["rank"]):
+        raise HTTPException(status_code=400, detail="Invalid rank")
     saved = await update_backlog_item(item_id, data)
     if not saved:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -76,24 +203,20 @@ async def delete_item(item_id: str, current_user: dict = Depends(require_roles('
 
 @router.post("/{item_id}/rank", response_model=ItemResponse)
 async def set_rank(item_id: str, body: dict, current_user: dict = Depends(require_roles('product_owner'))):
+    # body: { "after_id": "<id|null>", "before_id": "<id|null>" } or { "rank": "<rank>" }
     try:
-        new_rank = float(body.get("rank"))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid rank")
+        new_rank = await resolve_rank("backlog_items", item_id, body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     saved = await update_backlog_item(item_id, {"rank": new_rank})
     if not saved:
         raise HTTPException(status_code=404, detail="Item not found")
-    await log_audit(current_user["id"], "item", item_id, "reorder", {"rank": new_rank})
+    await log_audit(current_user["id"], "item", item_id, "reorder", {**body, "rank": new_rank})
     return ItemResponse.model_validate(saved.model_dump())
 
 @router.patch("/{item_id}/bulk", response_model=ItemResponse)
 async def bulk_update_item(item_id: str, body: dict, current_user: dict = Depends(require_roles('product_owner'))):
-    if not isinstance(body, dict) or not body:
-        raise HTTPException(status_code=400, detail="Invalid payload")
-    allowed = {"type", "title", "description", "status", "labels", "priority", "story_points", "assignee", "rank", "epic_id", "acceptance_criteria"}
-    invalid = set(body.keys()) - allowed
-    if invalid:
-        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(invalid))}")
+    body = _check_bulk_changes(body)
     saved = await update_backlog_item(item_id, body)
     if not saved:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -3,6 +3,10 @@ from fastapi import WebSocket, WebSocketDisconnect
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from collections import deque
+import asyncio
+import json
+import os
 
 from ..models import PlanningSession, Vote
 from ..schemas import (
@@ -10,71 +14,148 @@ from ..schemas import (
     VoteCreate, VoteResponse, SessionRevealResponse, EstimateUpdate
 )
 from ..crud import (
-    create_planning_session, get_planning_session, get_planning_sessions_for_story,
-    create_vote, get_votes_for_session, update_session_status,
+    create_planning_session, get_planning_sessions_for_story,
     get_backlog_item, update_backlog_item
 )
-from ..utils.auth import get_current_user, SECRET_KEY, ALGORITHM
+from ..utils.auth import get_current_user, resolve_principal
 from ..models import PyObjectId
+from ..backplane import Backplane, create_backplane
+from ..planning_state import planning_state, valid_values_for_scale
 
 router = APIRouter(prefix="/planning", tags=["planning"])
 
 
-# --- Simple WS connection manager with per-session rooms ---
+# --- WS connection manager with per-session rooms ---
+# Outbound messages buffered per socket before it counts as a slow consumer
+WS_SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "64"))
+# Event types where only the latest message matters; a backed-up socket keeps just the newest
+COALESCE_TYPES = {"vote_submitted"}
+
+
+class _Outbox:
+    """Bounded send queue for one socket, drained by its own writer task."""
+
+    def __init__(self, websocket: WebSocket, max_pending: int, on_error):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.pending: deque[tuple[str | None, str]] = deque()
+        self._wake = asyncio.Event()
+        self._on_error = on_error
+        self.task = asyncio.create_task(self._run())
+
+    def offer(self, kind: str | None, text: str) -> bool:
+        """Queue a serialized message; False means the socket is too far behind."""
+        if len(self.pending) >= self.max_pending:
+            if kind not in COALESCE_TYPES:
+                return False
+            stale = next((i for i, (k, _) in enumerate(self.pending) if k == kind), None)
+            if stale is None:
+                return False
+            del self.pending[stale]
+        self.pending.append((kind, text))
+        self._wake.set()
+        return True
+
+    def close(self):
+        self.task.cancel()
+
+    async def _run(self):
+        try:
+            while True:
+                while not self.pending:
+                    self._wake.clear()
+                    await self._wake.wait()
+                _, text = self.pending.popleft()
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._on_error(self.websocket)
+
+
 class ConnectionManager:
-    def __init__(self):
-        # session_id -> set of WebSocket
-        self.rooms: dict[str, set[WebSocket]] = {}
+    """Rooms are per process; broadcasts go through the backplane so every worker's sockets see them.
+
+    Delivery never awaits a socket: each message is serialized once and queued
+    on every socket's outbox, and a socket that falls more than
+    `send_queue_size` messages behind is disconnected.
+    """
+
+    def __init__(self, backplane: Backplane | None = None, send_queue_size: int = WS_SEND_QUEUE_SIZE):
+        # session_id -> {WebSocket: _Outbox}
+        self.rooms: dict[str, dict[WebSocket, _Outbox]] = {}
+        self.backplane = backplane or create_backplane()
+        self.send_queue_size = send_queue_size
+        self.slow_disconnects = 0
+        # Close tasks for dropped sockets; held so they aren't garbage-collected mid-run
+        self._closing: set[asyncio.Task] = set()
+
+    async def start(self):
+        await self.backplane.start(self._deliver)
+
+    async def stop(self):
+        await self.backplane.stop()
+        for session_id in list(self.rooms):
+            for ws in list(self.rooms.get(session_id, {})):
+                self.disconnect(session_id, ws)
 
-    def _room(self, session_id: str) -> set[WebSocket]:
-        return self.rooms.setdefault(session_id, set())
+    def _room(self, session_id: str) -> dict[WebSocket, _Outbox]:
+        return self.rooms.setdefault(session_id, {})
 
     async def connect(self, session_id: str, websocket: WebSocket):
         await websocket.accept()
-        self._room(session_id).add(websocket)
+        self._room(session_id)[websocket] = _Outbox(
+            websocket, self.send_queue_size, lambda ws: self.disconnect(session_id, ws)
+        )
 
     def disconnect(self, session_id: str, websocket: WebSocket):
         room = self.rooms.get(session_id)
         if room and websocket in room:
-            room.remove(websocket)
+            room.pop(websocket).close()
             if not room:
                 self.rooms.pop(session_id, None)
 
+    def send(self, session_id: str, websocket: WebSocket, message: dict):
+        """Queue a message for one local socket (replies that aren't broadcast)."""
+        outbox = self.rooms.get(session_id, {}).get(websocket)
+        if outbox is not None and not outbox.offer(message.get("type"), json.dumps(message)):
+            self._drop_slow(session_id, websocket)
+
     async def broadcast(self, session_id: str, message: dict):
-        room = list(self.rooms.get(session_id, set()))
-        for ws in room:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                # Drop broken sockets silently
-                self.disconnect(session_id, ws)
+        await self.backplane.publish(session_id, message)
 
+    async def _deliver(self, session_id: str, message: dict):
+        room = self.rooms.get(session_id)
+        if not room:
+            return
+        text = json.dumps(message)
+        for ws, outbox in list(room.items()):
+            if not outbox.offer(message.get("type"), text):
+                self._drop_slow(session_id, ws)
 
-manager = ConnectionManager()
+    def _drop_slow(self, session_id: str, websocket: WebSocket):
+        self.slow_disconnects += 1
+        self.disconnect(session_id, websocket)
+        task = asyncio.create_task(self._close_slow(websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
 
+    @staticmethod
+    async def _close_slow(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later; the client reconnects
+        except Exception:
+            pass
 
-def _decode_token(token: str | None) -> dict | None:
-    """Decode JWT without FastAPI dependency injection (for WebSocket)."""
-    if not token:
-        return None
-    try:
-        import jwt  # local import to avoid circulars
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        user_id = payload.get("id")
-        role = payload.get("role")
-        if not username or not user_id:
-            return None
-        return {"username": username, "id": user_id, "role": role}
-    except Exception:
-        return None
+
+manager = ConnectionManager()
 
 
 @router.websocket("/ws/{session_id}")
 async def planning_ws(websocket: WebSocket, session_id: str):
     # Expect token via query string: ?token=...
     token = websocket.query_params.get("token")
-    user = _decode_token(token)
+    user = await resolve_principal(token)
     if not user:
         await websocket.close(code=4401)  # Unauthorized
         return
@@ -88,10 +169,25 @@ async def planning_ws(websocket: WebSocket, session_id: str):
             "user_id": user["id"],
             "username": user.get("username")
         })
-        # WS is broadcast-only for now; consume pings to keep alive
+        # Clients send keepalive pings (ignored) and votes: {"type": "vote", "value": "5"}
         while True:
-            _ = await websocket.receive_text()
-            # No-op; clients may send keepalive/ping
+            text = await websocket.receive_text()
+            try:
+                data = json.loads(text)
+            except ValueError:
+                continue
+            if not isinstance(data, dict) or data.get("type") != "vote":
+                continue
+            try:
+                vote = await _submit_vote(session_id, user, str(data.get("value")))
+            except (LookupError, ValueError) as e:
+                manager.send(session_id, websocket, {"type": "error", "detail": str(e)})
+                continue
+            manager.send(session_id, websocket, {
+                "type": "vote_accepted",
+                **vote,
+                "created_at": vote["created_at"].isoformat(),
+            })
     except WebSocketDisconnect:
         manager.disconnect(session_id, websocket)
         await manager.broadcast(session_id, {
@@ -113,6 +209,7 @@ async def create_session(
         raise HTTPException(status_code=404, detail="Story not found")
     
     # Check if active session already exists for this story
+    await planning_state.flush()
     existing_sessions = await get_planning_sessions_for_story(session_data.story_id)
     active_session = next((s for s in existing_sessions if s.status == "voting"), None)
     if active_session:
@@ -155,117 +252,62 @@ async def get_session(
     current_user: dict = Depends(get_current_user)
 ):
     """Get Planning Poker session details"""
-    session = await get_planning_session(session_id)
-    if not session:
+    state = await planning_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Planning session not found")
-    
-    votes = await get_votes_for_session(session_id)
-    
+
     return PlanningSessionResponse(
-        id=str(session.id),
-        story_id=str(session.story_id),
-        created_by=str(session.created_by),
-        status=session.status,
-        scale=session.scale,
-        created_at=session.created_at,
-        vote_count=len(votes),
-        votes_revealed=(session.status == "revealed")
+        id=state.id,
+        story_id=state.story_id,
+        created_by=state.created_by,
+        status=state.status,
+        scale=state.scale,
+        created_at=state.created_at,
+        vote_count=state.vote_count,
+        votes_revealed=(state.status == "revealed")
     )
 
-@router.post("/sessions/{session_id}/vote", response_model=VoteResponse)
-async def submit_vote(
-    session_id: str,
-    vote_data: VoteCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Submit or update a vote for the session"""
-    session = await get_planning_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Planning session not found")
-    
-    if session.status != "voting":
-        raise HTTPException(status_code=400, detail="Session is not in voting state")
-    
-    # Validate vote value based on scale
-    valid_values = get_valid_values_for_scale(session.scale)
-    if vote_data.value not in valid_values:
-        raise HTTPException(status_code=400, detail=f"Invalid vote value for {session.scale} scale")
-    
-    vote = await create_vote(
-        session_id=session_id,
-        user_id=current_user["id"],
-        value=vote_data.value,
-        username=current_user.get("username")
-    )
-    
+async def _submit_vote(session_id: str, user: dict, value: str) -> dict:
+    """Record a vote in the session state and broadcast the new count (REST and WS)."""
+    state, vote = await planning_state.vote(session_id, user["id"], value, user.get("username"))
     # Broadcast anonymized vote event (no value)
     try:
-        # Count votes after submission
-        votes = await get_votes_for_session(session_id)
         await manager.broadcast(session_id, {
             "type": "vote_submitted",
             "session_id": session_id,
-            "vote_count": len(votes),
-            "user_id": current_user["id"],
-            "username": current_user.get("username"),
+            "vote_count": state.vote_count,
+            "user_id": user["id"],
+            "username": user.get("username"),
         })
     except Exception:
         pass
+    return vote
 
-    return VoteResponse(
-        id=str(vote.id),
-        session_id=str(vote.session_id),
-        user_id=str(vote.user_id),
-        username=current_user.get("username"),
-        value=vote.value,
-        created_at=vote.created_at
-    )
-
-@router.post("/sessions/{session_id}/reveal", response_model=SessionRevealResponse)
-async def reveal_votes(
+@router.post("/sessions/{session_id}/vote", response_model=VoteResponse)
+async def submit_vote(
     session_id: str,
+    vote_data: VoteCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    """Reveal all votes for the session"""
-    session = await get_planning_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Planning session not found")
-    
-    # Only session creator or privileged roles can reveal
-    user_role = current_user.get("role", "")
-    if (str(session.created_by) != current_user["id"] and 
-        user_role not in ["product_owner", "scrum_master"]):
-        raise HTTPException(status_code=403, detail="Not authorized to reveal votes")
-    
-    if session.status != "voting":
-        raise HTTPException(status_code=400, detail="Session is not in voting state")
-    
-    # Update session status to revealed
-    await update_session_status(session_id, "revealed")
-    
-    # Get all votes
-    votes = await get_votes_for_session(session_id)
-    vote_responses = [
-        VoteResponse(
-            id=str(vote.id),
-            session_id=str(vote.session_id),
-            user_id=str(vote.user_id),
-            username=getattr(vote, 'username', None),
-            value=vote.value,
-            created_at=vote.created_at
-        )
-        for vote in votes
-    ]
-    
-    # Calculate statistics
+    """Submit or update a vote for the session"""
+    try:
+        vote = await _submit_vote(session_id, current_user, vote_data.value)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return VoteResponse(**vote)
+
+def _vote_stats(votes: List[dict]) -> tuple[Optional[float], Optional[str]]:
     numeric_votes = []
     for vote in votes:
-        if vote.value.isdigit() or vote.value in ["0.5", "1", "2", "3", "5", "8", "13", "21"]:
+        if vote["value"].isdigit() or vote["value"] in ["0.5", "1", "2", "3", "5", "8", "13", "21"]:
             try:
-                numeric_votes.append(float(vote.value))
+                numeric_votes.append(float(vote["value"]))
             except ValueError:
                 pass
-    
+
     average = sum(numeric_votes) / len(numeric_votes) if numeric_votes else None
     median = None
     if numeric_votes:
@@ -273,22 +315,40 @@ async def reveal_votes(
         n = len(sorted_votes)
         median_val = sorted_votes[n//2] if n % 2 == 1 else (sorted_votes[n//2-1] + sorted_votes[n//2]) / 2
         median = str(median_val)
-    
+    return average, median
+
+def _can_manage(state, current_user: dict) -> bool:
+    # Only session creator or privileged roles
+    return state.created_by == current_user["id"] or current_user.get("role", "") in ["product_owner", "scrum_master"]
+
+@router.post("/sessions/{session_id}/reveal", response_model=SessionRevealResponse)
+async def reveal_votes(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Reveal all votes for the session"""
+    state = await planning_state.get(session_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Planning session not found")
+
+    if not _can_manage(state, current_user):
+        raise HTTPException(status_code=403, detail="Not authorized to reveal votes")
+
+    if state.status != "voting":
+        raise HTTPException(status_code=400, detail="Session is not in voting state")
+
+    # Update session status to revealed
+    await planning_state.transition(session_id, "revealed")
+
+    votes = list(state.votes.values())
+    average, median = _vote_stats(votes)
+
     # Broadcast revealed votes with values
     try:
         await manager.broadcast(session_id, {
             "type": "votes_revealed",
             "session_id": session_id,
-            "votes": [
-                {
-                    "id": v.id and str(v.id),
-                    "session_id": str(v.session_id),
-                    "user_id": str(v.user_id),
-                    "username": getattr(v, 'username', None),
-                    "value": v.value,
-                    "created_at": v.created_at.isoformat(),
-                } for v in votes
-            ],
+            "votes": [{**v, "created_at": v["created_at"].isoformat()} for v in votes],
             "average": average,
             "median": median,
         })
@@ -297,7 +357,7 @@ async def reveal_votes(
 
     return SessionRevealResponse(
         session_id=session_id,
-        votes=vote_responses,
+        votes=[VoteResponse(**v) for v in votes],
         average=average,
         median=median
     )
@@ -309,24 +369,21 @@ async def set_final_estimate(
     current_user: dict = Depends(get_current_user)
 ):
     """Set the final estimate and complete the session"""
-    session = await get_planning_session(session_id)
-    if not session:
+    state = await planning_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Planning session not found")
-    
-    # Only session creator or privileged roles can set estimate
-    user_role = current_user.get("role", "")
-    if (str(session.created_by) != current_user["id"] and 
-        user_role not in ["product_owner", "scrum_master"]):
+
+    if not _can_manage(state, current_user):
         raise HTTPException(status_code=403, detail="Not authorized to set estimate")
-    
-    if session.status not in ["revealed", "voting"]:
+
+    if state.status not in ["revealed", "voting"]:
         raise HTTPException(status_code=400, detail="Cannot set estimate for completed session")
-    
+
     # Update story (unified item) with final estimate
-    await update_backlog_item(str(session.story_id), {"story_points": int(estimate_data.final_estimate)})
-    
+    await update_backlog_item(state.story_id, {"story_points": int(estimate_data.final_estimate)})
+
     # Mark session as completed
-    await update_session_status(session_id, "completed")
+    await planning_state.transition(session_id, "completed")
     # Broadcast completion
     try:
         await manager.broadcast(session_id, {
@@ -341,9 +398,4 @@ async def set_final_estimate(
 
 def get_valid_values_for_scale(scale: str) -> List[str]:
     """Get valid vote values for a given scale"""
-    scales = {
-        "fibonacci": ["0", "0.5", "1", "2", "3", "5", "8", "13", "21", "?", "coffee"],
-        "modified_fibonacci": ["0", "0.5", "1", "2", "3", "5", "8", "13", "20", "40", "100", "?", "coffee"],
-        "t_shirt": ["XS", "S", "M", "L", "XL", "XXL", "?", "coffee"]
-    }
-    return scales.get(scale, scales["fibonacci"])
+    return valid_values_for_scale(scale)
@@ -1,23 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from ..crud import create_sprint, get_sprints, get_sprint, update_sprint, delete_sprint
-from ..crud import add_item_to_sprint, remove_item_from_sprint, get_burndown_snapshot
-from ..schemas import SprintCreate, SprintResponse
-from typing import List
+from ..crud import add_item_to_sprint, remove_item_from_sprint, move_items_to_sprint, get_burndown_snapshot, get_burndown_snapshots
+from ..crud import get_burndown_series, get_sprint_board, BOARD_SWIMLANES
+from ..schemas import SprintCreate, SprintResponse, SprintItemsBatch
+from typing import List, Optional
 
 router = APIRouter(prefix="/sprints", tags=["sprints"])
 
 # Auth dependency
 from ..utils.auth import get_current_user, require_roles
+from ..versions import conditional
 
 @router.post("/", response_model=SprintResponse)
 async def create_sprint_item(sprint: SprintCreate, current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))):
     return await create_sprint(sprint)
 
-@router.get("/", response_model=List[SprintResponse])
+@router.get("/", response_model=List[SprintResponse], dependencies=[conditional("sprints")])
 async def read_sprints(current_user: dict = Depends(get_current_user)):
     return await get_sprints()
 
-@router.get("/{sprint_id}", response_model=SprintResponse)
+@router.get("/burndown")
+async def burndowns(ids: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    # ids: comma-separated sprint ids; omitted -> every sprint
+    sprint_ids = [i.strip() for i in ids.split(",") if i.strip()] if ids else None
+    return await get_burndown_snapshots(sprint_ids)
+
+@router.get("/{sprint_id}", response_model=SprintResponse, dependencies=[conditional("sprints")])
 async def read_sprint(sprint_id: str, current_user: dict = Depends(get_current_user)):
     sprint = await get_sprint(sprint_id)
     if sprint is None:
@@ -45,6 +53,14 @@ async def add_item(sprint_id: str, item_id: str, current_user: dict = Depends(re
         raise HTTPException(status_code=404, detail="Sprint not found")
     return sprint
 
+@router.post("/{sprint_id}/items:batch", response_model=SprintResponse)
+async def batch_items(sprint_id: str, body: SprintItemsBatch, current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))):
+    # body: { "add": [item ids], "remove": [item ids] }; added items leave their previous sprint
+    sprint = await move_items_to_sprint(sprint_id, add=body.add, remove=body.remove)
+    if sprint is None:
+        raise HTTPException(status_code=404, detail="Sprint not found")
+    return sprint
+
 @router.delete("/{sprint_id}/items/{item_id}", response_model=SprintResponse)
 async def remove_item(sprint_id: str, item_id: str, current_user: dict = Depends(require_roles('scrum_master', 'product_owner'))):
     sprint = await remove_item_from_sprint(sprint_id, item_id)
@@ -52,9 +68,26 @@ async def remove_item(sprint_id: str, item_id: str, current_user: dict = Depends
         raise HTTPException(status_code=404, detail="Sprint not found")
     return sprint
 
+@router.get("/{sprint_id}/board")
+async def board(sprint_id: str, swimlane: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    # swimlane: "epic" | "assignee"; omitted -> a single lane
+    if swimlane is not None and swimlane not in BOARD_SWIMLANES:
+        raise HTTPException(status_code=400, detail=f"swimlane must be one of {', '.join(BOARD_SWIMLANES)}")
+    data = await get_sprint_board(sprint_id, swimlane)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Sprint not found")
+    return data
+
 @router.get("/{sprint_id}/burndown")
 async def burndown(sprint_id: str, current_user: dict = Depends(get_current_user)):
     data = await get_burndown_snapshot(sprint_id)
     if data is None:
         raise HTTPException(status_code=404, detail="Sprint not found")
-    return data
\ No newline at end of file
+    return data
+
+@router.get("/{sprint_id}/burndown/series")
+async def burndown_series(sprint_id: str, days: Optional[int] = Query(None, ge=1, le=366), current_user: dict = Depends(get_current_user)):
+    sprint = await get_sprint(sprint_id)
+    if sprint is None:
+        raise HTTPException(status_code=404, detail="Sprint not found")
+    return await get_burndown_series(sprint_id, days)
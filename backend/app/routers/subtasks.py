@@ -1,18 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional
 
 from ..crud import (
     create_subtask,
     get_subtasks,
+    get_subtasks_for_task,
     get_subtask,
     update_subtask,
     delete_subtask,
     set_subtask_rank,
     log_audit,
+    resolve_rank,
     get_backlog_item,
 )
 from ..schemas import SubtaskCreate, SubtaskResponse
 from ..utils.auth import get_current_user, require_roles
+from ..utils.rank import is_valid_rank
 
 router = APIRouter(prefix="/subtasks", tags=["subtasks"])
 
@@ -26,7 +29,9 @@ async def create(item: SubtaskCreate, current_user: dict = Depends(require_roles
     return await create_subtask(item)
 
 @router.get("/", response_model=List[SubtaskResponse])
-async def read_all(current_user: dict = Depends(get_current_user)):
+async def read_all(parent_task_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    if parent_task_id:
+        return await get_subtasks_for_task(parent_task_id)
     return await get_subtasks()
 
 @router.get("/{item_id}", response_model=SubtaskResponse)
@@ -65,14 +70,15 @@ async def delete(item_id: str, current_user: dict = Depends(require_roles('produ
 
 @router.patch("/{item_id}/rank", response_model=SubtaskResponse)
 async def set_rank(item_id: str, body: dict, current_user: dict = Depends(require_roles('product_owner'))):
+    # body: { "after_id": "<id|null>", "before_id": "<id|null>" } or { "rank": "<rank>" }
     try:
-        new_rank = float(body.get("rank"))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid rank")
+        new_rank = await resolve_rank("subtasks", item_id, body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     item = await set_subtask_rank(item_id, new_rank)
     if not item:
         raise HTTPException(status_code=404, detail="Subtask not found")
-    await log_audit(current_user["id"], "subtask", item_id, "reorder", {"rank": new_rank})
+    await log_audit(current_user["id"], "subtask", item_id, "reorder", {**body, "rank": new_rank})
     return item
 
 @router.patch("/{item_id}/bulk", response_model=SubtaskResponse)
@@ -83,6 +89,8 @@ async def bulk_update(item_id: str, body: dict, current_user: dict = Depends(req
     invalid = set(body.keys()) - allowed
     if invalid:
         raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(invalid))}")
+    if "rank" in body and not is_valid_rank(body["rank"]):
+        raise HTTPException(status_code=400, detail="Invalid rank")
     item = await update_subtask(item_id, body)
     if not item:
         raise HTTPException(status_code=404, detail="Subtask not found")
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from ..crud import create_user, get_user
+from ..crud import create_user, get_user, update_user_password_hash
 from ..schemas import UserCreate, UserResponse
-from ..utils.auth import oauth2_scheme, create_access_token, verify_password, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user
+from ..utils.auth import (
+    oauth2_scheme, create_access_token, verify_and_update_password, ACCESS_TOKEN_EXPIRE_MINUTES,
+    get_current_user, require_roles, password_hash_stats,
+)
 from datetime import timedelta
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -17,14 +20,24 @@ async def register(user: UserCreate):
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     user = await get_user(form_data.username)
-    if not user or not verify_password(form_data.password, user.password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored hash used an old cost or scheme; upgrade it while we have the plaintext
+        await update_user_password_hash(user.id, new_hash)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username, "id": user.id, "role": user.role}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/password-hashing/stats")
+async def read_password_hashing_stats(current_user: dict = Depends(require_roles("scrum_master", "product_owner"))):
+    return password_hash_stats()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from .models import PyObjectId
-from typing import List, Optional, Literal
+from .models import EpicProgress, PyObjectId, Rank
+from typing import Any, Dict, List, Optional, Literal
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -48,7 +48,7 @@ class ItemCreate(BaseModel):
     priority: Optional[int | str] = "medium"
     story_points: Optional[int] = None
     assignee: Optional[PyObjectId] = None
-    rank: float = 0.0
+    rank: Optional[str] = None  # omitted -> appended at the end
     epic_id: Optional[PyObjectId] = None
     acceptance_criteria: List[str] = []
     spike: Optional[SpikeFields] = None
@@ -61,7 +61,7 @@ class ItemUpdate(BaseModel):
     priority: Optional[int | str] = None
     story_points: Optional[int] = None
     assignee: Optional[PyObjectId] = None
-    rank: Optional[float] = None
+    rank: Optional[str] = None
     epic_id: Optional[PyObjectId] = None
     acceptance_criteria: Optional[List[str]] = None
     spike: Optional[SpikeFields] = None
@@ -76,17 +76,68 @@ class ItemResponse(BaseModel):
     priority: Optional[int | str]
     story_points: Optional[int]
     assignee: Optional[PyObjectId]
-    rank: float
+    rank: Rank
     epic_id: Optional[PyObjectId]
+    sprint_id: Optional[PyObjectId] = None
     acceptance_criteria: List[str]
+    change_seq: Optional[int] = None
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
+class ItemBulkChange(BaseModel):
+    id: PyObjectId
+    changes: Dict[str, Any]
+
+class ItemBulkUpdate(BaseModel):
+    # Either explicit per-item changes, or one change set applied to everything matching `filter`
+    updates: Optional[List[ItemBulkChange]] = None
+    filter: Optional[Dict[str, Any]] = None
+    changes: Optional[Dict[str, Any]] = None
+
+class ItemBulkResult(BaseModel):
+    id: PyObjectId
+    ok: bool
+    error: Optional[str] = None
+
+class ItemBulkUpdateResponse(BaseModel):
+    matched: int
+    results: List[ItemBulkResult]
+
+class ItemListEntry(BaseModel):
+    # Listing rows may be projected with `fields=`, so everything but id is optional
+    id: PyObjectId
+    type: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    labels: Optional[List[str]] = None
+    priority: Optional[int | str] = None
+    story_points: Optional[int] = None
+    assignee: Optional[PyObjectId] = None
+    rank: Optional[str] = None
+    epic_id: Optional[PyObjectId] = None
+    sprint_id: Optional[PyObjectId] = None
+    acceptance_criteria: Optional[List[str]] = None
+    change_seq: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class ItemChanges(BaseModel):
+    # Pass `seq` back as `since`; `more` means the next call has changes right away
+    seq: int
+    upserts: List[ItemListEntry]
+    deletes: List[PyObjectId]
+    more: bool
+
 class SprintCreate(BaseModel):
     goal: str
     duration: int
     backlog_items: List[PyObjectId] = []
 
+class SprintItemsBatch(BaseModel):
+    add: List[PyObjectId] = []
+    remove: List[PyObjectId] = []
+
 class SprintResponse(BaseModel):
     id: PyObjectId
     goal: str
@@ -158,7 +209,8 @@ class EpicResponse(BaseModel):
     assignee: Optional[PyObjectId]
     story_points: int
     status: str
-    rank: float
+    rank: Rank
+    progress: EpicProgress
 
 class StoryCreate(BaseModel):
     title: str
@@ -183,7 +235,7 @@ class StoryResponse(BaseModel):
     status: str
     sprint_id: Optional[PyObjectId]
     cross_sprint: bool
-    rank: float
+    rank: Rank
 
 class TaskCreate(BaseModel):
     title: str
@@ -204,7 +256,7 @@ class TaskResponse(BaseModel):
     story_points: int
     status: str
     sprint_id: Optional[PyObjectId]
-    rank: float
+    rank: Rank
 
 class SubtaskCreate(BaseModel):
     title: str
@@ -223,4 +275,4 @@ class SubtaskResponse(BaseModel):
     assignee: Optional[PyObjectId]
     story_points: int
     status: str
-    rank: float
\ No newline at end of file
+    rank: Rank
\ No newline at end of file
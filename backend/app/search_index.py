@@ -0,0 +1,176 @@
+"""In-memory prefix index over backlog items for type-ahead suggestions.
+
+Words of the title, description and labels are kept in a sorted term list
+with a posting set per term, so a prefix lookup is a bisect plus a short scan
+and never touches Mongo. The index is built from one streaming scan at
+startup and kept current by the crud functions that write items. Each worker
+holds its own copy; ITEM_SEARCH_INDEX_REBUILD_SECONDS bounds how long writes
+made by another worker (or outside the app) stay invisible to it.
+"""
+import heapq
+import re
+from bisect import bisect_left, insort
+from os import environ
+from typing import Any, Dict, List, Optional, Set
+
+from . import database
+
+# Set to "0" to skip the index; suggestions then fall back to the Mongo text search
+ITEM_SEARCH_INDEX_ENABLED = environ.get("ITEM_SEARCH_INDEX_ENABLED", "1") != "0"
+# Seconds between full rebuilds; "0" disables them
+ITEM_SEARCH_INDEX_REBUILD_SECONDS = float(environ.get("ITEM_SEARCH_INDEX_REBUILD_SECONDS", "600"))
+
+# Fields copied into the index; the text ones are tokenized, the rest filter and order results
+INDEXED_TEXT = ("title", "description", "labels")
+INDEXED_FIELDS = ("type", "status", "epic_id", "rank")
+SUGGEST_FIELDS = ("title",) + INDEXED_FIELDS
+
+
+def tokenize(text: Any) -> List[str]:
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return re.findall(r"\w+", str(text or "").lower())
+
+
+class _Postings:
+    def __init__(self):
+        # id -> indexed fields plus the doc's term sets
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        # Sorted keys of `postings`, for prefix ranges
+        self.terms: List[str] = []
+
+    def put(self, id: str, doc: Dict[str, Any]):
+        old = self.docs.get(id)
+        entry = {**(old or {}), **{f: doc[f] for f in INDEXED_TEXT + INDEXED_FIELDS if f in doc}}
+        entry["title_terms"] = set(tokenize(entry.get("title")))
+        entry["terms"] = entry["title_terms"].union(*(tokenize(entry.get(f)) for f in INDEXED_TEXT[1:]))
+        old_terms = old["terms"] if old else set()
+        for term in old_terms - entry["terms"]:
+            self._unpost(term, id)
+        for term in entry["terms"] - old_terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                ids = self.postings[term] = set()
+                insort(self.terms, term)
+            ids.add(id)
+        self.docs[id] = entry
+
+    def merge(self, id: str, changes: Dict[str, Any]):
+        # Only items already indexed; a partial change set can't seed a new entry
+        if id in self.docs:
+            self.put(id, changes)
+
+    def remove(self, id: str):
+        entry = self.docs.pop(id, None)
+        if entry is not None:
+            for term in entry["terms"]:
+                self._unpost(term, id)
+
+    def _unpost(self, term: str, id: str):
+        ids = self.postings.get(term)
+        if ids is None:
+            return
+        ids.discard(id)
+        if not ids:
+            del self.postings[term]
+            self.terms.pop(bisect_left(self.terms, term))
+
+    def matching(self, prefix: str) -> Set[str]:
+        found: Set[str] = set()
+        i = bisect_left(self.terms, prefix)
+        while i < len(self.terms) and self.terms[i].startswith(prefix):
+            found |= self.postings[self.terms[i]]
+            i += 1
+        return found
+
+
+class ItemSearchIndex:
+    def __init__(self, enabled: bool = ITEM_SEARCH_INDEX_ENABLED):
+        self.enabled = enabled
+        self.ready = False
+        self._index = _Postings()
+        # Writes seen while a rebuild scan is running, replayed onto the new index
+        self._pending: Optional[List[tuple]] = None
+        self.rebuilds = 0
+        self.queries = 0
+
+    async def start(self):
+        if self.enabled and not self.ready:
+            await self.rebuild()
+
+    async def stop(self):
+        self.ready = False
+        self._index = _Postings()
+
+    async def rebuild(self):
+        """Build a fresh index from one scan of backlog_items, then swap it in."""
+        index = _Postings()
+        self._pending = []
+        try:
+            projection = {f: 1 for f in INDEXED_TEXT + INDEXED_FIELDS}
+            async for doc in database.db.backlog_items.find({}, projection):  # type: ignore
+                index.put(str(doc["_id"]), doc)
+            for op, args in self._pending:
+                getattr(index, op)(*args)
+        finally:
+            self._pending = None
+        self._index = index
+        self.ready = True
+        self.rebuilds += 1
+
+    def _apply(self, op: str, *args):
+        if not self.ready and self._pending is None:
+            return
+        getattr(self._index, op)(*args)
+        if self._pending is not None:
+            self._pending.append((op, args))
+
+    def upsert(self, id: Any, doc: Dict[str, Any]):
+        self._apply("put", str(id), doc)
+
+    def update(self, id: Any, changes: Dict[str, Any]):
+        if any(f in changes for f in INDEXED_TEXT + INDEXED_FIELDS):
+            self._apply("merge", str(id), changes)
+
+    def remove(self, id: Any):
+        self._apply("remove", str(id))
+
+    def suggest(self, q: str, limit: int = 10, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Items with a word starting with every word of `q`; title matches first, then rank."""
+        self.queries += 1
+        index = self._index
+        words = list(dict.fromkeys(tokenize(q)))
+        if not words:
+            return []
+        candidates: Optional[Set[str]] = None
+        for word in sorted(words, key=len, reverse=True):
+            ids = index.matching(word)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        wanted = {k: str(v) for k, v in filters.items() if v is not None}
+
+        def keep(entry: Dict[str, Any]) -> bool:
+            return all(str(entry.get(k)) == v for k, v in wanted.items())
+
+        def key(id: str):
+            entry = index.docs[id]
+            in_title = sum(1 for w in words if any(t.startswith(w) for t in entry["title_terms"]))
+            return (-in_title, str(entry.get("rank") or ""), id)
+
+        hits = heapq.nsmallest(limit, (i for i in candidates or () if keep(index.docs[i])), key=key)
+        return [{"id": i, **{f: index.docs[i].get(f) for f in SUGGEST_FIELDS}} for i in hits]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "items": len(self._index.docs),
+            "terms": len(self._index.terms),
+            "rebuilds": self.rebuilds,
+            "queries": self.queries,
+        }
+
+
+item_search_index = ItemSearchIndex()
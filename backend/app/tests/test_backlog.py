@@ -82,4 +82,112 @@ def test_non_status_update_forbidden_for_dev(client, po_token, dev_token):
 
     # Dev tries to change title -> should be forbidden
     up_resp = client.put(f"/items/{item_id}", json={"title": "Hacked"}, headers={"Authorization": f"Bearer {dev_token}"})
-    assert up_resp.status_code == 403
\ No newline at end of file
+    assert up_resp.status_code == 403
+
+def test_list_items_keyset_pagination_and_projection(client, po_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    created = []
+    for i in range(5):
+        r = client.post("/items", json={
+            "type": "task",
+            "title": f"Page Item {i}",
+            "description": "paged"
+        }, headers=headers)
+        assert r.status_code == 200
+        created.append(r.json()["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "fields": "title,rank", "q": "Page Item"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/items", params=params, headers=headers)
+        assert page.status_code == 200
+        for row in page.json():
+            assert set(row.keys()) == {"id", "title", "rank"}
+            seen.append(row["id"])
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == created
+
+    bad = client.get("/items", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert bad.status_code == 400
+    bad_fields = client.get("/items", params={"fields": "password"}, headers=headers)
+    assert bad_fields.status_code == 400
+
+def test_text_search_ranks_title_matches_and_prefixes(client, po_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    in_title = client.post("/items", json={"type": "story", "title": "Checkout refactor", "description": "payments"}, headers=headers).json()["id"]
+    in_body = client.post("/items", json={"type": "story", "title": "Cleanup", "description": "touches checkout code"}, headers=headers).json()["id"]
+
+    ranked = client.get("/items", params={"q": "checkout ", "q_mode": "text"}, headers=headers)
+    assert ranked.status_code == 200
+    ids = [row["id"] for row in ranked.json()]
+    assert ids.index(in_title) < ids.index(in_body)
+
+    # Trailing partial word is a prefix match on title words
+    typeahead = client.get("/items", params={"q": "refac", "q_mode": "text", "fields": "title"}, headers=headers)
+    assert in_title in [row["id"] for row in typeahead.json()]
+
+    # Regex metacharacters are matched literally in the default mode
+    literal = client.get("/items", params={"q": "(.*"}, headers=headers)
+    assert literal.status_code == 200
+    assert literal.json() == []
+
+def test_suggest_answers_from_the_index(client, po_token):
+    from app.search_index import item_search_index
+    headers = {"Authorization": f"Bearer {po_token}"}
+    created = client.post("/items", json={"type": "bug", "title": "Zebra crossing glitch"}, headers=headers).json()["id"]
+    assert item_search_index.ready
+
+    r = client.get("/items/search/suggest", params={"q": "zebra gli", "type": "bug"}, headers=headers)
+    assert r.status_code == 200
+    assert [row["id"] for row in r.json()] == [created]
+    assert client.get("/items/search/suggest", params={"q": "zebra", "type": "story"}, headers=headers).json() == []
+
+    client.put(f"/items/{created}", json={"title": "Giraffe crossing glitch"}, headers=headers)
+    assert client.get("/items/search/suggest", params={"q": "zebra"}, headers=headers).json() == []
+    client.delete(f"/items/{created}", headers=headers)
+    assert client.get("/items/search/suggest", params={"q": "giraffe"}, headers=headers).json() == []
+
+def test_item_reads_are_conditional(client, po_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    created = client.post("/items", json={"type": "task", "title": "Cached item"}, headers=headers).json()["id"]
+    listing = client.get("/items", headers=headers)
+    detail = client.get(f"/items/{created}", headers=headers)
+
+    assert client.get("/items", headers={**headers, "If-None-Match": listing.headers["ETag"]}).status_code == 304
+    assert client.get(f"/items/{created}", headers={**headers, "If-None-Match": detail.headers["ETag"]}).status_code == 304
+
+    client.put(f"/items/{created}", json={"status": "done"}, headers=headers)
+    assert client.get("/items", headers={**headers, "If-None-Match": listing.headers["ETag"]}).status_code == 200
+    client.delete(f"/items/{created}", headers=headers)
+
+def test_changes_since_returns_upserts_and_deletes(client, po_token, monkeypatch):
+    from app import crud
+    monkeypatch.setattr(crud, "CHANGES_SETTLE_SECONDS", 0)
+    headers = {"Authorization": f"Bearer {po_token}"}
+    start = client.get("/items/changes", params={"since": 0, "limit": 1000}, headers=headers).json()
+    while start["more"]:
+        start = client.get("/items/changes", params={"since": start["seq"], "limit": 1000}, headers=headers).json()
+    since = start["seq"]
+    # The list's starting position agrees with the feed's
+    assert int(client.get("/items", headers=headers).headers["X-Change-Seq"]) == since
+
+    kept = client.post("/items", json={"type": "task", "title": "Synced item"}, headers=headers).json()["id"]
+    gone = client.post("/items", json={"type": "task", "title": "Deleted item"}, headers=headers).json()["id"]
+    client.put(f"/items/{kept}", json={"status": "in_progress"}, headers=headers)
+    client.delete(f"/items/{gone}", headers=headers)
+
+    delta = client.get("/items/changes", params={"since": since}, headers=headers)
+    assert delta.status_code == 200
+    body = delta.json()
+    assert [row["id"] for row in body["upserts"]] == [kept]
+    assert body["upserts"][0]["status"] == "in_progress"
+    assert body["deletes"] == [gone]
+    assert body["seq"] > since and body["more"] is False
+
+    assert client.get("/items/changes", params={"since": body["seq"]}, headers=headers).json()["upserts"] == []
+    client.delete(f"/items/{kept}", headers=headers)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import pytest
+from app.main import app
+from app.backplane import InMemoryBackplane, MongoBackplane, create_backplane
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    with TestClient(app) as c:
+        yield c
+
+def test_in_memory_backplane_delivers_locally():
+    received = []
+
+    async def scenario():
+        bp = InMemoryBackplane()
+        async def deliver(channel, message):
+            received.append((channel, message))
+        await bp.start(deliver)
+        await bp.publish("s1", {"type": "ping"})
+        await bp.stop()
+        await bp.publish("s1", {"type": "after-stop"})
+
+    asyncio.run(scenario())
+    assert received == [("s1", {"type": "ping"})]
+
+def test_unknown_backplane_kind():
+    with pytest.raises(ValueError):
+        create_backplane("carrier-pigeon")
+
+def test_mongo_backplane_fans_out_between_workers(client):
+    # Two backplanes on one database stand in for two uvicorn workers
+    async def scenario():
+        got_a, got_b = [], []
+        a, b = MongoBackplane("bp_test_events"), MongoBackplane("bp_test_events")
+        async def deliver_a(channel, message):
+            got_a.append((channel, message))
+        async def deliver_b(channel, message):
+            got_b.append((channel, message))
+        await a.start(deliver_a)
+        await b.start(deliver_b)
+        try:
+            await a.publish("room", {"type": "vote_submitted", "vote_count": 1})
+            for _ in range(50):
+                if got_b:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            await a.stop()
+            await b.stop()
+        return got_a, got_b
+
+    got_a, got_b = client.portal.call(scenario)
+    # Publisher delivers to its own sockets exactly once; the peer gets it via the tail
+    assert got_a == [("room", {"type": "vote_submitted", "vote_count": 1})]
+    assert got_b == [("room", {"type": "vote_submitted", "vote_count": 1})]
+
+class _FakeSocket:
+    def __init__(self, delay=0.0, block=False):
+        self.delay = delay
+        self.block = block
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.block:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+def test_broadcast_does_not_wait_for_slow_sockets():
+    from app.routers.planning import ConnectionManager
+
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), send_queue_size=2)
+        await manager.start()
+        fast, stuck = _FakeSocket(), _FakeSocket(block=True)
+        await manager.connect("s1", fast)
+        await manager.connect("s1", stuck)
+        messages = [{"type": "vote_submitted", "vote_count": i} for i in range(5)]
+        messages.append({"type": "votes_revealed", "votes": []})
+        for message in messages:
+            # The stuck socket's send never returns, so this only completes if broadcast doesn't await it
+            await asyncio.wait_for(manager.broadcast("s1", message), 5)
+            await asyncio.sleep(0)
+        # Let the fast socket's writer drain before shutting down
+        while len(fast.sent) < len(messages):
+            await asyncio.sleep(0)
+        await manager.stop()
+        return manager, fast, stuck, messages
+
+    manager, fast, stuck, messages = asyncio.run(scenario())
+    assert [json.loads(text) for text in fast.sent] == messages
+    # The stuck socket's vote counts were coalesced; the reveal overflowed it, so it was dropped
+    assert stuck.sent == []
+    assert stuck.closed_with == 1013
+    assert manager.slow_disconnects == 1
+    assert manager.rooms == {}
+
+def test_planning_state_applies_changes_relayed_by_other_workers():
+    from types import SimpleNamespace
+    from app.planning_state import PlanningStateEngine, SessionState
+    engine = PlanningStateEngine()
+    session = SimpleNamespace(id="s1", story_id="st", created_by="u0", status="voting", scale="fibonacci", created_at=None)
+    engine.sessions["s1"] = SessionState(session, [])
+
+    async def scenario():
+        await engine._deliver("planning_state", {"origin": "peer", "session_id": "s1", "vote": {"user_id": "u1", "value": "5"}})
+        await engine._deliver("planning_state", {"origin": engine.origin, "session_id": "s1", "status": "completed"})
+        await engine._deliver("planning_state", {"origin": "peer", "session_id": "s1", "status": "revealed"})
+        await engine._deliver("planning_state", {"origin": "peer", "session_id": "s1", "vote": {"user_id": "u2", "value": "8"}})
+
+    asyncio.run(scenario())
+    state = engine.sessions["s1"]
+    # Own echo ignored, peer reveal applied, votes after the reveal dropped
+    assert state.status == "revealed"
+    assert list(state.votes) == ["u1"]
+    with pytest.raises(ValueError):
+        asyncio.run(engine.vote("s1", "u3", "3"))
@@ -74,3 +74,58 @@ def test_story_bulk_update_and_audit(client, po_token, story_id):
     audits = client.get(f"/audits/?entity=item&entity_id={story_id}", headers={"Authorization": f"Bearer {po_token}"})
     assert audits.status_code == 200
     assert any(ev.get("action") == "bulk_update" for ev in audits.json())
+
+def test_multi_item_bulk_update(client, po_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    ids = []
+    for i in range(3):
+        r = client.post("/items/", json={"type": "task", "title": f"Groom {i}", "labels": ["groom-src"]}, headers=headers)
+        assert r.status_code == 200
+        ids.append(r.json()["id"])
+    missing = "000000000000000000000000"
+
+    r = client.patch("/items/bulk", json={"updates": [
+        {"id": ids[0], "changes": {"status": "in_progress"}},
+        {"id": ids[1], "changes": {"labels": ["retagged"]}},
+        {"id": missing, "changes": {"status": "done"}},
+    ]}, headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["matched"] == 2
+    assert {res["id"]: res["ok"] for res in body["results"]} == {ids[0]: True, ids[1]: True, missing: False}
+    assert client.get(f"/items/{ids[0]}", headers=headers).json()["status"] == "in_progress"
+    assert client.get(f"/items/{ids[1]}", headers=headers).json()["labels"] == ["retagged"]
+
+    # Filter + change set
+    r = client.patch("/items/bulk", json={"filter": {"q": "Groom"}, "changes": {"priority": "high"}}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["matched"] >= 3
+    assert all(client.get(f"/items/{i}", headers=headers).json()["priority"] == "high" for i in ids)
+
+    audits = client.get(f"/audits/?entity=item&entity_id={ids[2]}", headers=headers)
+    assert any(ev.get("action") == "bulk_update" for ev in audits.json())
+
+    bad = client.patch("/items/bulk", json={"updates": [{"id": ids[0], "changes": {"password": "x"}}]}, headers=headers)
+    assert bad.status_code == 400
+
+    dup = client.patch("/items/bulk", json={"updates": [
+        {"id": ids[0], "changes": {"status": "done"}},
+        {"id": ids[0], "changes": {"status": "todo"}},
+    ]}, headers=headers)
+    assert dup.status_code == 400
+    assert client.get(f"/items/{ids[0]}", headers=headers).json()["status"] == "in_progress"
+
+    bad = client.patch("/items/bulk", json={"updates": [{"id": ids[0], "changes": {"story_points": "abc"}}]}, headers=headers)
+    assert bad.status_code == 400
+    assert client.get(f"/items/{ids[0]}", headers=headers).status_code == 200
+
+def test_filter_bulk_update_rejects_oversized_matches(client, po_token, monkeypatch):
+    from app.routers import items as items_router
+    headers = {"Authorization": f"Bearer {po_token}"}
+    for i in range(3):
+        client.post("/items/", json={"type": "task", "title": f"Capped {i}"}, headers=headers)
+    monkeypatch.setattr(items_router, "BULK_MAX_ITEMS", 2)
+    r = client.patch("/items/bulk", json={"filter": {"q": "Capped"}, "changes": {"priority": "low"}}, headers=headers)
+    assert r.status_code == 400
+    listed = client.get("/items/?q=Capped", headers=headers).json()
+    assert all(item["priority"] != "low" for item in listed)
@@ -159,4 +159,24 @@ def test_edit_comment_not_found(client, auth_token):
         headers={"Authorization": f"Bearer {auth_token}"},
     )
     # Our router checks existence first and returns 404
-    assert resp.status_code == 404
\ No newline at end of file
+    assert resp.status_code == 404
+
+def test_comment_pagination_and_counts(client, auth_token, po_token, backlog_item_id):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        r = client.post("/comments/", json={"text": f"page {i}", "item_id": backlog_item_id}, headers=headers)
+        assert r.status_code == 200
+
+    first = client.get(f"/comments/{backlog_item_id}?limit=2", headers=headers)
+    assert first.status_code == 200
+    assert [c["text"] for c in first.json()] == ["page 0", "page 1"]
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get(f"/comments/{backlog_item_id}", params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert [c["text"] for c in rest.json()] == ["page 2"]
+    assert "X-Next-Cursor" not in rest.headers
+
+    other = client.post("/items", json={"type": "task", "title": "No comments"},
+                        headers={"Authorization": f"Bearer {po_token}"}).json()["id"]
+    counts = client.get("/comments/counts", params={"item_ids": f"{backlog_item_id},{other}"}, headers=headers)
+    assert counts.status_code == 200
+    assert counts.json() == {backlog_item_id: 3, other: 0}
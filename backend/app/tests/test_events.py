@@ -0,0 +1,69 @@
+import asyncio
+import json
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from app.events import EventHub, event
+
+def _frames(text):
+    return [json.loads(line[6:]) for line in text.splitlines() if line.startswith("data: ")]
+
+def test_events_reach_only_matching_topics_once():
+    hub = EventHub()
+    board = hub.subscribe({"sprint:s1"})
+    everything = hub.subscribe({"items", "sprints"})
+    other = hub.subscribe({"sprint:s2", "epic:e9"})
+
+    async def run():
+        # A move from s1 to s2 belongs to both sprints
+        await hub.publish(event("item", "updated", "i1", {"sprint_id": "s2"}, sprint_ids=["s1", "s2"], epic_ids=["e1"]))
+        await hub.publish(event("sprint", "updated", "s3", sprint_ids=["s3"]))
+
+    asyncio.run(run())
+    assert [e["id"] for e in _frames("".join(board.drain()))] == ["i1"]
+    assert [e["id"] for e in _frames("".join(everything.drain()))] == ["i1", "s3"]
+    assert [e["id"] for e in _frames("".join(other.drain()))] == ["i1"]
+
+def test_burst_for_one_entity_is_coalesced():
+    hub = EventHub()
+    sub = hub.subscribe({"items"})
+
+    async def run():
+        await hub.publish(event("item", "created", "i1", {"title": "A", "status": "todo"}))
+        await hub.publish(event("item", "updated", "i1", {"status": "in_progress"}))
+        await hub.publish(event("item", "updated", "i2", {"status": "done"}))
+        await hub.publish(event("item", "updated", "i2", {"title": "B"}))
+        await hub.publish(event("item", "deleted", "i2"))
+
+    asyncio.run(run())
+    frames = _frames("".join(sub.drain()))
+    assert frames == [
+        {"type": "item.created", "id": "i1", "data": {"title": "A", "status": "in_progress"}},
+        {"type": "item.deleted", "id": "i2", "data": {}},
+    ]
+    assert hub.stats()["coalesced"] == 3
+
+def test_slow_subscriber_overflows_and_is_dropped():
+    hub = EventHub()
+    sub = hub.subscribe({"items"})
+    sub.max_pending = 2
+
+    async def run():
+        await hub.publish(*(event("item", "updated", f"i{n}") for n in range(3)))
+        return [frame async for frame in hub.stream(sub)]
+
+    frames = asyncio.run(run())
+    assert frames[-1].startswith("event: overflow")
+    assert hub.stats() == {"subscribers": 0, "topics": 0, "published": 3, "dropped": 1, "coalesced": 0}
+
+def test_stream_tokens_only_open_the_event_stream():
+    from datetime import timedelta
+    from app.user_directory import user_directory
+    from app.utils.auth import create_access_token, resolve_principal
+    user_directory._put("u-events", {"username": "alice", "role": "developer"})
+    stream = create_access_token({"sub": "alice", "id": "u-events", "scope": "events"}, timedelta(seconds=60))
+    login = create_access_token({"sub": "alice", "id": "u-events"})
+    assert asyncio.run(resolve_principal(stream, scope="events"))["id"] == "u-events"
+    assert asyncio.run(resolve_principal(stream)) is None
+    assert asyncio.run(resolve_principal(login, scope="events")) is None
+    user_directory.invalidate("u-events")
@@ -129,3 +129,62 @@ def test_po_can_delete(client, po_token, epic_id, story_id, task_id, subtask_id)
     # delete epic
     d4 = client.delete(f"/epics/{epic_id}", headers={"Authorization": f"Bearer {po_token}"})
     assert d4.status_code == 200
+
+def test_epic_progress_rolls_up_items(client, po_token, dev_token, epic_id, story_id):
+    from bson import ObjectId
+    from app import crud, database
+    headers = {"Authorization": f"Bearer {po_token}"}
+
+    def progress():
+        epics = client.get("/epics/", headers=headers).json()
+        return next(e["progress"] for e in epics if e["id"] == epic_id)
+
+    bug = client.post("/items/", json={
+        "type": "bug", "title": "Bug 1", "epic_id": epic_id, "story_points": 5
+    }, headers=headers).json()["id"]
+    p = progress()
+    assert (p["total_points"], p["done_points"], p["item_count"]) == (8, 0, 2)
+    assert p["by_type"] == {"story": 1, "bug": 1}
+
+    client.put(f"/items/{story_id}", json={"status": "done"}, headers={"Authorization": f"Bearer {dev_token}"})
+    p = progress()
+    assert p["done_points"] == 3
+    assert p["by_status"]["done"] == 1
+
+    client.delete(f"/items/{bug}", headers=headers)
+    p = progress()
+    assert (p["total_points"], p["item_count"]) == (3, 1)
+
+    # Drift (e.g. a direct database edit) is repaired by the reconciler
+    client.portal.call(database.db.epics.update_one, {"_id": ObjectId(epic_id)}, {"$set": {"progress.total_points": 99}})
+    assert client.portal.call(crud.reconcile_epic_progress) >= 1
+    assert progress()["total_points"] == 3
+
+def test_hierarchy_tree(client, po_token, epic_id, story_id):
+    import json
+    headers = {"Authorization": f"Bearer {po_token}"}
+    task = client.post("/items/", json={
+        "type": "task", "title": "Task in epic", "epic_id": epic_id, "story_points": 1
+    }, headers=headers).json()["id"]
+    sub = client.post("/subtasks/", json={"title": "Sub", "parent_task_id": task}, headers=headers).json()["id"]
+
+    r = client.get(f"/hierarchy/?epic_ids={epic_id}", headers=headers)
+    assert r.status_code == 200
+    [epic] = r.json()
+    assert epic["id"] == epic_id
+    items = {i["id"]: i for i in epic["items"]}
+    assert set(items) == {story_id, task}
+    assert [s["id"] for s in items[task]["subtasks"]] == [sub]
+
+    shallow = client.get(f"/hierarchy/?epic_ids={epic_id}&depth=2", headers=headers).json()
+    assert all("subtasks" not in i for i in shallow[0]["items"])
+
+    # Status filter drops non-matching items, and epics left without items
+    assert client.get(f"/hierarchy/?epic_ids={epic_id}&status=done", headers=headers).json() == []
+
+    streamed = client.get(f"/hierarchy/?epic_ids={epic_id}&stream=true", headers=headers)
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in streamed.text.splitlines()] == [epic_id]
+
+    assert client.get(f"/subtasks/?parent_task_id={task}", headers=headers).json()[0]["id"] == sub
+    assert client.get("/hierarchy/?sprint_id=000000000000000000000000", headers=headers).status_code == 404
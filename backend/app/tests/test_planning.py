@@ -205,6 +205,29 @@ def test_update_existing_vote(client, auth_headers, test_story):
     assert response.json()["value"] == "8"
 
 
+def test_vote_count_tracks_distinct_voters(client, auth_headers, test_story):
+    """Re-voting replaces the vote without bumping the session's vote_count"""
+    create_response = client.post("/planning/sessions",
+        json={"story_id": test_story["id"], "scale": "fibonacci"},
+        headers=auth_headers["developer"]
+    )
+    session_id = create_response.json()["id"]
+
+    for role, value in (("developer", "3"), ("developer", "5"), ("product_owner", "8")):
+        response = client.post(f"/planning/sessions/{session_id}/vote",
+            json={"value": value},
+            headers=auth_headers[role]
+        )
+        assert response.status_code == 200
+
+    response = client.get(f"/planning/sessions/{session_id}", headers=auth_headers["developer"])
+    assert response.status_code == 200
+    assert response.json()["vote_count"] == 2
+
+    reveal = client.post(f"/planning/sessions/{session_id}/reveal", headers=auth_headers["product_owner"])
+    assert sorted(v["value"] for v in reveal.json()["votes"]) == ["5", "8"]
+
+
 def test_reveal_votes(client, auth_headers, test_story):
     """Test revealing votes"""
     # Create session
@@ -307,3 +330,33 @@ def test_session_not_found(client, auth_headers):
         headers=auth_headers["developer"]
     )
     assert response.status_code == 404
+
+
+def test_vote_over_websocket(client, auth_headers, test_story):
+    """Votes sent on the session socket are validated and counted like REST votes"""
+    create_response = client.post("/planning/sessions",
+        json={"story_id": test_story["id"], "scale": "fibonacci"},
+        headers=auth_headers["product_owner"]
+    )
+    session_id = create_response.json()["id"]
+    token = auth_headers["developer"]["Authorization"].split(" ", 1)[1]
+
+    def receive_until(ws, kind):
+        while True:
+            message = ws.receive_json()
+            if message["type"] == kind:
+                return message
+
+    with client.websocket_connect(f"/planning/ws/{session_id}?token={token}") as ws:
+        ws.send_text("ping")
+        ws.send_json({"type": "vote", "value": "banana"})
+        assert "Invalid vote value" in receive_until(ws, "error")["detail"]
+        ws.send_json({"type": "vote", "value": "5"})
+        assert receive_until(ws, "vote_submitted")["vote_count"] == 1
+        accepted = receive_until(ws, "vote_accepted")
+        assert accepted["value"] == "5"
+
+    response = client.get(f"/planning/sessions/{session_id}", headers=auth_headers["developer"])
+    assert response.json()["vote_count"] == 1
+    reveal = client.post(f"/planning/sessions/{session_id}/reveal", headers=auth_headers["product_owner"])
+    assert [v["id"] for v in reveal.json()["votes"]] == [accepted["id"]]
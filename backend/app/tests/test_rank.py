@@ -0,0 +1,59 @@
+import random
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import pytest
+from app.utils.rank import rank_after, rank_between, ranks_between, is_valid_rank
+
+def test_rank_between_open_ends():
+    first = rank_between(None, None)
+    assert is_valid_rank(first)
+    assert rank_between(None, first) < first < rank_between(first, None)
+
+def test_repeated_inserts_into_same_gap_never_collide():
+    lo = rank_between(None, None)
+    hi = rank_between(lo, None)
+    for _ in range(500):
+        mid = rank_between(lo, hi)
+        assert lo < mid < hi
+        assert is_valid_rank(mid)
+        hi = mid
+
+def test_random_inserts_keep_order():
+    rng = random.Random(7)
+    keys = [rank_between(None, None)]
+    for _ in range(2000):
+        i = rng.randint(0, len(keys))
+        prev = keys[i - 1] if i > 0 else None
+        nxt = keys[i] if i < len(keys) else None
+        keys.insert(i, rank_between(prev, nxt))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+def test_ranks_between_is_short_and_sorted():
+    keys = ranks_between(None, None, 1000)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 1000
+    assert max(len(k) for k in keys) <= 2
+    inner = ranks_between("a", "b", 10)
+    assert all("a" < k < "b" for k in inner)
+
+def test_invalid_ranks():
+    assert not is_valid_rank("")
+    assert not is_valid_rank("a0")
+    assert not is_valid_rank("a.b")
+    assert not is_valid_rank(1.5)
+    with pytest.raises(ValueError):
+        rank_between("b", "a")
+
+def test_appends_stay_short():
+    keys = [rank_after(None)]
+    for _ in range(5000):
+        keys.append(rank_after(keys[-1]))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert all(is_valid_rank(k) for k in keys)
+    assert len(keys[1000]) == 2
+    assert max(len(k) for k in keys) <= 4
+    # Past a long key the append is still short and still after it
+    assert "Vx3kq" < rank_after("Vx3kq") == "Vy"
+    assert "zzz" < rank_after("zzz") < rank_between("zzz", None)
@@ -39,9 +39,9 @@ def epic_id(client, po_token):
 
 def test_patch_rank_creates_audit(client, po_token, epic_id):
     # Update rank
-    pr = client.patch(f"/epics/{epic_id}/rank", json={"rank": 42.5}, headers={"Authorization": f"Bearer {po_token}"})
+    pr = client.patch(f"/epics/{epic_id}/rank", json={"rank": "V5"}, headers={"Authorization": f"Bearer {po_token}"})
     assert pr.status_code == 200
-    assert pr.json()["rank"] == 42.5
+    assert pr.json()["rank"] == "V5"
 
     # Fetch audits
     audits = client.get(f"/audits/?entity=epic&entity_id={epic_id}", headers={"Authorization": f"Bearer {po_token}"})
@@ -52,4 +52,102 @@ def test_patch_rank_creates_audit(client, po_token, epic_id):
     assert latest["entity"] == "epic"
     assert latest["entity_id"] == epic_id
     assert latest["action"] == "reorder"
-    assert latest["changes"]["rank"] == 42.5
+    assert latest["changes"]["rank"] == "V5"
+
+def test_rank_rejects_raw_floats(client, po_token, epic_id):
+    pr = client.patch(f"/epics/{epic_id}/rank", json={"rank": 42.5}, headers={"Authorization": f"Bearer {po_token}"})
+    assert pr.status_code == 400
+
+def test_move_between_neighbours(client, po_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    a = client.post("/epics/", json={"title": "Move A"}, headers=headers).json()["id"]
+    b = client.post("/epics/", json={"title": "Move B"}, headers=headers).json()["id"]
+
+    # Keep dropping a new epic into the same shrinking gap; floats ran out after ~50 of these
+    for _ in range(60):
+        n = client.post("/epics/", json={"title": "Move N"}, headers=headers).json()["id"]
+        moved = client.patch(f"/epics/{n}/rank", json={"after_id": a, "before_id": b}, headers=headers)
+        assert moved.status_code == 200
+        ranks = {e["id"]: e["rank"] for e in client.get("/epics/", headers=headers).json()}
+        assert ranks[a] < ranks[n] < ranks[b]
+        b = n
+
+    # Only after_id: the server finds the next neighbour itself
+    moved = client.patch(f"/epics/{a}/rank", json={"after_id": b}, headers=headers)
+    assert moved.status_code == 200
+    ranks = {e["id"]: e["rank"] for e in client.get("/epics/", headers=headers).json()}
+    assert ranks[b] < ranks[a]
+
+    bad = client.patch(f"/epics/{a}/rank", json={"after_id": "000000000000000000000000"}, headers=headers)
+    assert bad.status_code == 400
+
+def test_audit_sink_stats(client, po_token, epic_id):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    client.patch(f"/epics/{epic_id}/rank", json={"rank": "k"}, headers=headers)
+    # Reading audits flushes the queue, so the event is visible immediately
+    audits = client.get(f"/audits/?entity=epic&entity_id={epic_id}", headers=headers)
+    assert audits.json()[0]["changes"]["rank"] == "k"
+    stats = client.get("/audits/stats", headers=headers)
+    assert stats.status_code == 200
+    body = stats.json()
+    assert body["running"] is True
+    assert body["written"] >= 1
+    assert body["dropped"] == 0
+
+def test_audits_paginate_and_filter(client, po_token, epic_id):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    for rank in ("a", "b", "c", "d", "e"):
+        client.patch(f"/epics/{epic_id}/rank", json={"rank": rank}, headers=headers)
+    client.patch(f"/epics/{epic_id}/bulk", json={"labels": ["x"]}, headers=headers)
+
+    first = client.get(f"/audits/?entity=epic&entity_id={epic_id}&action=reorder&limit=2", headers=headers)
+    assert first.status_code == 200
+    assert [e["changes"]["rank"] for e in first.json()] == ["e", "d"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/audits/", params={"entity": "epic", "entity_id": epic_id, "action": "reorder", "limit": 2, "before": cursor}, headers=headers)
+    assert [e["changes"]["rank"] for e in second.json()] == ["c", "b"]
+
+    newest = first.json()[0]["created_at"]
+    none_newer = client.get("/audits/", params={"entity": "epic", "entity_id": epic_id, "action": "reorder", "after": newest}, headers=headers)
+    assert none_newer.json() == []
+
+    bad = client.get("/audits/", params={"entity": "epic", "entity_id": epic_id, "before": "garbage"}, headers=headers)
+    assert bad.status_code == 400
+
+def test_archived_audits_are_read_transparently(client, po_token, epic_id):
+    from datetime import datetime, timedelta
+    from app import crud
+    headers = {"Authorization": f"Bearer {po_token}"}
+    client.patch(f"/epics/{epic_id}/rank", json={"rank": "m"}, headers=headers)
+    client.patch(f"/epics/{epic_id}/rank", json={"rank": "n"}, headers=headers)
+    before = client.get(f"/audits/?entity=epic&entity_id={epic_id}", headers=headers).json()
+
+    # Archive everything written so far, as if it had aged out of the hot window
+    moved = client.portal.call(crud.archive_audits, datetime.utcnow() + timedelta(seconds=1))
+    assert moved >= 2
+
+    after = client.get(f"/audits/?entity=epic&entity_id={epic_id}", headers=headers).json()
+    assert [e["_id"] for e in after] == [e["_id"] for e in before]
+    page = client.get(f"/audits/?entity=epic&entity_id={epic_id}&limit=1", headers=headers)
+    assert page.json()[0]["changes"]["rank"] == "n"
+    assert page.headers.get("X-Next-Cursor")
+
+def test_audit_batch_shares_one_enqueue_deadline():
+    import asyncio
+    from app.audit import AuditSink
+
+    async def scenario():
+        sink = AuditSink(max_queue=1, enqueue_timeout=0.01)
+        # Running, but with no writer draining the queue
+        sink.queue = asyncio.Queue(maxsize=1)
+        sink._wake = asyncio.Event()
+        sink._task = asyncio.get_running_loop().create_future()
+        await sink.put_many([{"n": i} for i in range(5)])
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert sink.queue.qsize() == 1
+    # Only the first event that found the queue full waited; the rest were dropped with it
+    assert sink.backpressure_waits == 1
+    assert sink.dropped == 4
@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from app.search_index import ItemSearchIndex
+
+def _index():
+    index = ItemSearchIndex(enabled=True)
+    index.ready = True
+    index.upsert("1", {"title": "Checkout refactor", "description": "", "labels": ["payments"], "type": "story", "status": "todo", "rank": "b"})
+    index.upsert("2", {"title": "Cleanup", "description": "touches checkout code", "labels": [], "type": "bug", "status": "todo", "rank": "a"})
+    index.upsert("3", {"title": "Login page", "description": "", "labels": [], "type": "story", "status": "done", "rank": "c"})
+    return index
+
+def test_prefix_matches_rank_title_hits_first():
+    index = _index()
+    assert [r["id"] for r in index.suggest("chec")] == ["1", "2"]
+    assert [r["id"] for r in index.suggest("check refac")] == ["1"]
+    assert [r["id"] for r in index.suggest("pay")] == ["1"]
+    assert index.suggest("zzz") == []
+
+def test_filters_and_limit():
+    index = _index()
+    assert [r["id"] for r in index.suggest("chec", type="bug")] == ["2"]
+    assert [r["id"] for r in index.suggest("c", status="todo", limit=1)] == ["2"]
+    assert set(index.suggest("login")[0]) == {"id", "title", "type", "status", "epic_id", "rank"}
+
+def test_updates_and_removes_drop_stale_terms():
+    index = _index()
+    index.update("1", {"title": "Billing revamp"})
+    assert [r["id"] for r in index.suggest("refac")] == []
+    assert [r["id"] for r in index.suggest("bill")] == ["1"]
+    index.update("99", {"title": "Unknown"})  # not indexed: ignored
+    assert index.suggest("unknown") == []
+    index.remove("2")
+    assert index.suggest("cleanup") == []
+    assert "cleanup" not in index._index.terms
+
+def test_writes_are_ignored_until_built():
+    index = ItemSearchIndex(enabled=True)
+    index.upsert("1", {"title": "Checkout"})
+    assert index.stats()["items"] == 0
@@ -111,4 +111,131 @@ def test_add_and_remove_item_and_burndown(client, sm_token, po_token, dev_token,
     # PO can remove item
     rm_po = client.delete(f"/sprints/{sprint_id}/items/{backlog_item_id}", headers={"Authorization": f"Bearer {po_token}"})
     assert rm_po.status_code == 200
-    assert backlog_item_id not in rm_po.json()["backlog_items"]
\ No newline at end of file
+    assert backlog_item_id not in rm_po.json()["backlog_items"]
+
+def test_batch_burndown(client, sm_token, po_token, dev_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    done = client.post("/items", json={"type": "task", "title": "BD done", "story_points": 5}, headers=headers).json()["id"]
+    client.put(f"/items/{done}", json={"status": "done"}, headers=headers)
+    todo = client.post("/items", json={"type": "task", "title": "BD todo", "story_points": 3}, headers=headers).json()["id"]
+
+    full = client.post("/sprints/", json={"goal": "Batch BD", "duration": 7, "backlog_items": [done, todo]},
+                       headers={"Authorization": f"Bearer {sm_token}"}).json()["id"]
+    empty = client.post("/sprints/", json={"goal": "Empty BD", "duration": 7, "backlog_items": []},
+                        headers={"Authorization": f"Bearer {sm_token}"}).json()["id"]
+
+    resp = client.get("/sprints/burndown", params={"ids": f"{full},{empty}"}, headers={"Authorization": f"Bearer {dev_token}"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data[full] == {"total": 8, "remaining": 3, "completed": 5}
+    assert data[empty] == {"total": 0, "remaining": 0, "completed": 0}
+
+    single = client.get(f"/sprints/{full}/burndown", headers={"Authorization": f"Bearer {dev_token}"})
+    assert single.json() == data[full]
+
+def test_burndown_series_tracks_item_changes(client, sm_token, po_token, dev_token):
+    headers = {"Authorization": f"Bearer {po_token}"}
+    item = client.post("/items", json={"type": "task", "title": "Series item", "story_points": 5}, headers=headers).json()["id"]
+    sprint_id = client.post("/sprints/", json={"goal": "Series", "duration": 7, "backlog_items": []},
+                            headers={"Authorization": f"Bearer {sm_token}"}).json()["id"]
+    client.post(f"/sprints/{sprint_id}/items/{item}", headers={"Authorization": f"Bearer {sm_token}"})
+
+    series = client.get(f"/sprints/{sprint_id}/burndown/series", headers={"Authorization": f"Bearer {dev_token}"})
+    assert series.status_code == 200
+    today = series.json()[-1]
+    assert (today["total"], today["remaining"], today["completed"]) == (5, 5, 0)
+
+    client.put(f"/items/{item}", json={"status": "done"}, headers={"Authorization": f"Bearer {dev_token}"})
+    today = client.get(f"/sprints/{sprint_id}/burndown/series", headers={"Authorization": f"Bearer {dev_token}"}).json()[-1]
+    assert (today["total"], today["remaining"], today["completed"]) == (5, 0, 5)
+
+    missing = client.get("/sprints/000000000000000000000000/burndown/series", headers={"Authorization": f"Bearer {dev_token}"})
+    assert missing.status_code == 404
+
+def test_sprint_board(client, dev_token, sm_token, po_token, backlog_item_id):
+    po = {"Authorization": f"Bearer {po_token}"}
+    epic_id = client.post("/epics/", json={"title": "Board Epic"}, headers=po).json()["id"]
+    done_id = client.post("/items", json={
+        "type": "story", "title": "Done story", "status": "done", "epic_id": epic_id, "story_points": 2
+    }, headers=po).json()["id"]
+    client.post("/subtasks/", json={"title": "Sub 1", "parent_task_id": backlog_item_id}, headers=po)
+    sub2 = client.post("/subtasks/", json={"title": "Sub 2", "parent_task_id": backlog_item_id}, headers=po).json()["id"]
+    client.put(f"/subtasks/{sub2}", json={"status": "done"}, headers=po)
+    sprint_id = client.post("/sprints/", json={
+        "goal": "Board Sprint", "duration": 7, "backlog_items": [backlog_item_id, done_id]
+    }, headers={"Authorization": f"Bearer {sm_token}"}).json()["id"]
+
+    dev = {"Authorization": f"Bearer {dev_token}"}
+    response = client.get(f"/sprints/{sprint_id}/board", headers=dev)
+    assert response.status_code == 200
+    board = response.json()
+    assert board["columns"][:3] == ["todo", "in_progress", "done"]
+    [lane] = board["lanes"]
+    [todo] = lane["columns"]["todo"]
+    assert todo["id"] == backlog_item_id
+    assert (todo["subtask_count"], todo["subtasks_done"]) == (2, 1)
+    assert [i["id"] for i in lane["columns"]["done"]] == [done_id]
+
+    lanes = client.get(f"/sprints/{sprint_id}/board?swimlane=epic", headers=dev).json()["lanes"]
+    assert [(l["key"], l["title"]) for l in lanes] == [(epic_id, "Board Epic"), (None, None)]
+
+    assert client.get(f"/sprints/{sprint_id}/board?swimlane=colour", headers=dev).status_code == 400
+    assert client.get("/sprints/000000000000000000000000/board", headers=dev).status_code == 404
+
+def test_batch_membership_moves_items_between_sprints(client, sm_token, po_token, dev_token):
+    po = {"Authorization": f"Bearer {po_token}"}
+    sm = {"Authorization": f"Bearer {sm_token}"}
+    ids = [
+        client.post("/items", json={"type": "task", "title": f"Batch {n}", "story_points": 1}, headers=po).json()["id"]
+        for n in range(3)
+    ]
+    first = client.post("/sprints/", json={"goal": "First", "duration": 7, "backlog_items": ids}, headers=sm).json()["id"]
+    second = client.post("/sprints/", json={"goal": "Second", "duration": 7, "backlog_items": []}, headers=sm).json()["id"]
+
+    r = client.post(f"/sprints/{second}/items:batch", json={"add": ids[:2]}, headers=sm)
+    assert r.status_code == 200
+    assert sorted(r.json()["backlog_items"]) == sorted(ids[:2])
+    assert client.get(f"/sprints/{first}", headers=sm).json()["backlog_items"] == [ids[2]]
+    dev = {"Authorization": f"Bearer {dev_token}"}
+    assert client.get(f"/items/{ids[0]}", headers=dev).json()["sprint_id"] == second
+    in_second = client.get(f"/items/?sprint_id={second}", headers=dev).json()
+    assert sorted(i["id"] for i in in_second) == sorted(ids[:2])
+
+    r = client.post(f"/sprints/{second}/items:batch", json={"remove": [ids[0]]}, headers=sm)
+    assert r.json()["backlog_items"] == [ids[1]]
+    assert client.get(f"/items/{ids[0]}", headers=dev).json()["sprint_id"] is None
+
+    assert client.post(f"/sprints/{second}/items:batch", json={"add": [ids[0]]}, headers=dev).status_code == 403
+    assert client.post("/sprints/000000000000000000000000/items:batch", json={"add": ids}, headers=sm).status_code == 404
+
+    # Deleting an item also takes it out of its sprint
+    assert client.delete(f"/items/{ids[1]}", headers=po).status_code == 200
+    assert client.get(f"/sprints/{second}", headers=sm).json()["backlog_items"] == []
+
+def test_interleaved_moves_of_one_item(client, sm_token, po_token, dev_token, monkeypatch):
+    from app import crud
+    po = {"Authorization": f"Bearer {po_token}"}
+    sm = {"Authorization": f"Bearer {sm_token}"}
+    item = client.post("/items", json={"type": "task", "title": "Contested", "story_points": 2}, headers=po).json()["id"]
+    first = client.post("/sprints/", json={"goal": "Race A", "duration": 7, "backlog_items": []}, headers=sm).json()["id"]
+    second = client.post("/sprints/", json={"goal": "Race B", "duration": 7, "backlog_items": []}, headers=sm).json()["id"]
+
+    real_stamps = crud._change_stamps
+    rival = []
+
+    async def stamps_after_rival_move(n):
+        # A second move lands after this one read the item but before it writes
+        if not rival:
+            rival.append(await crud.move_items_to_sprint(second, add=[item]))
+        return await real_stamps(n)
+
+    monkeypatch.setattr(crud, "_change_stamps", stamps_after_rival_move)
+    client.portal.call(crud.move_items_to_sprint, first, [item])
+    assert rival and rival[0].backlog_items == [item]
+
+    dev = {"Authorization": f"Bearer {dev_token}"}
+    assert client.get(f"/items/{item}", headers=dev).json()["sprint_id"] == first
+    assert client.get(f"/sprints/{first}", headers=sm).json()["backlog_items"] == [item]
+    assert client.get(f"/sprints/{second}", headers=sm).json()["backlog_items"] == []
+    burndown = client.get("/sprints/burndown", params={"ids": f"{first},{second}"}, headers=dev).json()
+    assert burndown[first]["total"] == 2 and burndown[second]["total"] == 0
@@ -33,4 +33,52 @@ def test_login_user(client):
         "password": "testpass"
     })
     assert response.status_code == 200
-    assert "access_token" in response.json()
\ No newline at end of file
+    assert "access_token" in response.json()
+
+def test_login_rehashes_outdated_password(client):
+    from passlib.hash import bcrypt
+    from app import database
+    from app.utils.auth import BCRYPT_ROUNDS
+
+    client.post("/users/register", json={
+        "username": "rehash_user",
+        "password": "testpass",
+        "role": "product_owner"
+    })
+    # Simulate a hash stored before the cost factor was raised
+    cheap = bcrypt.using(rounds=4).hash("testpass")
+    client.portal.call(database.db.users.update_one, {"username": "rehash_user"}, {"$set": {"password": cheap}})
+
+    response = client.post("/users/login", data={"username": "rehash_user", "password": "testpass"})
+    assert response.status_code == 200
+    stored = client.portal.call(database.db.users.find_one, {"username": "rehash_user"})
+    assert stored["password"] != cheap
+    assert bcrypt.from_string(stored["password"]).rounds == BCRYPT_ROUNDS
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    stats = client.get("/users/password-hashing/stats", headers=headers).json()
+    assert stats["rounds"] == BCRYPT_ROUNDS
+    assert stats["pending"] == 0
+    assert stats["rehashed"] >= 1
+
+def test_role_change_applies_to_existing_tokens(client):
+    from app import database
+    from app.user_directory import user_directory
+
+    client.post("/users/register", json={
+        "username": "promoted_user",
+        "password": "testpass",
+        "role": "developer"
+    })
+    token = client.post("/users/login", data={"username": "promoted_user", "password": "testpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/users/password-hashing/stats", headers=headers).status_code == 403
+
+    # The token still says developer; the user record now says scrum_master
+    client.portal.call(database.db.users.update_one, {"username": "promoted_user"}, {"$set": {"role": "scrum_master"}})
+    user_directory.invalidate()
+    assert client.get("/users/password-hashing/stats", headers=headers).status_code == 200
+
+    client.portal.call(database.db.users.delete_one, {"username": "promoted_user"})
+    user_directory.invalidate()
+    assert client.get("/users/password-hashing/stats", headers=headers).status_code == 401
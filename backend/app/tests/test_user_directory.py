@@ -0,0 +1,45 @@
+import asyncio
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from app.user_directory import UserDirectory
+
+def test_cached_ids_resolve_without_a_query():
+    directory = UserDirectory(max_size=10, ttl=60)
+    directory._put("u1", {"username": "alice"})
+    directory._put("u2", None)  # remembered miss
+    assert asyncio.run(directory.resolve(["u1", "u2", "u1"])) == {"u1": "alice"}
+
+def test_lru_evicts_oldest_and_invalidate():
+    directory = UserDirectory(max_size=2, ttl=60)
+    directory._put("a", {"username": "A"})
+    directory._put("b", {"username": "B"})
+    directory._get("a")  # touch: b is now least recent
+    directory._put("c", {"username": "C"})
+    assert directory._get("b") == (False, None)
+    assert directory._get("a") == (True, {"username": "A"})
+    directory.invalidate("a")
+    assert directory._get("a") == (False, None)
+
+def test_entries_expire():
+    directory = UserDirectory(max_size=2, ttl=-1)
+    directory._put("a", {"username": "A"})
+    assert directory._get("a") == (False, None)
+
+def test_fill_usernames_only_touches_legacy_docs():
+    directory = UserDirectory()
+    directory._put("u1", {"username": "alice"})
+    docs = [{"user_id": "u1"}, {"user_id": "u1", "username": "kept"}, {"text": "no user"}]
+    asyncio.run(directory.fill_usernames(docs))
+    assert [d.get("username") for d in docs] == ["alice", "kept", None]
+
+def test_token_cache_only_hits_the_exact_verified_token():
+    from app.utils.auth import _verify_token, create_access_token, token_cache
+    token_cache.clear()
+    token = create_access_token({"sub": "alice", "id": "u1"})
+    assert _verify_token(token)["sub"] == "alice"
+    header, payload, signature = token.split(".")
+    forged = create_access_token({"sub": "mallory", "id": "u2"}).split(".")[1]
+    assert _verify_token(f"a.b.{signature}") is None
+    assert _verify_token(f"{header}.{forged}.{signature}") is None
+    assert _verify_token(token)["id"] == "u1"
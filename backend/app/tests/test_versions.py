@@ -0,0 +1,48 @@
+import asyncio
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils.auth import get_current_user
+from app.versions import CollectionVersions, collection_versions, conditional, _matches
+
+def _app(calls):
+    app = FastAPI()
+    app.dependency_overrides[get_current_user] = lambda: {"id": "u1", "role": "developer"}
+
+    @app.get("/things", dependencies=[conditional("things")])
+    async def things(kind: str = ""):
+        calls.append(kind)
+        return [kind]
+
+    return app
+
+def test_unchanged_collection_answers_304_without_running_the_handler():
+    calls = []
+    client = TestClient(_app(calls))
+    first = client.get("/things")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    again = client.get("/things", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert calls == [""]
+    # Each query string gets its own tag
+    assert client.get("/things", params={"kind": "x"}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_write_changes_the_tag():
+    client = TestClient(_app([]))
+    etag = client.get("/things").headers["ETag"]
+    asyncio.run(collection_versions.bump("things"))
+    changed = client.get("/things", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+def test_tags_differ_between_processes_and_weak_comparison():
+    a, b = CollectionVersions(), CollectionVersions()
+    assert a.etag(("things",)) != b.etag(("things",))
+    tag = a.etag(("things",), "k")
+    assert _matches(tag.removeprefix("W/"), tag)
+    assert _matches(f'"other", {tag}', tag)
+    assert not _matches('"other"', tag)
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from os import environ
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+
+from . import database
+
+USER_CACHE_SIZE = int(environ.get("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(environ.get("USER_CACHE_TTL_SECONDS", "300"))
+
+
+# Fields kept per cached user; enough to name a user and to authorize a request
+USER_FIELDS = {"username": 1, "role": 1}
+
+
+class UserDirectory:
+    """user_id -> user record (username, role), batched into one `$in` query and kept in an LRU with TTL.
+
+    Entries are invalidated by the crud functions that change users; the TTL
+    bounds how long a change made outside the app (e.g. a role edited in the
+    database) takes to apply.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+
+    def _get(self, user_id: str) -> tuple[bool, Optional[Dict[str, Any]]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False, None
+        expires, record = entry
+        if expires < time.monotonic():
+            self._entries.pop(user_id, None)
+            return False, None
+        self._entries.move_to_end(user_id)
+        return True, record
+
+    def _put(self, user_id: str, record: Optional[Dict[str, Any]]):
+        self._entries[user_id] = (time.monotonic() + self.ttl, record)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[Any] = None):
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(user_id), None)
+
+    async def get_many(self, user_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Map each known user id to its cached record; unknown ids are left out."""
+        result: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for uid in {str(u) for u in user_ids if u}:
+            hit, record = self._get(uid)
+            if not hit:
+                missing.append(uid)
+            elif record:
+                result[uid] = record
+        oids = [ObjectId(uid) for uid in missing if ObjectId.is_valid(uid)]
+        found: Dict[str, Dict[str, Any]] = {}
+        if oids:
+            cursor = database.db.users.find({"_id": {"$in": oids}}, USER_FIELDS)  # type: ignore
+            async for doc in cursor:
+                found[str(doc.pop("_id"))] = doc
+        for uid in missing:
+            # Remember misses too, so a deleted user doesn't cost a query every time
+            self._put(uid, found.get(uid))
+            if uid in found:
+                result[uid] = found[uid]
+        return result
+
+    async def get(self, user_id: Any) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([user_id])).get(str(user_id))
+
+    async def resolve(self, user_ids: Iterable[Any]) -> Dict[str, str]:
+        """Map each known user id to its username; unknown ids are left out."""
+        records = await self.get_many(user_ids)
+        return {uid: r["username"] for uid, r in records.items() if r.get("username")}
+
+    async def fill_usernames(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Set `username` on legacy documents that only carry `user_id`."""
+        pending = [d for d in docs if not d.get("username") and d.get("user_id")]
+        if not pending:
+            return
+        names = await self.resolve(d["user_id"] for d in pending)
+        for doc in pending:
+            name = names.get(str(doc["user_id"]))
+            if name:
+                doc["username"] = name
+
+
+user_directory = UserDirectory()
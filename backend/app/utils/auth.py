@@ -1,23 +1,73 @@
+import asyncio
+import hashlib
 import jwt
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Union
+from typing import Any, Dict, Optional, Tuple, Union
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
 from os import environ
 
+from ..user_directory import user_directory
+
 SECRET_KEY = environ.get("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verified tokens remembered by a digest of the whole token, so repeat requests skip the HMAC check
+TOKEN_CACHE_SIZE = int(environ.get("TOKEN_CACHE_SIZE", "4096"))
+
+# bcrypt cost factor; hashes made with another cost are upgraded on the next login
+BCRYPT_ROUNDS = int(environ.get("BCRYPT_ROUNDS", "12"))
+# bcrypt runs on its own small pool so a login burst can't block the event loop
+PASSWORD_HASH_WORKERS = int(environ.get("PASSWORD_HASH_WORKERS", "2"))
+# Hash/verify calls allowed to wait for a worker before new ones are refused with 503
+PASSWORD_HASH_MAX_PENDING = int(environ.get("PASSWORD_HASH_MAX_PENDING", "64"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_stats = {"pending": 0, "completed": 0, "rejected": 0, "rehashed": 0}
+
+async def _run_hashing(fn, *args):
+    if _hash_stats["pending"] >= PASSWORD_HASH_MAX_PENDING:
+        _hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent sign-ins, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_stats["pending"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_stats["pending"] -= 1
+        _hash_stats["completed"] += 1
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Check a password; also returns a new hash when the stored one uses outdated settings."""
+    valid, new_hash = await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        _hash_stats["rehashed"] += 1
+    return valid, new_hash
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+def password_hash_stats() -> Dict[str, Any]:
+    """`pending` is the queue depth: calls running or waiting for a hashing worker."""
+    return {
+        **_hash_stats,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "rounds": BCRYPT_ROUNDS,
+    }
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
     to_encode = data.copy()
@@ -29,22 +79,84 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+class _TokenCache:
+    """LRU of token digest -> verified claims; entries die with the token's own `exp`.
+
+    The key covers every byte of the token, so a hit means this exact token
+    was verified before; a reused signature on another header or payload misses.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        claims = self._entries.get(key)
+        if claims is None:
+            return None
+        if claims.get("exp", float("inf")) <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        key = self._key(token)
+        self._entries[key] = claims
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+token_cache = _TokenCache()
+
+def _verify_token(token: str) -> Optional[Dict[str, Any]]:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        user_id: str = payload.get("id")
-        role: str | None = payload.get("role")
-        if username is None or user_id is None:
-            raise credentials_exception
-        return {"username": username, "id": user_id, "role": role}
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
-        raise credentials_exception
+        return None
+    if claims.get("sub") is None or claims.get("id") is None:
+        return None
+    token_cache.put(token, claims)
+    return claims
+
+async def resolve_principal(token: Optional[str], scope: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Turn a bearer token into {"username", "id", "role"}, or None if it isn't valid.
+
+    Shared by the HTTP dependency and the planning WebSocket. The role comes
+    from the (cached) user record rather than the token, so role changes and
+    deleted users take effect without waiting for the token to expire.
+    A token's `scope` claim must equal `scope`: narrow tokens (e.g. the
+    short-lived "events" stream token) are refused everywhere else.
+    """
+    if not token:
+        return None
+    claims = _verify_token(token)
+    if claims is None or claims.get("scope") != scope:
+        return None
+    user = await user_directory.get(claims["id"])
+    if user is None:
+        return None
+    return {"username": user.get("username", claims["sub"]), "id": claims["id"], "role": user.get("role")}
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    principal = await resolve_principal(token)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
 def require_roles(*allowed_roles: str):
     def _dep(current_user: dict = Depends(get_current_user)):
@@ -0,0 +1,84 @@
+"""String fractional-index ranks.
+
+A rank is a base-62 fraction written without the leading "0.", e.g. "V" ~ 0.5.
+Digits are in ASCII order, so plain string comparison (and Mongo's string sort)
+orders ranks correctly, and there is always room between two distinct ranks:
+`rank_between` just grows the key by a digit when the gap is exhausted.
+Ranks never end in the zero digit, which keeps room before any key as well.
+
+Appends don't bisect towards 1.0 (that adds a digit every few keys); `rank_after`
+steps by a fixed small amount instead, see there.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {c: i for i, c in enumerate(DIGITS)}
+
+
+def is_valid_rank(rank: object) -> bool:
+    return (
+        isinstance(rank, str)
+        and len(rank) > 0
+        and all(c in _INDEX for c in rank)
+        and rank[-1] != DIGITS[0]
+    )
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    # a < b (b None = 1.0); neither has trailing zero digits
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Adjacent first digits
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def rank_between(prev_rank: Optional[str], next_rank: Optional[str]) -> str:
+    """Return a rank strictly between prev_rank and next_rank (None = open end)."""
+    if prev_rank is not None and next_rank is not None and prev_rank >= next_rank:
+        raise ValueError(f"rank {prev_rank!r} is not before {next_rank!r}")
+    return _midpoint(prev_rank or "", next_rank)
+
+
+def rank_after(prev_rank: Optional[str]) -> str:
+    """Return a short rank after prev_rank, for appending at the end.
+
+    The key is cut to a fixed width and incremented there like an integer. The
+    width is twice the number of leading "z" digits plus two, so the step stays
+    small next to the room left below 1.0: keys stay two digits long for the
+    first ~1900 appends after "V", and four for the next ~240k.
+    """
+    if prev_rank is None:
+        return rank_between(None, None)
+    leading = len(prev_rank) - len(prev_rank.lstrip(DIGITS[-1]))
+    width = 2 * leading + 2
+    digits = [_INDEX[c] for c in prev_rank[:width].ljust(width, DIGITS[0])]
+    i = width - 1
+    # Never carries past the first non-"z" digit, so the result stays below 1.0
+    while digits[i] == BASE - 1:
+        digits[i] = 0
+        i -= 1
+    digits[i] += 1
+    return "".join(DIGITS[d] for d in digits).rstrip(DIGITS[0])
+
+
+def ranks_between(prev_rank: Optional[str], next_rank: Optional[str], count: int) -> List[str]:
+    """Return `count` ascending, evenly spread ranks between the bounds.
+
+    Bisecting recursively keeps the keys about log62(count) digits long.
+    """
+    if count <= 0:
+        return []
+    mid = rank_between(prev_rank, next_rank)
+    left = (count - 1) // 2
+    return ranks_between(prev_rank, mid, left) + [mid] + ranks_between(mid, next_rank, count - 1 - left)
@@ -0,0 +1,101 @@
+"""Per-collection version counters behind the weak ETags of read endpoints.
+
+crud bumps a collection's counter after every write to it, so a read endpoint
+can tell from memory whether a client's copy is still current and answer
+`304 Not Modified` before any query runs. Counters start from a random epoch
+per process, so a tag issued by one worker never matches on another. With
+PLANNING_BACKPLANE=mongo, bumps are also relayed to the other workers; until
+a relayed bump arrives (normally milliseconds) a worker can still answer 304
+for a write made elsewhere.
+"""
+import hashlib
+import logging
+import uuid
+from collections import defaultdict
+from os import environ
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from .backplane import PLANNING_BACKPLANE, Backplane, create_backplane
+from .utils.auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_BACKPLANE_COLLECTION = environ.get("VERSIONS_BACKPLANE_COLLECTION", "collection_versions")
+
+# Clients must revalidate every time; the ETag makes that cheap
+CACHE_CONTROL = "private, no-cache"
+
+
+class CollectionVersions:
+    def __init__(self, backplane: Optional[Backplane] = None):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = defaultdict(int)
+        self.backplane = backplane
+        self._running = False
+
+    async def start(self):
+        if self.backplane is not None and not self._running:
+            await self.backplane.start(self._deliver)
+            self._running = True
+
+    async def stop(self):
+        if self._running:
+            await self.backplane.stop()  # type: ignore
+            self._running = False
+
+    def get(self, collection: str) -> int:
+        return self._versions[collection]
+
+    async def bump(self, *collections: str):
+        """Call after the write has happened, so a tag never predates the data it covers."""
+        for collection in collections:
+            self._versions[collection] += 1
+        if self._running:
+            try:
+                await self.backplane.publish("versions", {"origin": self.epoch, "collections": list(collections)})  # type: ignore
+            except Exception:
+                logger.exception("version bump relay failed")
+
+    async def _deliver(self, channel: str, message: Dict[str, Any]):
+        if message.get("origin") == self.epoch:
+            return
+        for collection in message.get("collections", []):
+            self._versions[collection] += 1
+
+    def etag(self, collections: tuple, key: str = "") -> str:
+        versions = ".".join(str(self._versions[c]) for c in collections)
+        digest = hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+        return f'W/"{self.epoch}-{versions}-{digest}"'
+
+
+collection_versions = CollectionVersions(
+    None if PLANNING_BACKPLANE == "memory" else create_backplane(PLANNING_BACKPLANE, VERSIONS_BACKPLANE_COLLECTION)
+)
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def conditional(*collections: str):
+    """Dependency for read endpoints over `collections`: sets ETag, or raises 304 on a match.
+
+    The tag covers the path and query string, so every filter or page has its own.
+    Authentication still runs first, so a 304 is never sent to an anonymous caller.
+    """
+    async def check(request: Request, response: Response, current_user: dict = Depends(get_current_user)):
+        etag = collection_versions.etag(collections, f"{request.url.path}?{request.url.query}")
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check)
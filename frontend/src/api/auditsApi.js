@@ -1,9 +1,10 @@
 import http from './http'
 
-// List audits for an entity/id pair
-// Backend: GET /audits/?entity=<string>&entity_id=<string>
-export async function listAudits({ entity, entity_id }) {
+// List audits for an entity/id pair, newest first
+// Backend: GET /audits/?entity=<string>&entity_id=<string>&limit=&before=&after=&action=&user_id=
+// `before` takes the X-Next-Cursor header of the previous page
+export async function listAudits({ entity, entity_id, limit = 50, ...filters }) {
   if (!entity || !entity_id) throw new Error('entity and entity_id are required')
-  const { data } = await http.get('/audits/', { params: { entity, entity_id } })
+  const { data } = await http.get('/audits/', { params: { entity, entity_id, limit, ...filters } })
   return data
 }
@@ -10,6 +10,12 @@ export const getBacklogItems = async () => {
   return data;
 };
 
+// Full list plus the change-feed position to sync from (pass as `since` to getItemChanges)
+export const getBacklogSnapshot = async () => {
+  const res = await http.get('/items/');
+  return { items: res.data, seq: Number(res.headers['x-change-seq'] || 0) };
+};
+
 export const getBacklogItem = async (id) => {
   const { data } = await http.get(`/items/${id}`);
   return data;
@@ -23,4 +29,36 @@ export const updateBacklogItem = async (id, updateData) => {
 export const deleteBacklogItem = async (id) => {
   const { data } = await http.delete(`/items/${id}`);
   return data;
-};
\ No newline at end of file
+};
+// Keyset page of items; `cursor` is the X-Next-Cursor value from the previous page
+export const getBacklogItemsPage = async ({ limit = 100, cursor, fields, ...filters } = {}) => {
+  const params = { ...filters, limit };
+  if (cursor) params.cursor = cursor;
+  if (fields) params.fields = Array.isArray(fields) ? fields.join(',') : fields;
+  const res = await http.get('/items/', { params });
+  return { items: res.data, nextCursor: res.headers['x-next-cursor'] || null };
+};
+
+// Place an item between two neighbours (either may be null for the ends)
+export const moveBacklogItem = async (id, { afterId = null, beforeId = null }) => {
+  const { data } = await http.post(`/items/${id}/rank`, { after_id: afterId, before_id: beforeId });
+  return data;
+};
+
+// Many items in one call: pass { updates: [{ id, changes }] } or { filter, changes }
+export const bulkUpdateItems = async (payload) => {
+  const { data } = await http.patch('/items/bulk', payload);
+  return data;
+};
+
+// Type-ahead matches ({ id, title, type, status, epic_id, rank }) for the words typed so far
+export const suggestItems = async (q, { limit = 10, ...filters } = {}) => {
+  const { data } = await http.get('/items/search/suggest', { params: { ...filters, q, limit } });
+  return data;
+};
+
+// Items written ({ upserts }) and deleted ({ deletes }) after change `since`; pass back `seq` next time
+export const getItemChanges = async (since = 0, { limit = 500 } = {}) => {
+  const { data } = await http.get('/items/changes', { params: { since, limit } });
+  return data;
+};
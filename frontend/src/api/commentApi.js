@@ -5,8 +5,26 @@ export const createComment = async (comment) => {
   return data;
 };
 
-export const getCommentsForItem = async (itemId) => {
-  const { data } = await http.get(`/comments/${itemId}`);
+export const getCommentsForItem = async (itemId, { limit, cursor } = {}) => {
+  const { data } = await http.get(`/comments/${itemId}`, { params: { limit, cursor } });
+  return data;
+};
+
+// Whole thread, oldest first: follows X-Next-Cursor until the last page
+export const getCommentThread = async (itemId, { pageSize = 500 } = {}) => {
+  const comments = [];
+  let cursor;
+  do {
+    const res = await http.get(`/comments/${itemId}`, { params: { limit: pageSize, cursor } });
+    comments.push(...res.data);
+    cursor = res.headers['x-next-cursor'] || undefined;
+  } while (cursor);
+  return comments;
+};
+
+// { [itemId]: count } for many items in one request
+export const getCommentCounts = async (itemIds) => {
+  const { data } = await http.get('/comments/counts', { params: { item_ids: itemIds.join(',') } });
   return data;
 };
 
@@ -30,6 +30,12 @@ export const setEpicRank = async (id, rank) => {
   return data;
 };
 
+// Place an epic between two neighbours (either may be null for the ends)
+export const moveEpic = async (id, { afterId = null, beforeId = null }) => {
+  const { data } = await http.patch(`/epics/${id}/rank`, { after_id: afterId, before_id: beforeId });
+  return data;
+};
+
 export const bulkUpdateEpic = async (id, payload) => {
   const { data } = await http.patch(`/epics/${id}/bulk`, payload);
   return data;
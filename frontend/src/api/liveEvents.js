@@ -0,0 +1,79 @@
+// Server-Sent Events client for /events (item, sprint, epic and comment changes)
+// Narrow with sprintIds/epicIds; with neither, every change is delivered.
+import http from './http';
+
+const EVENT_TYPES = [
+  'item.created', 'item.updated', 'item.deleted',
+  'sprint.created', 'sprint.updated', 'sprint.deleted',
+  'epic.created', 'epic.updated', 'epic.deleted',
+  'comment.created', 'comment.updated', 'comment.deleted',
+];
+
+function getApiBase() {
+  const base = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+  return base.replace(/\/$/, '');
+}
+
+const REOPEN_DELAY_MS = 3000;
+
+// Short-lived token that only opens /events; the login JWT never goes in a URL
+export const getEventsToken = async () => {
+  const { data } = await http.post('/events/token');
+  return data.token;
+};
+
+// Returns a function that closes the stream
+export function subscribeEvents({ sprintIds = [], epicIds = [], onEvent, onResync }) {
+  if (typeof EventSource === 'undefined' || !localStorage.getItem('token')) return () => {};
+
+  let source = null;
+  let closed = false;
+  let reopenTimer = null;
+  let opened = false;
+
+  const reopen = () => {
+    if (!closed) reopenTimer = setTimeout(open, REOPEN_DELAY_MS);
+  };
+
+  const open = async () => {
+    let token;
+    try {
+      token = await getEventsToken();
+    } catch {
+      reopen();
+      return;
+    }
+    if (closed) return;
+    const url = new URL(`${getApiBase()}/events/`);
+    url.searchParams.set('token', token);
+    if (sprintIds.length) url.searchParams.set('sprint_id', sprintIds.join(','));
+    if (epicIds.length) url.searchParams.set('epic_id', epicIds.join(','));
+
+    // Changes may have been missed while we were disconnected
+    if (opened) onResync && onResync();
+    opened = true;
+    source = new EventSource(url.toString());
+    EVENT_TYPES.forEach((type) => {
+      source.addEventListener(type, (e) => {
+        try { onEvent && onEvent(JSON.parse(e.data)); } catch {}
+      });
+    });
+    // We fell too far behind and were dropped: reload, then listen again
+    source.addEventListener('overflow', () => {
+      source.close();
+      if (!closed) open();
+    });
+    // The browser retries on its own with the same URL; once the stream token has
+    // expired that retry is refused and the source closes, so start over with a new token
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) reopen();
+    };
+  };
+  open();
+
+  return () => {
+    closed = true;
+    clearTimeout(reopenTimer);
+    if (source) source.close();
+  };
+}
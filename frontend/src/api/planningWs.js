@@ -59,5 +59,13 @@ export function connectPlanningWS({ sessionId, token, onMessage }) {
   ws.addEventListener('close', () => cleanup());
   ws.addEventListener('error', () => cleanup());
 
-  return { socket: ws, disconnect: cleanup };
+  // Votes can go over the socket instead of REST; the server answers with
+  // `vote_accepted` or `error` and broadcasts `vote_submitted` to the room
+  const sendVote = (value) => {
+    if (ws.readyState !== WebSocket.OPEN) return false;
+    ws.send(JSON.stringify({ type: 'vote', value }));
+    return true;
+  };
+
+  return { socket: ws, disconnect: cleanup, sendVote };
 }
@@ -38,4 +38,22 @@ export const removeItemFromSprint = async (sprintId, itemId) => {
 export const getBurndown = async (sprintId) => {
   const { data } = await http.get(`/sprints/${sprintId}/burndown`);
   return data;
-};
\ No newline at end of file
+};
+// Burndowns for many sprints in one request: { [sprintId]: { total, remaining, completed } }
+export const getBurndowns = async (sprintIds) => {
+  const params = sprintIds && sprintIds.length ? { ids: sprintIds.join(',') } : {};
+  const { data } = await http.get('/sprints/burndown', { params });
+  return data;
+};
+// Whole task board in one request: { columns, lanes: [{ key, title, columns: { [status]: items } }] }
+// swimlane: 'epic' | 'assignee' | undefined
+export const getSprintBoard = async (sprintId, { swimlane } = {}) => {
+  const params = swimlane ? { swimlane } : {};
+  const { data } = await http.get(`/sprints/${sprintId}/board`, { params });
+  return data;
+};
+// Add/remove many items in one call; added items leave their previous sprint
+export const batchSprintItems = async (sprintId, { add = [], remove = [] } = {}) => {
+  const { data } = await http.post(`/sprints/${sprintId}/items:batch`, { add, remove });
+  return data;
+};
@@ -30,6 +30,12 @@ export const setSubtaskRank = async (id, rank) => {
   return data;
 };
 
+// Place an subtask between two neighbours (either may be null for the ends)
+export const moveSubtask = async (id, { afterId = null, beforeId = null }) => {
+  const { data } = await http.patch(`/subtasks/${id}/rank`, { after_id: afterId, before_id: beforeId });
+  return data;
+};
+
 export const bulkUpdateSubtask = async (id, payload) => {
   const { data } = await http.patch(`/subtasks/${id}/bulk`, payload);
   return data;
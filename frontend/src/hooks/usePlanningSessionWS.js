@@ -51,8 +51,8 @@ export default function usePlanningSessionWS(sessionId) {
       }
     }
 
-    const { socket, disconnect } = connectPlanningWS({ sessionId, token, onMessage: handle })
-    connRef.current = { socket, disconnect }
+    const { socket, disconnect, sendVote } = connectPlanningWS({ sessionId, token, onMessage: handle })
+    connRef.current = { socket, disconnect, sendVote }
     setConnected(true)
 
     return () => {
@@ -62,5 +62,8 @@ export default function usePlanningSessionWS(sessionId) {
     }
   }, [sessionId])
 
-  return { connected, voteCount, participants, revealed }
+  // Returns false when the socket isn't open, so callers can fall back to REST
+  const vote = (value) => (connRef.current ? connRef.current.sendVote(value) : false)
+
+  return { connected, voteCount, participants, revealed, vote }
 }
@@ -1,7 +1,7 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { DragDropContext, Droppable, Draggable } from '@hello-pangea/dnd';
-import { getBacklogItems, createBacklogItem, updateBacklogItem, deleteBacklogItem } from '../api/backlogApi';
-import { createComment, getCommentsForItem, deleteComment, updateComment } from '../api/commentApi';
+import { getBacklogSnapshot, createBacklogItem, updateBacklogItem, deleteBacklogItem, suggestItems, getItemChanges } from '../api/backlogApi';
+import { createComment, getCommentThread, getCommentCounts, deleteComment, updateComment } from '../api/commentApi';
 import Card from '../components/ui/Card';
 import Input from '../components/ui/Input';
 import Button from '../components/ui/Button';
@@ -25,7 +25,11 @@ const formatDateTime = (value) => {
 const BacklogPage = () => {
   const [items, setItems] = useState([]);
   const [newItem, setNewItem] = useState({ title: '', description: '', priority: 0, story_points: 0, type: '' });
-  const [comments, setComments] = useState({});
+  const [comments, setComments] = useState({}); // { [itemId]: comment[] }, loaded when a thread is opened
+  const [commentCounts, setCommentCounts] = useState({}); // { [itemId]: number }
+  const [commentsOpen, setCommentsOpen] = useState({}); // { [itemId]: boolean }
+  const commentsOpenRef = useRef({});
+  commentsOpenRef.current = commentsOpen;
   const [newComment, setNewComment] = useState({});
   const [isDragging, setIsDragging] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
@@ -37,6 +41,8 @@ const BacklogPage = () => {
   const allowedTypes = ['story', 'bug', 'task', 'spike'];
   const qpType = (searchParams.get('type') || '').toLowerCase();
   const [typeFilter, setTypeFilter] = useState(allowedTypes.includes(qpType) ? qpType : '');
+  const [searchText, setSearchText] = useState('');
+  const [searchIds, setSearchIds] = useState(null); // null = no search active
   const navigate = useNavigate();
   const [activityOpen, setActivityOpen] = useState({}); // { [itemId]: boolean }
   const [auditsByItem, setAuditsByItem] = useState({}); // { [itemId]: any[] }
@@ -49,6 +55,28 @@ const BacklogPage = () => {
     }
   }, [typeFilter]);
 
+  // Type-ahead: ask the suggest index shortly after typing stops
+  useEffect(() => {
+    const q = searchText.trim();
+    if (!q) {
+      setSearchIds(null);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const rows = await suggestItems(q, { type: typeFilter || undefined, limit: 50 });
+        if (!cancelled) setSearchIds(new Set(rows.map((r) => String(r.id))));
+      } catch (e) {
+        if (!cancelled) setSearchIds(null);
+      }
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchText, typeFilter]);
+
   // Simple client-side validation for create form
   const titleOk = (newItem.title || '').trim().length > 0;
   const pointsOk = Number(newItem.story_points) > 0;
@@ -60,29 +88,58 @@ const BacklogPage = () => {
     fetchItems();
   }, []);
 
-  // Polling fetch, paused during drag
+  // Polling sync (only what changed since the last load), paused during drag
   useEffect(() => {
     const interval = setInterval(() => {
       if (!isDragging) {
-        fetchItems();
+        syncItems();
       }
     }, 10000);
     return () => clearInterval(interval);
   }, [isDragging]);
 
+  // Highest change_seq seen; the delta sync asks for everything after it
+  const changeSeq = useRef(0);
+
+  const normalizeItems = (list) => list
+    .sort((a, b) => (a.priority || 0) - (b.priority || 0))
+    // Normalize type to lowercase to make filter robust across backend variations
+    .map(it => ({ ...it, type: (it.type || '').toLowerCase() }));
+
+  const syncItems = async () => {
+    try {
+      const upserts = [];
+      const deletes = [];
+      let since = changeSeq.current;
+      let more = true;
+      while (more) {
+        const res = await getItemChanges(since);
+        upserts.push(...res.upserts);
+        deletes.push(...res.deletes);
+        since = res.seq;
+        more = res.more;
+      }
+      changeSeq.current = since;
+      if (!upserts.length && !deletes.length) return;
+      const dropped = new Set([...deletes, ...upserts.map((it) => it.id)].map(String));
+      setItems((prev) => normalizeItems([...prev.filter((it) => !dropped.has(String(it.id))), ...upserts]));
+      refreshComments(upserts.map((item) => item.id));
+    } catch (e) {
+      // e.g. 410 once our position is older than the kept tombstones: reload everything
+      fetchItems();
+    }
+  };
+
   const fetchItems = async () => {
     try {
       setIsLoading(true);
-      const data = await getBacklogItems();
-      const sortedData = data ? data.sort((a, b) => (a.priority || 0) - (b.priority || 0)) : [];
-      // Normalize type to lowercase to make filter robust across backend variations
-      const normalized = sortedData.map(it => ({
-        ...it,
-        type: (it.type || '').toLowerCase()
-      }));
-      setItems(normalized);
+      const { items: data, seq } = await getBacklogSnapshot();
+      setItems(normalizeItems(data || []));
+      // Not the highest change_seq in the list: the server's settled position, so a
+      // write that reserved a lower sequence but landed after the read isn't skipped
+      changeSeq.current = seq;
       if (data) {
-        data.forEach(item => fetchComments(item.id));
+        fetchCommentCounts(data.map((item) => item.id));
       }
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to load backlog' });
@@ -106,8 +163,29 @@ const BacklogPage = () => {
   };
 
   const fetchComments = async (itemId) => {
-    const data = await getCommentsForItem(itemId);
+    const data = await getCommentThread(itemId);
     setComments(prev => ({ ...prev, [itemId]: data }));
+    setCommentCounts(prev => ({ ...prev, [itemId]: data.length }));
+  };
+
+  // Counts only; whole threads are fetched when opened
+  const fetchCommentCounts = async (itemIds) => {
+    for (let i = 0; i < itemIds.length; i += 1000) {
+      const counts = await getCommentCounts(itemIds.slice(i, i + 1000));
+      setCommentCounts(prev => ({ ...prev, ...counts }));
+    }
+  };
+
+  const refreshComments = (itemIds) => {
+    if (!itemIds.length) return;
+    fetchCommentCounts(itemIds);
+    itemIds.filter((id) => commentsOpenRef.current[id]).forEach((id) => fetchComments(id));
+  };
+
+  const toggleComments = (itemId) => {
+    const willOpen = !commentsOpen[itemId];
+    setCommentsOpen((m) => ({ ...m, [itemId]: willOpen }));
+    if (willOpen) fetchComments(itemId);
   };
 
   const handleCreate = async () => {
@@ -161,6 +239,7 @@ const BacklogPage = () => {
   const handleAddComment = async (itemId) => {
     await createComment({ text: newComment[itemId], item_id: itemId });
     setNewComment(prev => ({ ...prev, [itemId]: '' }));
+    setCommentsOpen((m) => ({ ...m, [itemId]: true }));
     fetchComments(itemId);
   };
 
@@ -235,6 +314,13 @@ const BacklogPage = () => {
               );
             })}
           </div>
+          <div className="ml-auto w-full md:w-64">
+            <Input
+              placeholder="Search backlog..."
+              value={searchText}
+              onChange={(e) => setSearchText(e.target.value)}
+            />
+          </div>
         </div>
       </Card>
 
@@ -305,6 +391,7 @@ const BacklogPage = () => {
             </li>
           )}
           {(items.filter((it) => {
+            if (searchIds && !searchIds.has(String(it.id))) return false;
             if (!typeFilter) return true;
             const t = (it.type || '').toLowerCase();
             return t === typeFilter;
@@ -367,45 +454,53 @@ const BacklogPage = () => {
                           <div className="text-sm text-gray-600">{item.description || <em>No description</em>}</div>
 
                           <div>
-                            <h4 className="text-sm font-medium">Comments</h4>
-                            <ul className="mt-1 space-y-1">
-                              {([...(comments[item.id] || [])].sort((a, b) => new Date(a.created_at) - new Date(b.created_at))).map((c) => (
-                                <li key={c.id} className="rounded bg-gray-50 px-2 py-1 text-xs text-gray-700">
-                                  <div className="flex items-center justify-between">
-                                    <span className="font-medium text-gray-800">
-                                      {userId && c.user_id === userId ? 'You' : (c.username || (c.user_id ? `User ${String(c.user_id).slice(-6)}` : 'Unknown'))}
-                                    </span>
-                                    <div className="flex items-center gap-2">
-                                      {c.created_at && (
-                                        <span className="text-[10px] text-gray-400">{formatDateTime(c.created_at)}</span>
-                                      )}
-                                      {(userId && (c.user_id === userId || canModerateComments)) && (
-                                        <>
-                                          <button
-                                            type="button"
-                                            className="text-[10px] text-blue-600 hover:underline"
-                                            onClick={() => handleEditComment(item.id, c)}
-                                          >
-                                            Edit
-                                          </button>
-                                          <button
-                                            type="button"
-                                            className="text-[10px] text-red-600 hover:underline"
-                                            onClick={() => handleDeleteComment(item.id, c.id)}
-                                          >
-                                            Delete
-                                          </button>
-                                        </>
-                                      )}
+                            <button
+                              type="button"
+                              className="text-sm font-medium hover:underline"
+                              onClick={() => toggleComments(item.id)}
+                            >
+                              {`Comments (${commentCounts[item.id] || 0})`}
+                            </button>
+                            {commentsOpen[item.id] && (
+                              <ul className="mt-1 space-y-1">
+                                {([...(comments[item.id] || [])].sort((a, b) => new Date(a.created_at) - new Date(b.created_at))).map((c) => (
+                                  <li key={c.id} className="rounded bg-gray-50 px-2 py-1 text-xs text-gray-700">
+                                    <div className="flex items-center justify-between">
+                                      <span className="font-medium text-gray-800">
+                                        {userId && c.user_id === userId ? 'You' : (c.username || (c.user_id ? `User ${String(c.user_id).slice(-6)}` : 'Unknown'))}
+                                      </span>
+                                      <div className="flex items-center gap-2">
+                                        {c.created_at && (
+                                          <span className="text-[10px] text-gray-400">{formatDateTime(c.created_at)}</span>
+                                        )}
+                                        {(userId && (c.user_id === userId || canModerateComments)) && (
+                                          <>
+                                            <button
+                                              type="button"
+                                              className="text-[10px] text-blue-600 hover:underline"
+                                              onClick={() => handleEditComment(item.id, c)}
+                                            >
+                                              Edit
+                                            </button>
+                                            <button
+                                              type="button"
+                                              className="text-[10px] text-red-600 hover:underline"
+                                              onClick={() => handleDeleteComment(item.id, c.id)}
+                                            >
+                                              Delete
+                                            </button>
+                                          </>
+                                        )}
+                                      </div>
                                     </div>
-                                  </div>
-                                  <div>{c.text}</div>
-                                </li>
-                              ))}
-                              {(!comments[item.id] || comments[item.id].length === 0) && (
-                                <li className="text-xs text-gray-400">No comments yet.</li>
-                              )}
-                            </ul>
+                                    <div>{c.text}</div>
+                                  </li>
+                                ))}
+                                {(!comments[item.id] || comments[item.id].length === 0) && (
+                                  <li className="text-xs text-gray-400">No comments yet.</li>
+                                )}
+                              </ul>
+                            )}
                             <div className="mt-2 flex gap-2">
                               <Input
                                 className="flex-1"
@@ -1,53 +1,106 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useParams } from 'react-router-dom';
 import { DragDropContext, Droppable, Draggable } from '@hello-pangea/dnd';
-import { getSprint } from '../api/sprintApi';
-import { getBacklogItem, updateBacklogItem } from '../api/backlogApi';
+import { getSprintBoard } from '../api/sprintApi';
+import { updateBacklogItem } from '../api/backlogApi';
+import { subscribeEvents } from '../api/liveEvents';
 import Card from '../components/ui/Card';
+import Select from '../components/ui/Select';
 import { useToast } from '../components/ui/Toast';
 
+const EMPTY_BOARD = {
+  columns: ['todo', 'in_progress', 'done'],
+  lanes: [{ key: null, title: null, columns: { todo: [], in_progress: [], done: [] } }]
+};
+
+// Events arriving within this window trigger a single board reload
+const REFRESH_DEBOUNCE_MS = 300;
+// Echoes of our own moves are ignored for this long after saving
+const OWN_ECHO_MS = 5000;
+
+// Droppables are per lane and column: "<laneIndex>:<status>"
+const dropId = (laneIndex, status) => `${laneIndex}:${status}`;
+const parseDropId = (id) => {
+  const i = id.indexOf(':');
+  return { lane: Number(id.slice(0, i)), status: id.slice(i + 1) };
+};
+
 const BoardPage = () => {
   const { sprintId } = useParams();
-  const [columns, setColumns] = useState({
-    todo: [],
-    in_progress: [],
-    done: []
-  });
+  const [board, setBoard] = useState(EMPTY_BOARD);
+  const [swimlane, setSwimlane] = useState('');
   const [isDragging, setIsDragging] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const { add: toast } = useToast();
 
-  // Initial fetch on mount or sprint change
+  // Initial fetch on mount, sprint change or swimlane change
   useEffect(() => {
     fetchBoard();
-  }, [sprintId]);
+  }, [sprintId, swimlane]);
+
+  // Live updates for this sprint, batched into one reload per REFRESH_DEBOUNCE_MS;
+  // changes during a drag are applied once it ends
+  const staleRef = useRef(false);
+  const draggingRef = useRef(false);
+  draggingRef.current = isDragging;
+  // item id -> status we just saved ourselves, so the server's echo doesn't reload
+  const ownMovesRef = useRef(new Map());
+  useEffect(() => {
+    let timer = null;
+    const refresh = () => {
+      timer = null;
+      if (draggingRef.current) {
+        staleRef.current = true;
+      } else {
+        fetchBoard();
+      }
+    };
+    const schedule = () => {
+      if (timer === null) timer = setTimeout(refresh, REFRESH_DEBOUNCE_MS);
+    };
+    const onEvent = (evt) => {
+      const own = ownMovesRef.current.get(evt.id);
+      const data = evt.data || {};
+      const keys = Object.keys(data).filter((k) => !['updated_at', 'change_seq', 'changed_at'].includes(k));
+      if (own && evt.type === 'item.updated' && keys.every((k) => k === 'status') && data.status === own) {
+        return;
+      }
+      schedule();
+    };
+    const unsubscribe = subscribeEvents({
+      sprintIds: [sprintId],
+      onEvent,
+      onResync: schedule,
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, [sprintId, swimlane]);
 
-  // Polling fetch, paused during drag
+  useEffect(() => {
+    if (!isDragging && staleRef.current) {
+      staleRef.current = false;
+      fetchBoard();
+    }
+  }, [isDragging]);
+
+  // Slow polling as a safety net (e.g. missed events while reconnecting), paused during drag
   useEffect(() => {
     const interval = setInterval(() => {
       if (!isDragging) {
         fetchBoard();
       }
-    }, 10000);
+    }, 60000);
     return () => clearInterval(interval);
-  }, [isDragging, sprintId]);
+  }, [isDragging, sprintId, swimlane]);
 
   const fetchBoard = async () => {
     try {
       setIsLoading(true);
-      const sprint = await getSprint(sprintId);
-      if (sprint && Array.isArray(sprint.backlog_items)) {
-        const items = await Promise.all(sprint.backlog_items.map(id => getBacklogItem(id)));
-        const newColumns = { todo: [], in_progress: [], done: [] };
-        items.forEach(item => {
-          if (item && item.status && newColumns[item.status]) {
-            newColumns[item.status].push(item);
-          }
-        });
-        setColumns(newColumns);
-      } else {
-        setColumns({ todo: [], in_progress: [], done: [] });
-      }
+      // One request: items, status columns, swimlanes and subtask counts
+      const data = await getSprintBoard(sprintId, { swimlane: swimlane || undefined });
+      setBoard(data && Array.isArray(data.lanes) ? data : EMPTY_BOARD);
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to load board' });
     } finally {
@@ -59,16 +112,26 @@ const BoardPage = () => {
     const { source, destination } = result;
     if (!destination) return;
     if (source.droppableId === destination.droppableId) return;
+    const from = parseDropId(source.droppableId);
+    const to = parseDropId(destination.droppableId);
+    // Lanes follow epic/assignee; dragging only changes status
+    if (from.lane !== to.lane) return;
 
-    const sourceCol = columns[source.droppableId];
-    const destCol = columns[destination.droppableId];
+    const lane = board.lanes[from.lane];
+    const sourceCol = lane.columns[from.status];
+    const destCol = lane.columns[to.status];
     const [movedItem] = sourceCol.splice(source.index, 1);
-    destCol.splice(destination.index, 0, movedItem);
+    destCol.splice(destination.index, 0, { ...movedItem, status: to.status });
 
-    setColumns({ ...columns });
+    setBoard({ ...board });
 
+    const id = String(movedItem.id);
+    ownMovesRef.current.set(id, to.status);
+    setTimeout(() => {
+      if (ownMovesRef.current.get(id) === to.status) ownMovesRef.current.delete(id);
+    }, OWN_ECHO_MS);
     try {
-      await updateBacklogItem(movedItem.id, { status: destination.droppableId });
+      await updateBacklogItem(movedItem.id, { status: to.status });
       toast({ variant: 'success', title: 'Item moved' });
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to move item' });
@@ -79,7 +142,16 @@ const BoardPage = () => {
 
   return (
     <div className="space-y-6">
-      <h2 className="text-xl font-semibold">Task Board</h2>
+      <div className="flex items-end justify-between gap-4">
+        <h2 className="text-xl font-semibold">Task Board</h2>
+        <div className="w-48">
+          <Select label="Swimlanes" value={swimlane} onChange={(e) => setSwimlane(e.target.value)}>
+            <option value="">None</option>
+            <option value="epic">Epic</option>
+            <option value="assignee">Assignee</option>
+          </Select>
+        </div>
+      </div>
       {isLoading && (
         <div className="rounded border border-dashed border-gray-300 bg-white/40 p-3 text-sm text-gray-500">Loading board...</div>
       )}
@@ -91,73 +163,85 @@ const BoardPage = () => {
           await onDragEnd(result);
         }}
       >
-        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
-          {Object.entries(columns).map(([colId, colItems]) => (
-            <div key={colId} className="min-h-[200px]">
-              <Card
-                header={(
-                  <div className="flex items-center justify-between">
-                    <h3 className="text-sm font-semibold uppercase tracking-wide">
-                      {colId.replace('_', ' ')}
-                    </h3>
-                    <span className="inline-flex h-6 min-w-[1.5rem] items-center justify-center rounded-full bg-gray-100 px-2 text-xs font-medium text-gray-700">
-                      {colItems.length}
-                    </span>
-                  </div>
-                )}
-              >
-                <Droppable droppableId={colId}>
-                  {(provided, snapshot) => (
-                    <ul
-                      {...provided.droppableProps}
-                      ref={provided.innerRef}
-                      className={[
-                        'min-h-[160px] space-y-2 rounded-md p-2 transition-colors',
-                        snapshot.isDraggingOver ? 'bg-blue-50' : 'bg-transparent'
-                      ].join(' ')}
-                    >
-                      {colItems.length === 0 && (
-                        <li className="flex items-center justify-center rounded border border-dashed border-gray-300 bg-white/40 p-6 text-sm text-gray-500">
-                          No items in this column
-                        </li>
-                      )}
-                      {colItems.map((item, index) => (
-                        <Draggable key={item.id} draggableId={String(item.id)} index={index}>
-                          {(provided, snap) => (
-                            <li
-                              ref={provided.innerRef}
-                              {...provided.draggableProps}
-                              {...provided.dragHandleProps}
-                              className={[
-                                'rounded-md border border-gray-200 bg-white p-3 text-sm shadow-sm transition-transform',
-                                snap.isDragging ? 'rotate-[0.5deg] shadow-md ring-2 ring-blue-200' : ''
-                              ].join(' ')}
-                            >
-                              <div className="flex items-center justify-between">
-                                <span className="flex items-center gap-2 font-medium text-gray-900">
-                                  {item.title}
-                                  <span className="inline-flex items-center rounded-full bg-gray-100 px-2 py-0.5 text-xs font-medium text-gray-700">{item.story_points || 0} pts</span>
-                                </span>
-                                {/* Placeholder for future quick actions */}
-                                <div className="flex items-center gap-2">
-                                  {/* Example: <Button size="sm" variant="ghost">Edit</Button> */}
-                                </div>
-                              </div>
-                              {item.description && (
-                                <p className="mt-1 text-gray-600">{item.description}</p>
-                              )}
+        {board.lanes.map((lane, laneIndex) => (
+          <div key={lane.key || 'none'} className="space-y-2">
+            {swimlane && (
+              <h3 className="text-sm font-semibold text-gray-700">
+                {lane.title || lane.key || (swimlane === 'epic' ? 'No epic' : 'Unassigned')}
+              </h3>
+            )}
+            <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+              {Object.entries(lane.columns).map(([colId, colItems]) => (
+                <div key={colId} className="min-h-[200px]">
+                  <Card
+                    header={(
+                      <div className="flex items-center justify-between">
+                        <h3 className="text-sm font-semibold uppercase tracking-wide">
+                          {colId.replace('_', ' ')}
+                        </h3>
+                        <span className="inline-flex h-6 min-w-[1.5rem] items-center justify-center rounded-full bg-gray-100 px-2 text-xs font-medium text-gray-700">
+                          {colItems.length}
+                        </span>
+                      </div>
+                    )}
+                  >
+                    <Droppable droppableId={dropId(laneIndex, colId)}>
+                      {(provided, snapshot) => (
+                        <ul
+                          {...provided.droppableProps}
+                          ref={provided.innerRef}
+                          className={[
+                            'min-h-[160px] space-y-2 rounded-md p-2 transition-colors',
+                            snapshot.isDraggingOver ? 'bg-blue-50' : 'bg-transparent'
+                          ].join(' ')}
+                        >
+                          {colItems.length === 0 && (
+                            <li className="flex items-center justify-center rounded border border-dashed border-gray-300 bg-white/40 p-6 text-sm text-gray-500">
+                              No items in this column
                             </li>
                           )}
-                        </Draggable>
-                      ))}
-                      {provided.placeholder}
-                    </ul>
-                  )}
-                </Droppable>
-              </Card>
+                          {colItems.map((item, index) => (
+                            <Draggable key={item.id} draggableId={String(item.id)} index={index}>
+                              {(provided, snap) => (
+                                <li
+                                  ref={provided.innerRef}
+                                  {...provided.draggableProps}
+                                  {...provided.dragHandleProps}
+                                  className={[
+                                    'rounded-md border border-gray-200 bg-white p-3 text-sm shadow-sm transition-transform',
+                                    snap.isDragging ? 'rotate-[0.5deg] shadow-md ring-2 ring-blue-200' : ''
+                                  ].join(' ')}
+                                >
+                                  <div className="flex items-center justify-between">
+                                    <span className="flex items-center gap-2 font-medium text-gray-900">
+                                      {item.title}
+                                      <span className="inline-flex items-center rounded-full bg-gray-100 px-2 py-0.5 text-xs font-medium text-gray-700">{item.story_points || 0} pts</span>
+                                    </span>
+                                    {/* Placeholder for future quick actions */}
+                                    <div className="flex items-center gap-2">
+                                      {/* Example: <Button size="sm" variant="ghost">Edit</Button> */}
+                                    </div>
+                                  </div>
+                                  {item.description && (
+                                    <p className="mt-1 text-gray-600">{item.description}</p>
+                                  )}
+                                  {item.subtask_count > 0 && (
+                                    <p className="mt-1 text-xs text-gray-500">Subtasks: {item.subtasks_done}/{item.subtask_count}</p>
+                                  )}
+                                </li>
+                              )}
+                            </Draggable>
+                          ))}
+                          {provided.placeholder}
+                        </ul>
+                      )}
+                    </Droppable>
+                  </Card>
+                </div>
+              ))}
             </div>
-          ))}
-        </div>
+          </div>
+        ))}
       </DragDropContext>
     </div>
   );
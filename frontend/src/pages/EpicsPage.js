@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { DragDropContext, Droppable, Draggable } from '@hello-pangea/dnd';
-import { createEpic, getEpics, deleteEpic, setEpicRank, bulkUpdateEpic } from '../api/epicsApi';
+import { createEpic, getEpics, deleteEpic, moveEpic, bulkUpdateEpic } from '../api/epicsApi';
 import Card from '../components/ui/Card';
 import Input from '../components/ui/Input';
 import Button from '../components/ui/Button';
@@ -9,14 +9,8 @@ import Select from '../components/ui/Select';
 import { useToast } from '../components/ui/Toast';
 import { hasRole } from '../utils/auth';
 
-const computeBetween = (prev, next) => {
-  const p = typeof prev === 'number' ? prev : null;
-  const n = typeof next === 'number' ? next : null;
-  if (p != null && n != null) return (p + n) / 2;
-  if (p == null && n != null) return n - 1;
-  if (p != null && n == null) return p + 1;
-  return 0;
-};
+// Ranks are fractional-index strings; plain string order is the display order
+const compareRank = (a, b) => ((a.rank || '') < (b.rank || '') ? -1 : (a.rank || '') > (b.rank || '') ? 1 : 0);
 
 const EpicsPage = () => {
   const [epics, setEpics] = useState([]);
@@ -43,7 +37,7 @@ const EpicsPage = () => {
     try {
       setIsLoading(true);
       const data = await getEpics();
-      const sorted = (data || []).slice().sort((a, b) => (a.rank || 0) - (b.rank || 0));
+      const sorted = (data || []).slice().sort(compareRank);
       setEpics(sorted);
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to load epics' });
@@ -116,16 +110,16 @@ const EpicsPage = () => {
     const [moved] = reordered.splice(result.source.index, 1);
     reordered.splice(result.destination.index, 0, moved);
 
-    // Compute new rank for moved item only
+    // Server computes the new rank from the neighbours
     const idx = result.destination.index;
-    const prev = idx > 0 ? reordered[idx - 1].rank : null;
-    const next = idx < reordered.length - 1 ? reordered[idx + 1].rank : null;
-    const newRank = computeBetween(prev, next);
+    const afterId = idx > 0 ? reordered[idx - 1].id : null;
+    const beforeId = idx < reordered.length - 1 ? reordered[idx + 1].id : null;
 
-    setEpics(reordered.map((e, i) => (e.id === moved.id ? { ...e, rank: newRank } : e)));
+    setEpics(reordered);
 
     try {
-      await setEpicRank(moved.id, newRank);
+      const saved = await moveEpic(moved.id, { afterId, beforeId });
+      setEpics((cur) => cur.map((e) => (e.id === saved.id ? saved : e)));
       toast({ variant: 'success', title: 'Epic order updated' });
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to update order' });
@@ -249,6 +243,9 @@ const EpicsPage = () => {
                               ))}
                             </div>
                             <div className="text-xs text-gray-500">Status: {epic.status || 'todo'} • Points: {epic.story_points || 0}</div>
+                            {epic.progress && epic.progress.item_count > 0 && (
+                              <div className="text-xs text-gray-500">Progress: {epic.progress.done_points} / {epic.progress.total_points} pts • {epic.progress.item_count} items</div>
+                            )}
                           </div>
                         )}
                       </Card>
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { getSprints, createSprint, deleteSprint, getBurndown, addItemToSprint, removeItemFromSprint } from '../api/sprintApi';
+import { getSprints, createSprint, deleteSprint, getBurndowns, addItemToSprint, removeItemFromSprint } from '../api/sprintApi';
 import { getBacklogItems } from '../api/backlogApi';
 import { Link } from 'react-router-dom';
 import Card from '../components/ui/Card';
@@ -34,20 +34,14 @@ const SprintPage = () => {
       setIsLoading(true);
       const data = await getSprints();
       setSprints(data || []);
-      if (data && Array.isArray(data)) {
-        // fetch burndown for each sprint in parallel
-        const entries = await Promise.all(
-          data.map(async (s) => {
-            try {
-              const bd = await getBurndown(s.id);
-              return [s.id, bd];
-            } catch {
-              return [s.id, null];
-            }
-          })
-        );
-        const map = Object.fromEntries(entries);
-        setBurndown(map);
+      if (data && Array.isArray(data) && data.length) {
+        // one batched request for every sprint's burndown
+        try {
+          const map = await getBurndowns(data.map((s) => s.id));
+          setBurndown(map || {});
+        } catch {
+          setBurndown({});
+        }
       }
     } catch (e) {
       toast({ variant: 'error', title: 'Failed to load sprints' });
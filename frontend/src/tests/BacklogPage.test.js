@@ -2,18 +2,20 @@ import React from 'react';
 import { render, screen, fireEvent, act } from '@testing-library/react';
 import '@testing-library/jest-dom';
 import BacklogPage from '../pages/BacklogPage';
-import { getBacklogItems, createBacklogItem } from '../api/backlogApi';
+import { getBacklogSnapshot, createBacklogItem } from '../api/backlogApi';
 
 // Mock the API calls
 jest.mock('../api/backlogApi', () => ({
-  getBacklogItems: jest.fn(() => Promise.resolve([])),
+  getBacklogSnapshot: jest.fn(() => Promise.resolve({ items: [], seq: 0 })),
   createBacklogItem: jest.fn(() => Promise.resolve({ id: '1', title: 'Test Item', story_points: 3, priority: 1, description: 'Test Desc', status: 'todo' })),
   updateBacklogItem: jest.fn(() => Promise.resolve()),
-  deleteBacklogItem: jest.fn(() => Promise.resolve())
+  deleteBacklogItem: jest.fn(() => Promise.resolve()),
+  suggestItems: jest.fn(() => Promise.resolve([]))
 }));
 jest.mock('../api/commentApi', () => ({
   createComment: jest.fn(() => Promise.resolve()),
-  getCommentsForItem: jest.fn(() => Promise.resolve([]))
+  getCommentThread: jest.fn(() => Promise.resolve([])),
+  getCommentCounts: jest.fn(() => Promise.resolve({}))
 }));
 
 test('renders backlog page', async () => {
@@ -3,15 +3,19 @@ import { render, screen, act } from '@testing-library/react';
 import '@testing-library/jest-dom';
 import { BrowserRouter } from 'react-router-dom';
 import BoardPage from '../pages/BoardPage';
-import { getSprint } from '../api/sprintApi';
-import { getBacklogItem } from '../api/backlogApi';
+import { getSprintBoard } from '../api/sprintApi';
 
 // Mock the API calls
+const mockItem = (id, status) => ({ id, title: `Item ${id}`, story_points: 3, priority: 1, description: 'Test Desc', status, subtask_count: 0, subtasks_done: 0 });
 jest.mock('../api/sprintApi', () => ({
-  getSprint: jest.fn(() => Promise.resolve({ id: '1', goal: 'Test Sprint', duration: 14, backlog_items: ['1', '2'] }))
+  getSprintBoard: jest.fn(() => Promise.resolve({
+    sprint_id: '1',
+    swimlane: null,
+    columns: ['todo', 'in_progress', 'done'],
+    lanes: [{ key: null, title: null, columns: { todo: [mockItem('1', 'todo')], in_progress: [mockItem('2', 'in_progress')], done: [] } }]
+  }))
 }));
 jest.mock('../api/backlogApi', () => ({
-  getBacklogItem: jest.fn(id => Promise.resolve({ id, title: `Item ${id}`, story_points: 3, priority: 1, description: 'Test Desc', status: id === '1' ? 'todo' : 'in_progress' })),
   updateBacklogItem: jest.fn(() => Promise.resolve())
 }));
 
@@ -45,4 +49,16 @@ test('displays columns for todo, in progress, and done', async () => {
   expect(screen.getByText(/TODO/i)).toBeInTheDocument();
   expect(screen.getByText(/IN_PROGRESS/i)).toBeInTheDocument();
   expect(screen.getByText(/DONE/i)).toBeInTheDocument();
-});
\ No newline at end of file
+});
+test('loads the whole board in one request', async () => {
+  await act(async () => {
+    render(
+      <BrowserRouter>
+        <BoardPage />
+      </BrowserRouter>
+    );
+  });
+  await screen.findByText('Item 1');
+  expect(screen.getByText('Item 2')).toBeInTheDocument();
+  expect(getSprintBoard).toHaveBeenCalledWith('1', { swimlane: undefined });
+});